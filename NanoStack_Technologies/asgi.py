@@ -12,5 +12,15 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'NanoStack_Technologies.settings')
+# Sync code of each async request runs in a thread of its own, so persistent
+# connections would be left behind on finished threads.
+os.environ.setdefault('DJANGO_CONN_MAX_AGE', '0')
+# Serve the public pages from core.async_views.
+os.environ.setdefault('DJANGO_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
+
+# Compile every template into the cached loader before the first request.
+from core.deploy import warm_templates  # noqa: E402
+
+warm_templates()
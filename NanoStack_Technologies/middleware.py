@@ -1,9 +1,182 @@
+from functools import lru_cache
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.utils.module_loading import import_string
+
+from core import edge, ratelimit, replica
+from core.views import get_client_ip
+
+ADMIN_HOST = 'nanoadmin.nanostacktechnologies.com'
+ADMIN_URLCONF = 'NanoStack_Technologies.urls_admin'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+@lru_cache(maxsize=64)
+def is_admin_host(http_host):
+    return http_host.split(':')[0] == ADMIN_HOST
+
+
+def build_chain(paths, get_response):
+    """
+    Instantiates ``paths`` around ``get_response`` the way Django's handler
+    does and returns (chain, process_view hooks in request order).
+    """
+    chain = get_response
+    view_hooks = []
+    for path in reversed(paths):
+        middleware = import_string(path)(chain)
+        if hasattr(middleware, 'process_view'):
+            view_hooks.insert(0, middleware.process_view)
+        chain = middleware
+    return chain, view_hooks
+
+
 class SubdomainRoutingMiddleware:
+    """
+    Routes the admin subdomain to its own urlconf and picks one of two
+    middleware chains built at startup:
+
+    * ``PUBLIC_MIDDLEWARE`` for safe requests to the public site, which never
+      touch sessions, CSRF, auth or messages;
+    * ``FULL_MIDDLEWARE`` for the admin host, unsafe methods and the public
+      paths in ``FULL_MIDDLEWARE_PATHS`` (forms and the Django admin).
+
+    The handler only registers this class's process_view, so it forwards to
+    the hooks of whichever chain the request went through.
+
+    Under ASGI both chains are built async (Django's middleware adapt to the
+    get_response they wrap), so public requests never leave the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.public_chain, self.public_view_hooks = build_chain(settings.PUBLIC_MIDDLEWARE, get_response)
+        self.full_chain, self.full_view_hooks = build_chain(settings.FULL_MIDDLEWARE, get_response)
+        self.full_paths = tuple(settings.FULL_MIDDLEWARE_PATHS)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            self.process_view = self.aprocess_view
+
+    def needs_full_chain(self, request):
+        if is_admin_host(request.META.get('HTTP_HOST', '')):
+            request.urlconf = ADMIN_URLCONF
+            return True
+        return request.method not in SAFE_METHODS or request.path_info.startswith(self.full_paths)
+
+    def __call__(self, request):
+        request.full_middleware = self.needs_full_chain(request)
+        # Only public-chain requests may read core models from the snapshot.
+        replica.begin_request(public=not request.full_middleware)
+        if request.full_middleware:
+            return self.full_chain(request)
+        return self.public_chain(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        return self.run_view_hooks(request, view_func, view_args, view_kwargs)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        # The forwarded hooks (CSRF) only inspect the request; no I/O.
+        return self.run_view_hooks(request, view_func, view_args, view_kwargs)
+
+    def run_view_hooks(self, request, view_func, view_args, view_kwargs):
+        hooks = self.full_view_hooks if getattr(request, 'full_middleware', True) else self.public_view_hooks
+        for hook in hooks:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response is not None:
+                return response
+        return None
+
+
+class RateLimitMiddleware:
+    """
+    Throttles POSTs to the paths in ``RATE_LIMITS`` per client IP with a
+    token bucket shared by all workers (see core.ratelimit). Runs before the
+    session and CSRF middleware so a rejected request never has its body
+    parsed or touches the site database.
+    """
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        host = request.get_host().split(':')[0]
-        if host == 'nanoadmin.nanostacktechnologies.com':
-            request.urlconf = 'NanoStack_Technologies.urls_admin'
+        if self.async_mode:
+            return self.__acall__(request)
+        limit = self.limit(request)
+        if limit:
+            wait = ratelimit.consume(*limit)
+            if wait:
+                return self.too_many_requests(request, wait)
         return self.get_response(request)
+
+    async def __acall__(self, request):
+        limit = self.limit(request)
+        if limit:
+            wait = await sync_to_async(ratelimit.consume)(*limit)
+            if wait:
+                return self.too_many_requests(request, wait)
+        return await self.get_response(request)
+
+    def limit(self, request):
+        """Returns consume() arguments for a throttled request, or None."""
+        if request.method != 'POST':
+            return None
+        limit = ratelimit.limit_for(request.path_info)
+        if limit is None:
+            return None
+        scope, burst, period = limit
+        return f'{scope}:{get_client_ip(request)}', burst, period
+
+    def too_many_requests(self, request, wait):
+        if request.path_info.startswith('/api/'):
+            response = JsonResponse({'error': 'Too many requests'}, status=429)
+        else:
+            response = HttpResponse('Too many requests. Please try again later.', status=429, content_type='text/plain')
+        response['Retry-After'] = str(int(wait) + 1)
+        return response
+
+
+class EdgeCacheMiddleware:
+    """
+    Adds the shared-cache headers to public responses a view tagged with
+    core.edge.tag() and records their nginx cache key for purging. Only on
+    the public chain: nothing served through the full chain is ever shared.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        key = self.cache_key(request, response)
+        if key:
+            edge.record(key, response.cache_tags)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        key = self.cache_key(request, response)
+        if key:
+            await sync_to_async(edge.record)(key, response.cache_tags)
+        return response
+
+    def cache_key(self, request, response):
+        """Adds the headers; returns nginx's key for the response if it will store it."""
+        if not edge.is_cacheable(request, response):
+            return None
+        edge.add_headers(response)
+        return request.META.get('HTTP_X_CACHE_KEY')
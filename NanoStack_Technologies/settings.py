@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -70,15 +71,31 @@ CKEDITOR_CONFIGS = {
 }
 
 MIDDLEWARE = [
-    'NanoStack_Technologies.middleware.SubdomainRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'NanoStack_Technologies.middleware.SubdomainRoutingMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+# SubdomainRoutingMiddleware runs one of these chains per request: the public
+# one for GETs on the main site, the full one for the admin host, POSTs and
+# the paths below (see NanoStack_Technologies/middleware.py).
+PUBLIC_MIDDLEWARE = [
+    'NanoStack_Technologies.middleware.EdgeCacheMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+FULL_MIDDLEWARE = [
+    'NanoStack_Technologies.middleware.RateLimitMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
+FULL_MIDDLEWARE_PATHS = ['/admin/', '/contact/']
+
+# The admin's middleware checks only look at MIDDLEWARE; the admin is always
+# served through FULL_MIDDLEWARE.
+SILENCED_SYSTEM_CHECKS = ['admin.E408', 'admin.E409', 'admin.E410']
 
 ROOT_URLCONF = 'NanoStack_Technologies.urls'
 
@@ -86,12 +103,20 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.deploy_version',
+            ],
+            # Compiled templates are kept for the life of the worker and
+            # loaded up front by core.deploy.warm_templates() (wsgi.py/asgi.py).
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
             ],
         },
     },
@@ -103,13 +128,66 @@ WSGI_APPLICATION = 'NanoStack_Technologies.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+REPLICA_DB = BASE_DIR / 'replica.sqlite3'
+
+# Applied to every new connection, so only pragmas that are not saved in
+# the database file. WAL, which lets pages be read while the admin or the
+# contact spool is writing, is persistent and set once by migration
+# core.0020. synchronous=NORMAL only fsyncs at WAL checkpoints, which is
+# safe in WAL mode (a power cut can lose the last commits, never corrupt
+# the file).
+SQLITE_PRAGMAS = {
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # ms to wait for the write lock
+    'cache_size': -20000,  # KiB of page cache per connection
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        # Each worker keeps its connection (and its warm page cache) between
+        # requests and checks it is still usable before reusing it. asgi.py
+        # turns this off, as async requests run their ORM calls in new threads.
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+            # Take the write lock when a transaction starts, so a writer waits
+            # for busy_timeout instead of failing with "database is locked"
+            # when its read lock cannot be upgraded.
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+    # Read-only snapshot of the primary for public page reads (see
+    # core/replica.py). immutable=1 skips all locking, so the file is only
+    # ever replaced, never written in place.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': f'file:{REPLICA_DB}?mode=ro&immutable=1',
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(
+                f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()
+                if name in ('cache_size', 'mmap_size', 'temp_store')
+            ),
+        },
+        'TEST': {'MIRROR': 'default'},
+    },
 }
 
+DATABASE_ROUTERS = ['core.replica.ReplicaRouter']
+
+# Seconds a public request may read a snapshot that is behind the primary;
+# 0 falls back to the primary as soon as anything has been written.
+REPLICA_MAX_LAG = 0
+# Each refresh copies the whole database; a request that wrote only starts
+# one if the snapshot is at least this many seconds old.
+REPLICA_REFRESH_INTERVAL = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -148,6 +226,15 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+# collectstatic writes content-hashed, minified files plus .gz/.br siblings
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'NanoStack_Technologies.storage.CompressedManifestStaticFilesStorage',
+    },
+}
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
@@ -155,4 +242,67 @@ MEDIA_ROOT = BASE_DIR / 'media'
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 
 # Login URL
-LOGIN_URL = 'admin_login'
\ No newline at end of file
+LOGIN_URL = 'admin_login'
+
+# Cache
+# Shared between gunicorn workers so page cache invalidation is seen by all of them.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    # Per-worker memory for the {% cache %} fragments in base.html. They only
+    # change with a deploy, so nothing has to be shared or invalidated.
+    'fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'fragments',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
+
+# Release identifier; cached template fragments are keyed by it. Set it in
+# the service environment, otherwise the git revision is used.
+DEPLOY_VERSION = os.environ.get('DEPLOY_VERSION', '')
+
+# Route the public pages to core.async_views. asgi.py turns this on; under
+# WSGI each async view would run through async_to_sync, which is slower.
+ASYNC_VIEWS = os.environ.get('DJANGO_ASYNC_VIEWS') == '1'
+
+# Public page cache (see core/cache.py)
+PAGE_CACHE_ENABLED = True
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24
+
+# nginx micro-cache in front of the public pages (see core/edge.py). DIR and
+# LEVELS must match proxy_cache_path in nginx_config.
+EDGE_CACHE_DIR = '/var/cache/nginx/nanostack'
+EDGE_CACHE_LEVELS = '1:2'
+EDGE_CACHE_TTL = 60
+EDGE_CACHE_INDEX = BASE_DIR / 'edge_cache.sqlite3'
+
+# Static export of the public pages (see core/export.py); nginx_config serves
+# it before falling back to Django.
+SITE_EXPORT_ROOT = BASE_DIR / 'site'
+
+# Pre-generated sitemap files (see core/sitemap_files.py)
+SITEMAP_ROOT = BASE_DIR / 'sitemaps'
+SITEMAP_DOMAIN = 'nanostacktechnologies.com'
+SITEMAP_PROTOCOL = 'https'
+
+# Cached blog feeds (see core/feeds.py)
+FEED_ROOT = BASE_DIR / 'feeds'
+FEED_MAX_ITEMS = 50
+
+# Per-IP token buckets for form posts (see core/ratelimit.py): each client
+# gets `burst` submissions, refilled evenly over `period` seconds.
+RATE_LIMIT_DB = BASE_DIR / 'ratelimit.sqlite3'
+RATE_LIMITS = {
+    'contact': {'paths': ['/contact/', '/api/contact/'], 'burst': 5, 'period': 60 * 60},
+}
+
+# Contact submissions are spooled here and written to the database in
+# batches (see core/spool.py): once BATCH are waiting or the oldest is
+# MAX_AGE seconds old.
+CONTACT_SPOOL_DB = BASE_DIR / 'contact_spool.sqlite3'
+CONTACT_SPOOL_BATCH = 500
+CONTACT_SPOOL_MAX_AGE = 60
@@ -0,0 +1,99 @@
+import gzip
+import os
+import re
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # .br files are skipped; nginx falls back to .gz
+    brotli = None
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.txt', '.xml', '.json', '.webmanifest', '.ico', '.map')
+MIN_SIZE = 256
+
+# Comments, quoted strings and url() values, in the order a tokenizer meets them.
+CSS_TOKEN_RE = re.compile(r'''(/\*.*?\*/|"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|url\([^)"']*\))''', re.S)
+CSS_SPACE_RE = re.compile(r'\s+')
+CSS_PUNCT_RE = re.compile(r'\s*([{};,>])\s*')
+CSS_COLON_RE = re.compile(r'(?<=[{;])([\w-]+)\s*:\s*')
+
+
+def _minify_chunk(css):
+    css = CSS_SPACE_RE.sub(' ', css)
+    css = CSS_PUNCT_RE.sub(r'\1', css)
+    css = CSS_COLON_RE.sub(r'\1:', css)
+    return css.replace(';}', '}')
+
+
+def minify_css(css):
+    """
+    Conservative CSS minifier: drops comments (except /*! ... */), collapses
+    whitespace and trims it around punctuation. Strings and url() values are
+    left as they are.
+    """
+    out, chunk = [], ''
+    for i, part in enumerate(CSS_TOKEN_RE.split(css)):
+        if i % 2 == 0:
+            chunk += part
+        elif part.startswith('/*') and not part.startswith('/*!'):
+            continue  # dropped; the CSS on both sides is minified as one chunk
+        else:
+            out += [_minify_chunk(chunk), part]
+            chunk = ''
+    out.append(_minify_chunk(chunk))
+    return ''.join(out).strip()
+
+
+def minify_js(js):
+    """
+    Conservative JavaScript minifier: drops indentation, blank lines and
+    whole-line // comments. Line breaks are kept, so automatic semicolon
+    insertion works as before. Files with template literals or backslash
+    line continuations, where leading whitespace can be part of a string,
+    are left as they are.
+    """
+    lines = js.splitlines()
+    if '`' in js or any(line.endswith('\\') for line in lines):
+        return js
+    lines = (line.strip() for line in lines)
+    return '\n'.join(line for line in lines if line and not line.startswith('//')) + '\n'
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    collectstatic storage that, on top of content-hashed file names, minifies
+    CSS and JavaScript and writes pre-compressed .gz and .br siblings of every text asset so
+    nginx can serve them with gzip_static/brotli_static.
+    """
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for hashed_name in set(self.hashed_files.values()):
+            if hashed_name.endswith(COMPRESSIBLE) and self.exists(hashed_name):
+                self._minify_and_compress(hashed_name)
+
+    def _minify_and_compress(self, name):
+        with self.open(name) as f:
+            content = f.read()
+        minify = {'.css': minify_css, '.js': minify_js}.get(os.path.splitext(name)[1])
+        if minify is not None:
+            content = minify(content.decode('utf-8')).encode('utf-8')
+            self.delete(name)
+            self._save(name, ContentFile(content))
+        if len(content) < MIN_SIZE:
+            return
+
+        compressed = {'gz': gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            compressed['br'] = brotli.compress(content, quality=11)
+        for ext, data in compressed.items():
+            if len(data) < len(content):
+                path = f'{name}.{ext}'
+                if self.exists(path):
+                    self.delete(path)
+                self._save(path, ContentFile(data))
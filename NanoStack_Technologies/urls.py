@@ -3,20 +3,14 @@ from django.urls import path,include
 from django.conf import settings
 from django.conf.urls.static import static
 
-from django.contrib.sitemaps.views import sitemap
-from core.sitemaps import StaticViewSitemap, ProjectSitemap, BlogSitemap
+from core import views as core_views
 from django.views.generic.base import TemplateView, RedirectView
 
-sitemaps = {
-    'static': StaticViewSitemap,
-    'projects': ProjectSitemap,
-    'blog': BlogSitemap,
-}
-
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('',include('core.urls')),
-    path('sitemap.xml', sitemap, {'sitemaps': sitemaps}, name='django.contrib.sitemaps.views.sitemap'),
+    path('sitemap.xml', core_views.sitemap_index, name='sitemap_index'),
+    path('sitemap-<slug:section>.xml', core_views.sitemap_section, name='sitemap_section'),
     path('robots.txt', TemplateView.as_view(template_name="robots.txt", content_type="text/plain")),
     path('favicon.ico', RedirectView.as_view(url=settings.STATIC_URL + 'images/Favicon/favicon.ico')),
 ]
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'NanoStack_Technologies.settings')
 
 application = get_wsgi_application()
+
+# Compile every template into the cached loader before the first request.
+from core.deploy import warm_templates  # noqa: E402
+
+warm_templates()
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Project, BlogPost, JobOpening, ContactMessage, Service
+from .models import Project, Tag, BlogPost, BlogPostTag, JobOpening, ContactMessage, SpamRule, Service
 
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
@@ -8,12 +8,23 @@ class ProjectAdmin(admin.ModelAdmin):
     list_filter = ('created_at',)
     prepopulated_fields = {'slug': ('title',)}
 
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug')
+    search_fields = ('name',)
+    prepopulated_fields = {'slug': ('name',)}
+
+class BlogPostTagInline(admin.TabularInline):
+    model = BlogPostTag
+    extra = 1
+
 @admin.register(BlogPost)
 class BlogPostAdmin(admin.ModelAdmin):
-    list_display = ('title', 'author', 'tags', 'created_at')
-    search_fields = ('title', 'content', 'tags')
-    list_filter = ('created_at', 'author')
+    list_display = ('title', 'author', 'created_at')
+    search_fields = ('title', 'content', 'tags__name')
+    list_filter = ('created_at', 'author', 'tags')
     prepopulated_fields = {'slug': ('title',)}
+    inlines = [BlogPostTagInline]
 
 @admin.register(JobOpening)
 class JobOpeningAdmin(admin.ModelAdmin):
@@ -31,6 +42,13 @@ class ContactMessageAdmin(admin.ModelAdmin):
     def has_add_permission(self, request):
         return False
 
+@admin.register(SpamRule)
+class SpamRuleAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'value', 'is_active', 'hit_count', 'last_hit_at')
+    list_filter = ('kind', 'is_active')
+    search_fields = ('value', 'note')
+    readonly_fields = ('hit_count', 'last_hit_at')
+
 @admin.register(Service)
 class ServiceAdmin(admin.ModelAdmin):
     list_display = ('title', 'icon', 'order')
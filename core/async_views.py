@@ -0,0 +1,42 @@
+"""
+Async versions of the public views in core.views, with the same URLs,
+templates and caching. core.urls routes to them when ASYNC_VIEWS is set,
+which NanoStack_Technologies/asgi.py does; under WSGI they would each run
+through async_to_sync, which costs more than they save.
+
+Each one runs the sync view's body in a single thread hop (the async ORM
+would take one per query) under the same decorators, whose cache and
+validator lookups also run off the event loop.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+
+from . import views
+
+
+def async_view(view):
+    """``view`` (a core.views.public_view) as an async view."""
+    @wraps(view.body)
+    async def wrapper(request, *args, **kwargs):
+        return await sync_to_async(view.body)(request, *args, **kwargs)
+    for decorator in reversed(view.decorators):
+        wrapper = decorator(wrapper)
+    return wrapper
+
+
+home = async_view(views.home)
+about = async_view(views.about)
+projects = async_view(views.projects)
+projects_fragment = async_view(views.projects_fragment)
+project_detail = async_view(views.project_detail)
+blog = async_view(views.blog)
+blog_fragment = async_view(views.blog_fragment)
+blog_tag = async_view(views.blog_tag)
+blog_tag_fragment = async_view(views.blog_tag_fragment)
+blog_detail = async_view(views.blog_detail)
+career = async_view(views.career)
+search = async_view(views.search)
+search_api = async_view(views.search_api)
+contact = async_view(views.contact)
+contact_api = async_view(views.contact_api)
@@ -0,0 +1,128 @@
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from . import edge
+
+VERSION_KEY = 'pagecache:version:{}'
+PAGE_KEY = 'pagecache:page:{}:{}'
+HITS_KEY = 'pagecache:hits'
+MISSES_KEY = 'pagecache:misses'
+
+
+def version_key(model):
+    return VERSION_KEY.format(model._meta.label_lower)
+
+
+def get_versions(models):
+    """
+    Returns the current cache version token for each model, creating one
+    the first time a model is seen (or after the cache was cleared).
+    """
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            versions[key] = cache.get_or_set(key, time.time_ns, timeout=None)
+    return [str(versions[key]) for key in keys]
+
+
+def bump_version(model):
+    """Invalidates every cached page that depends on ``model``."""
+    cache.set(version_key(model), time.time_ns(), timeout=None)
+
+
+def _incr(key):
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def get_stats():
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'ratio': hits / total if total else 0.0,
+    }
+
+
+def reset_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
+
+
+def is_cacheable_request(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    user = getattr(request, 'user', None)
+    return not (user and user.is_authenticated)
+
+
+def _lookup(request, models):
+    """Returns (cache key, cached response or None) for ``request``."""
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    key = PAGE_KEY.format(url, '.'.join(get_versions(models)))
+    cached = cache.get(key)
+    if cached is None:
+        _incr(MISSES_KEY)
+        return key, None
+
+    _incr(HITS_KEY)
+    content, content_type = cached
+    response = HttpResponse(content, content_type=content_type)
+    response['X-Page-Cache'] = 'HIT'
+    return key, response
+
+
+def _store(key, response):
+    if response.status_code == 200 and not response.streaming and not response.cookies:
+        cache.set(key, (response.content, response['Content-Type']), settings.PAGE_CACHE_TIMEOUT)
+    response['X-Page-Cache'] = 'MISS'
+
+
+def _should_cache(request):
+    return getattr(settings, 'PAGE_CACHE_ENABLED', True) and is_cacheable_request(request)
+
+
+def cache_public_page(*models):
+    """
+    Caches the rendered page for anonymous GET requests. The cache key
+    embeds the version of every model the page is built from, so saving or
+    deleting one of them (see core.signals) invalidates just those pages.
+    The response is also tagged with ``models`` for the nginx micro-cache
+    (see core.edge). Works on sync and async views; for async ones the file-cache I/O runs
+    in a thread, one hop for the lookup and one for storing a miss.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _async_wrapped(request, *args, **kwargs):
+                if not _should_cache(request):
+                    return edge.tag(await view_func(request, *args, **kwargs), *models)
+                key, response = await sync_to_async(_lookup)(request, models)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                    await sync_to_async(_store)(key, response)
+                return edge.tag(response, *models)
+            return _async_wrapped
+
+        @wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            if not _should_cache(request):
+                return edge.tag(view_func(request, *args, **kwargs), *models)
+            key, response = _lookup(request, models)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+                _store(key, response)
+            return edge.tag(response, *models)
+        return _wrapped
+    return decorator
@@ -0,0 +1,115 @@
+"""
+Validators for conditional GET (ETag / Last-Modified) on the public pages.
+
+They are meant for ``condition`` below and only touch the indexed ``slug`` /
+``updated_at`` columns, so a 304 is answered before any row is loaded or any
+template is rendered. Every ETag includes the deploy version, as base.html's
+chrome changes with each release; Last-Modified only follows the rows.
+"""
+import datetime
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import condition as sync_condition
+
+from . import deploy
+
+
+def _detail_state(request, model, slug, depends_on):
+    # condition() asks for the ETag and Last-Modified separately; memoize on
+    # the request so both come from the same queries.
+    memo = request.__dict__.setdefault('_conditional_memo', {})
+    key = (model, slug)
+    if key not in memo:
+        updated_at = model.objects.filter(slug=slug).values_list('updated_at', flat=True).first()
+        memo[key] = updated_at, (depends_on(slug) if depends_on and updated_at else [])
+    return memo[key]
+
+
+def detail_last_modified(model, depends_on=None):
+    """
+    The row's ``updated_at``, or the newest ``updated_at`` among the rows
+    ``depends_on(slug)`` returns when that is later.
+    """
+    def last_modified_func(request, slug):
+        updated_at, dependencies = _detail_state(request, model, slug, depends_on)
+        if updated_at is None:
+            return None
+        return max([updated_at, *(changed for _, changed in dependencies if changed)])
+    return last_modified_func
+
+
+def detail_etag(model, depends_on=None):
+    """
+    The row's ``updated_at``, the deploy version and the ``(key, updated_at)``
+    pairs ``depends_on(slug)`` returns for the other rows the page shows.
+    """
+    def etag_func(request, slug):
+        updated_at, dependencies = _detail_state(request, model, slug, depends_on)
+        if updated_at is None:
+            return None
+        parts = [f'{updated_at.timestamp():.6f}', deploy.version()]
+        parts += [f'{key}@{changed.timestamp():.6f}' if changed else str(key) for key, changed in dependencies]
+        return f'{model._meta.model_name}-{slug}-' + hashlib.md5(':'.join(parts).encode()).hexdigest()
+    return etag_func
+
+
+def listing_state(*models):
+    """
+    Returns (count, latest updated_at) per model. The count is included so
+    that deleting a row also changes the validator.
+    """
+    return [
+        model.objects.aggregate(total=Count('pk'), latest=Max('updated_at'))
+        for model in models
+    ]
+
+
+def listing_etag(*models):
+    def etag_func(request, *args, **kwargs):
+        parts = [deploy.version()] + [
+            f"{state['total']}-{state['latest'].timestamp() if state['latest'] else 0}"
+            for state in listing_state(*models)
+        ]
+        return hashlib.md5(':'.join(parts).encode()).hexdigest()
+    return etag_func
+
+
+def condition(etag_func=None, last_modified_func=None):
+    """
+    django's condition() for sync views. For async views the validators,
+    which query the database, are computed in a thread instead of on the
+    event loop.
+    """
+    def decorator(view_func):
+        if not iscoroutinefunction(view_func):
+            return sync_condition(etag_func, last_modified_func)(view_func)
+
+        def validators(request, args, kwargs):
+            last_modified = last_modified_func(request, *args, **kwargs) if last_modified_func else None
+            if last_modified:
+                if not timezone.is_aware(last_modified):
+                    last_modified = timezone.make_aware(last_modified, datetime.timezone.utc)
+                last_modified = int(last_modified.timestamp())
+            etag = etag_func(request, *args, **kwargs) if etag_func else None
+            return (quote_etag(etag) if etag is not None else None), last_modified
+
+        @wraps(view_func)
+        async def _wrapped(request, *args, **kwargs):
+            etag, last_modified = await sync_to_async(validators)(request, args, kwargs)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view_func(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD'):
+                if last_modified and not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(last_modified)
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+            return response
+        return _wrapped
+    return decorator
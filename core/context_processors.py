@@ -0,0 +1,5 @@
+from . import deploy
+
+
+def deploy_version(request):
+    return {'DEPLOY_VERSION': deploy.version()}
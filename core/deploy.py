@@ -0,0 +1,51 @@
+"""
+Per-release helpers: the deploy version that keys cached template fragments,
+and loading every template into the cached loader before the first request.
+"""
+import logging
+import subprocess
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def version():
+    """DEPLOY_VERSION, else the git revision, else this worker's start time."""
+    if settings.DEPLOY_VERSION:
+        return settings.DEPLOY_VERSION
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True, timeout=5,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return str(int(time.time()))
+
+
+def template_names():
+    """Names of the project's own templates (``TEMPLATES['DIRS']``)."""
+    names = set()
+    for root in engines['django'].engine.dirs:
+        root = Path(root)
+        names.update(str(path.relative_to(root)) for path in root.rglob('*.html'))
+    return sorted(names)
+
+
+def warm_templates():
+    """Compiles every template into the cached loader; returns how many."""
+    engine = engines['django'].engine
+    loaded = 0
+    for name in template_names():
+        try:
+            engine.get_template(name)
+        except (TemplateDoesNotExist, TemplateSyntaxError):
+            logger.exception("Could not load template %s", name)
+            continue
+        loaded += 1
+    return loaded
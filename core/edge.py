@@ -0,0 +1,142 @@
+"""
+Headers and purging for the nginx micro-cache in front of the public pages.
+
+A view opts its response in with ``tag(response, ...)``, naming the models
+(every row of them, as a listing shows) and instances (one row, as a detail
+page shows) its content comes from. EdgeCacheMiddleware, on the public chain
+only, then marks an anonymous 200 as shareable:
+
+* ``Cache-Control: public, max-age=0, must-revalidate, s-maxage=<ttl>`` so
+  browsers revalidate against the ETag while shared caches keep a copy;
+* ``X-Accel-Expires: <ttl>``, which nginx honours and does not pass on;
+* ``Vary: Accept-Encoding`` (nginx compresses what it serves);
+* ``Cache-Tag: core.blogpost,core.blogpost:12`` for debugging and any CDN
+  that purges by tag.
+
+nginx sends its cache key in ``X-Cache-Key``; the tags of each stored
+response are recorded against that key in ``EDGE_CACHE_INDEX``, a small
+SQLite side database. Stock nginx has no purge endpoint, so ``purge(tags)``
+deletes the cache files of the keys recorded under those tags directly from
+``EDGE_CACHE_DIR`` (the file name is the md5 of the key, spread over the
+``levels`` directories). core.signals purges a saved row's tags once the
+transaction commits, so publishing a post clears the listings, the feeds
+and that post's page, and leaves every other detail page cached.
+"""
+import hashlib
+import logging
+import shutil
+import sqlite3
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.db import models
+from django.utils.cache import patch_vary_headers
+
+from .localdb import connect
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS tagged (tag TEXT NOT NULL, key TEXT NOT NULL, stored REAL NOT NULL, '
+    'PRIMARY KEY (tag, key)) WITHOUT ROWID'
+)
+
+
+def tag_for(item):
+    """``core.blogpost`` for a model, ``core.blogpost:12`` for an instance."""
+    if isinstance(item, models.Model):
+        return f'{item._meta.label_lower}:{item.pk}'
+    return item._meta.label_lower
+
+
+def tags_for(instance):
+    """The tags a change to ``instance`` invalidates."""
+    return {tag_for(type(instance)), tag_for(instance)}
+
+
+def tag(response, *items):
+    """Marks ``response`` as cacheable at the edge, depending on ``items``."""
+    tags = response.__dict__.setdefault('cache_tags', set())
+    tags.update(tag_for(item) for item in items)
+    return response
+
+
+def is_cacheable(request, response):
+    return (
+        request.method in ('GET', 'HEAD')
+        and response.status_code == 200
+        and hasattr(response, 'cache_tags')
+        and not response.cookies
+        and not response.has_header('Cache-Control')
+    )
+
+
+def add_headers(response):
+    ttl = settings.EDGE_CACHE_TTL
+    response['Cache-Control'] = f'public, max-age=0, must-revalidate, s-maxage={ttl}'
+    response['X-Accel-Expires'] = str(ttl)
+    patch_vary_headers(response, ['Accept-Encoding'])
+    if response.cache_tags:
+        response['Cache-Tag'] = ','.join(sorted(response.cache_tags))
+
+
+def record(key, tags):
+    """Remembers that nginx stored ``key`` for each of ``tags``."""
+    now = time.time()
+    try:
+        db = connect(settings.EDGE_CACHE_INDEX, SCHEMA)
+        db.executemany(
+            'INSERT INTO tagged (tag, key, stored) VALUES (?, ?, ?) '
+            'ON CONFLICT(tag, key) DO UPDATE SET stored = excluded.stored',
+            [(t, key, now) for t in tags],
+        )
+    except sqlite3.Error:
+        logger.exception("Could not record edge cache key %s", key)
+
+
+def cache_path(key):
+    """Where nginx keeps the response for ``key`` (see proxy_cache_path levels)."""
+    digest = hashlib.md5(key.encode()).hexdigest()
+    parts, end = [], len(digest)
+    for width in map(int, settings.EDGE_CACHE_LEVELS.split(':')):
+        parts.append(digest[end - width:end])
+        end -= width
+    return Path(settings.EDGE_CACHE_DIR, *parts, digest)
+
+
+def purge(tags):
+    """Deletes every cached response tagged with one of ``tags``; returns the keys."""
+    tags = list(tags)
+    if not tags:
+        return []
+    try:
+        db = connect(settings.EDGE_CACHE_INDEX, SCHEMA)
+        placeholders = ','.join('?' * len(tags))
+        # Anything older than the TTL has expired in nginx anyway.
+        db.execute('DELETE FROM tagged WHERE stored < ?', (time.time() - settings.EDGE_CACHE_TTL,))
+        keys = [row[0] for row in db.execute(
+            f'SELECT DISTINCT key FROM tagged WHERE tag IN ({placeholders})', tags
+        )]
+        for key in keys:
+            cache_path(key).unlink(missing_ok=True)
+        db.executemany('DELETE FROM tagged WHERE key = ?', [(key,) for key in keys])
+    except (sqlite3.Error, OSError):
+        logger.exception("Edge cache purge failed for %s", ', '.join(tags))
+        return []
+    return keys
+
+
+def purge_all():
+    """Empties the edge cache, e.g. after a deploy changed the templates."""
+    root = Path(settings.EDGE_CACHE_DIR)
+    if root.is_dir():
+        for child in root.iterdir():
+            if child.is_dir():
+                shutil.rmtree(child, ignore_errors=True)
+            else:
+                child.unlink(missing_ok=True)
+    try:
+        connect(settings.EDGE_CACHE_INDEX, SCHEMA).execute('DELETE FROM tagged')
+    except sqlite3.Error:
+        logger.exception("Could not clear the edge cache index")
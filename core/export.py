@@ -0,0 +1,205 @@
+"""
+Static export of the public site, for nginx to serve without Django.
+
+``manage.py export_site`` renders every URL in the sitemaps into
+``SITE_EXPORT_ROOT/<path>/index.html`` (plus a ``.gz`` sibling for
+gzip_static), calling the views directly as an anonymous request to
+``SITEMAP_DOMAIN`` would. Only responses a view tags for shared caching (see
+core.edge) are written; the contact page and anything else that depends on
+the visitor is left to Django.
+
+``.manifest.json`` holds the edge-cache tags of every exported page. Once it
+exists, core.signals collects the tags of each saved row and
+``export_changed`` re-renders only the pages carrying one of them, writes
+pages new to the sitemaps and deletes pages that left them. That happens
+after the response has been sent, or, for saves outside a request (shell,
+management commands, loaddata), once the transaction commits. nginx_config
+``try_files`` the export first and falls back to Django.
+"""
+import fcntl
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
+from django.test import RequestFactory
+from django.urls import resolve
+
+from . import edge
+from .sitemaps import SITEMAPS, public_urlconf
+
+MANIFEST = '.manifest.json'
+
+# Tags changed by this request, exported once its response has been sent.
+_pending = ContextVar('export_pending', default=None)
+_in_request = ContextVar('export_in_request', default=False)
+
+
+def _root():
+    return Path(settings.SITE_EXPORT_ROOT)
+
+
+def is_enabled():
+    return (_root() / MANIFEST).exists()
+
+
+def sitemap_paths():
+    paths = []
+    for sitemap in SITEMAPS.values():
+        sitemap = sitemap()
+        paths.extend(sitemap.location(item) for item in sitemap.items())
+    return paths
+
+
+def file_path(path):
+    return _root() / path.strip('/') / 'index.html'
+
+
+def render(path):
+    """Returns (HTML, tags) for ``path``, or None if Django must serve it."""
+    request = RequestFactory().get(
+        path, HTTP_HOST=settings.SITEMAP_DOMAIN, secure=settings.SITEMAP_PROTOCOL == 'https',
+    )
+    match = resolve(path)
+    view = async_to_sync(match.func) if iscoroutinefunction(match.func) else match.func
+    try:
+        response = view(request, *match.args, **match.kwargs)
+    except Http404:
+        return None
+    if not edge.is_cacheable(request, response):
+        return None
+    return response.content, response.cache_tags
+
+
+def _write(target, data):
+    fd, tmp = tempfile.mkstemp(dir=target.parent, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, target)
+
+
+def _save(path, content):
+    target = file_path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    _write(target, content)
+    _write(target.with_name('index.html.gz'), gzip.compress(content, 9, mtime=0))
+
+
+def _remove(path):
+    target = file_path(path)
+    target.unlink(missing_ok=True)
+    target.with_name('index.html.gz').unlink(missing_ok=True)
+
+
+@contextmanager
+def _manifest():
+    """Yields the manifest (None before the first export) and saves it, under a lock."""
+    root = _root()
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / '.lock', 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            try:
+                manifest = json.loads((root / MANIFEST).read_text())
+            except FileNotFoundError:
+                manifest = None
+            state = {'manifest': manifest}
+            yield state
+            if state['manifest'] is not None:
+                _write(root / MANIFEST, json.dumps(state['manifest'], indent=1, sort_keys=True).encode())
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _export(manifest, current, paths):
+    """Renders ``paths`` and drops pages not in ``current``; returns (written, removed)."""
+    written = 0
+    for path in paths:
+        rendered = render(path)
+        if rendered is None:
+            _remove(path)
+            manifest[path] = None  # served by Django; not retried on every change
+            continue
+        content, tags = rendered
+        _save(path, content)
+        manifest[path] = sorted(tags)
+        written += 1
+    gone = set(manifest) - set(current)
+    for path in gone:
+        _remove(path)
+        del manifest[path]
+    return written, len(gone)
+
+
+def export_all():
+    """Renders every sitemap URL. Returns (pages written, pages removed)."""
+    with _manifest() as state, public_urlconf():
+        state['manifest'] = state['manifest'] or {}
+        current = sitemap_paths()
+        return _export(state['manifest'], current, current)
+
+
+def export_changed(tags):
+    """
+    Re-renders exported pages tagged with one of ``tags`` and pages new to
+    the sitemaps. Does nothing until ``export_all`` has run once.
+    """
+    # Also runs once an admin-host response is sent, with its urlconf set.
+    with _manifest() as state, public_urlconf():
+        manifest = state['manifest']
+        if manifest is None:
+            return 0, 0
+        tags = set(tags)
+        current = sitemap_paths()
+        stale = [path for path in current if path not in manifest or tags & set(manifest[path] or ())]
+        return _export(manifest, current, stale)
+
+
+def clear():
+    """Deletes the export, so nginx passes every page to Django again."""
+    shutil.rmtree(_root(), ignore_errors=True)
+
+
+def begin_request():
+    _in_request.set(True)
+
+
+def pages_changed(tags):
+    """
+    Queues ``tags`` for export_changed() at the end of this request or,
+    outside a request, when the current transaction commits.
+    """
+    if not is_enabled():
+        return
+    pending = _pending.get()
+    if pending is None:
+        pending = set()
+        _pending.set(pending)
+    pending.update(tags)
+    if not _in_request.get():
+        connection = transaction.get_connection()
+        if not any(func == _export_pending for _, func, _ in connection.run_on_commit):
+            transaction.on_commit(_export_pending)
+
+
+def _export_pending():
+    tags = take_pending()
+    if tags:
+        export_changed(tags)
+
+
+def take_pending():
+    """Returns the queued tags and ends the request."""
+    pending = _pending.get()
+    _pending.set(None)
+    _in_request.set(False)
+    return pending or set()
@@ -0,0 +1,113 @@
+"""
+RSS and Atom feeds for the blog, for all posts or a single tag.
+
+A rendered feed is written once to ``FEED_ROOT`` under a name that includes
+the blog's page-cache version (see core.cache), so it is reused until the next
+BlogPost save and then regenerated. The XML is written straight to disk and
+streamed back with FileResponse, so it is never held in memory as one string.
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.http import FileResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+
+from . import edge
+from .cache import get_versions
+from .models import BlogPost, Tag
+
+
+class LatestPostsFeed(Feed):
+    name = 'rss'
+    description = "Insights, updates, and tech trends from the NanoStack team."
+
+    def get_object(self, request, slug=None):
+        return get_object_or_404(Tag, slug=slug) if slug else None
+
+    def title(self, tag):
+        if tag:
+            return f"#{tag.name} | NanoStack Technologies Blog"
+        return "NanoStack Technologies Blog"
+
+    def link(self, tag):
+        return reverse('blog_tag', args=[tag.slug]) if tag else reverse('blog')
+
+    def items(self, tag):
+        posts = tag.posts.all() if tag else BlogPost.objects.all()
+        return (
+            posts.defer('content', 'rendered_content', 'toc')
+            .prefetch_related('tags')
+            .order_by('-created_at', '-id')[:settings.FEED_MAX_ITEMS]
+        )
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_link(self, item):
+        return reverse('blog_detail', args=[item.slug])
+
+    def item_author_name(self, item):
+        return item.author
+
+    def item_pubdate(self, item):
+        return item.created_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_categories(self, item):
+        return [tag.name for tag in item.tags.all()]
+
+    def __call__(self, request, *args, **kwargs):
+        version = get_versions([BlogPost])[0]
+        host = hashlib.md5(f'{request.scheme}://{request.get_host()}'.encode()).hexdigest()[:8]
+        # Tag feeds get their own namespace, so a tag slugged "all" does not
+        # share a file with the feed of every post.
+        scope = f"tag-{kwargs['slug']}" if 'slug' in kwargs else 'all'
+        prefix = f"{self.name}-{scope}-{host}"
+        path = Path(settings.FEED_ROOT) / f'{prefix}-{version}.xml'
+        etag = quote_etag(f'{prefix}-{version}')
+
+        if path.exists():
+            mtime = int(path.stat().st_mtime)
+            not_modified = get_conditional_response(request, etag=etag, last_modified=mtime)
+            if not_modified is not None:
+                return not_modified
+        else:
+            feed = self.get_feed(self.get_object(request, *args, **kwargs), request)
+            self._write(path, prefix, feed)
+            mtime = int(path.stat().st_mtime)
+
+        response = FileResponse(open(path, 'rb'), content_type=self.feed_type.content_type)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(mtime)
+        return edge.tag(response, BlogPost)
+
+    def _write(self, path, prefix, feed):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            feed.write(f, 'utf-8')
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+        # Remove feeds rendered for earlier versions of the blog.
+        for stale in path.parent.glob(f'{prefix}-*.xml'):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+
+
+class AtomPostsFeed(LatestPostsFeed):
+    name = 'atom'
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
@@ -0,0 +1,94 @@
+"""
+Responsive derivatives for uploaded images (Project.image, BlogPost.image).
+
+Each source is resized to a few widths and encoded as AVIF/WebP with a JPEG
+fallback under ``MEDIA_ROOT/derived/<content hash>/``, so re-uploading the
+same file reuses the existing files and browsers can cache them forever. A
+tiny blurred JPEG is inlined as a placeholder while the real image loads.
+The result is stored on the model as a small manifest read by the
+``responsive_image`` template tag.
+"""
+import base64
+import hashlib
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageFilter, ImageOps, features
+
+WIDTHS = (320, 640, 960, 1280, 1920)
+QUALITY = {'avif': 55, 'webp': 75, 'jpeg': 80}
+LQIP_WIDTH = 24
+DERIVED_DIR = 'derived'
+
+
+def available_formats():
+    formats = [fmt for fmt in ('avif', 'webp') if features.check(fmt)]
+    return formats + ['jpeg']
+
+
+def derivative_name(digest, width, fmt):
+    ext = 'jpg' if fmt == 'jpeg' else fmt
+    return f'{DERIVED_DIR}/{digest}/{width}.{ext}'
+
+
+def _flatten(img):
+    if img.mode in ('RGBA', 'LA', 'P'):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel('A'))
+        return background
+    return img.convert('RGB')
+
+
+def _encode(img, fmt, **options):
+    buffer = BytesIO()
+    if fmt == 'jpeg':
+        img = _flatten(img)
+        options.setdefault('progressive', True)
+    img.save(buffer, fmt.upper(), **options)
+    return buffer.getvalue()
+
+
+def build_variants(image_file):
+    """
+    Generates the missing derivatives of ``image_file`` (a FieldFile, committed
+    or freshly uploaded) and returns the manifest stored on the model.
+    """
+    image_file.open('rb')
+    try:
+        data = image_file.read()
+    finally:
+        image_file.seek(0)
+    digest = hashlib.sha256(data).hexdigest()[:20]
+
+    with Image.open(BytesIO(data)) as source:
+        img = ImageOps.exif_transpose(source)
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if 'A' in img.getbands() or img.mode == 'P' else 'RGB')
+        width, height = img.size
+
+        widths = [w for w in WIDTHS if w < width] + [min(width, WIDTHS[-1])]
+        formats = available_formats()
+        for w in widths:
+            resized = None
+            for fmt in formats:
+                name = derivative_name(digest, w, fmt)
+                if default_storage.exists(name):
+                    continue
+                if resized is None:
+                    resized = img if w == width else img.resize((w, max(1, round(height * w / width))), Image.LANCZOS)
+                default_storage.save(name, ContentFile(_encode(resized, fmt, quality=QUALITY[fmt])))
+
+        tiny = img.resize((LQIP_WIDTH, max(1, round(height * LQIP_WIDTH / width))), Image.BILINEAR)
+        tiny = tiny.filter(ImageFilter.GaussianBlur(1))
+        lqip = base64.b64encode(_encode(tiny, 'jpeg', quality=40, progressive=False)).decode()
+
+    return {
+        'hash': digest,
+        'width': width,
+        'height': height,
+        'widths': widths,
+        'formats': formats,
+        'lqip': f'data:image/jpeg;base64,{lqip}',
+    }
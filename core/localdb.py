@@ -0,0 +1,23 @@
+"""
+Small SQLite side databases (rate-limit buckets, the contact spool) that are
+shared by all workers on this machine but kept out of the site database so
+they never contend for its write lock.
+"""
+import sqlite3
+import threading
+
+_local = threading.local()
+
+
+def connect(path, schema):
+    """Returns this thread's autocommit connection to ``path`` (WAL mode)."""
+    path = str(path)
+    connections = _local.__dict__.setdefault('connections', {})
+    db = connections.get(path)
+    if db is None:
+        db = sqlite3.connect(path, timeout=2, isolation_level=None)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        db.execute(schema)
+        connections[path] = db
+    return db
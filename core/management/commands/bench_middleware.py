@@ -0,0 +1,55 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from core.cache import is_cacheable_request
+from NanoStack_Technologies.middleware import SubdomainRoutingMiddleware
+
+
+def public_view(request):
+    # What the cached public views do before serving a page.
+    is_cacheable_request(request)
+    return HttpResponse('ok')
+
+
+class Command(BaseCommand):
+    help = 'Measures per-request middleware overhead of the public chain against the full chain.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20_000)
+
+    def handle(self, *args, **options):
+        router = SubdomainRoutingMiddleware(public_view)
+        factory = RequestFactory(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+
+        session = SessionStore()
+        session['visited'] = True
+        session.create()
+        cookie = {settings.SESSION_COOKIE_NAME: session.session_key}
+        try:
+            self.stdout.write(f"{'visitor':<24}{'full':>12}{'public':>12}{'saved':>12}")
+            for label, cookies in (('anonymous', {}), ('with session cookie', cookie)):
+                full = self._time(options['requests'], router.full_chain, factory, cookies)
+                public = self._time(options['requests'], router.public_chain, factory, cookies)
+                self.stdout.write(
+                    f'{label:<24}{full * 1e6:>10.1f}us{public * 1e6:>10.1f}us{(full - public) * 1e6:>10.1f}us'
+                )
+        finally:
+            session.delete()
+
+        self.stdout.write('\nMedian time per GET / through each chain with a trivial view.')
+
+    def _time(self, count, chain, factory, cookies):
+        samples = []
+        for _ in range(count):
+            request = factory.get('/')
+            request.COOKIES.update(cookies)
+            started = time.perf_counter()
+            chain(request)
+            samples.append(time.perf_counter() - started)
+        return statistics.median(samples)
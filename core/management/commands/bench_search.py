@@ -0,0 +1,87 @@
+import random
+import sqlite3
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.search import CREATE_SQL, SEARCH_SQL, TABLE, build_match_query
+
+WORDS = """
+    python django react automation api cloud docker kubernetes postgres sqlite cache
+    performance latency scaling frontend backend database query index search design
+    mobile flutter android ios payments security testing deploy nginx gunicorn server
+    analytics dashboard machine learning model data pipeline workflow integration crm
+    ecommerce startup agency client project invoice report chart realtime websocket
+""".split()
+
+QUERIES = ['python', 'django cache', 'autom', 'kubernetes deploy', 'machine learning pipeline', 'realt']
+SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ze', 'pa', 'qu', 'dor', 'len', 'mar', 'tis']
+
+
+def build_vocabulary(rng, size=20_000):
+    # Filler words with a Zipf-like distribution, so the topic words above
+    # behave like real, comparatively rare terms.
+    filler = {''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(size)}
+    vocabulary = sorted(filler) + WORDS
+    weights = [1 / (rank + 1) for rank in range(len(filler))] + [0.002] * len(WORDS)
+    return vocabulary, weights
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks FTS5 search against a LIKE scan on a synthetic in-memory corpus.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--docs', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        db = sqlite3.connect(':memory:')
+        db.execute(CREATE_SQL)
+        db.execute('CREATE TABLE plain (title TEXT, body TEXT)')
+
+        self.stdout.write(f"Generating {options['docs']:,} documents...")
+        vocabulary, weights = build_vocabulary(rng)
+        docs = [
+            (
+                ' '.join(rng.choices(vocabulary, weights, k=6)),
+                ' '.join(rng.choices(vocabulary, weights, k=rng.randint(150, 600))),
+            )
+            for _ in range(options['docs'])
+        ]
+        started = time.perf_counter()
+        db.executemany(
+            f"INSERT INTO {TABLE} (kind, object_id, slug, title, body) VALUES ('blog', ?, '', ?, ?)",
+            ((i, title, body) for i, (title, body) in enumerate(docs)),
+        )
+        db.execute(f"INSERT INTO {TABLE}({TABLE}) VALUES ('optimize')")
+        self.stdout.write(f'FTS5 index built in {time.perf_counter() - started:.1f}s')
+        db.executemany('INSERT INTO plain VALUES (?, ?)', docs)
+        del docs
+
+        fts_sql = SEARCH_SQL.replace('%s', '?')
+        self.stdout.write(f"\n{'query':<28}{'fts5 p50':>12}{'like p50':>12}{'speedup':>10}")
+        for query in QUERIES:
+            fts = self._time(options['repeat'], lambda: db.execute(fts_sql, [build_match_query(query), 20]).fetchall())
+            terms = query.split()
+            like_sql = 'SELECT title FROM plain WHERE ' + ' AND '.join(
+                '(title LIKE ? OR body LIKE ?)' for _ in terms
+            )
+            params = [p for term in terms for p in (f'%{term}%', f'%{term}%')]
+            like = self._time(max(1, options['repeat'] // 5), lambda: db.execute(like_sql, params).fetchall())
+            self.stdout.write(f'{query:<28}{fts * 1000:>10.2f}ms{like * 1000:>10.2f}ms{like / fts:>9.1f}x')
+
+        self.stdout.write(
+            '\nfts5 returns the 20 best matches by bm25 with snippets; '
+            'like is the unranked icontains scan a naive search would run.'
+        )
+
+    def _time(self, repeat, func):
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - started)
+        return statistics.median(samples)
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SERVERS = {
+    'sync': ['NanoStack_Technologies.wsgi:application'],
+    'uvicorn': ['--worker-class', 'uvicorn_worker.UvicornWorker', 'NanoStack_Technologies.asgi:application'],
+}
+PATHS = ['/', '/projects/', '/blog/', '/career/', '/search/?q=django']
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for(port, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+async def fetch(port, host, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n'.encode())
+    await writer.drain()
+    status = (await reader.readline()).split()[1]
+    await reader.read()
+    writer.close()
+    return status == b'200'
+
+
+async def load(port, host, concurrency, duration):
+    """``concurrency`` clients requesting PATHS in turn for ``duration`` seconds."""
+    latencies, errors = [], 0
+    deadline = time.monotonic() + duration
+
+    async def client(n):
+        nonlocal errors
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                ok = await fetch(port, host, PATHS[n % len(PATHS)])
+            except OSError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+            n += 1
+
+    await asyncio.gather(*(client(n) for n in range(concurrency)))
+    return latencies, errors
+
+
+class Command(BaseCommand):
+    help = 'Compares concurrent throughput of gunicorn sync workers and uvicorn workers on the public pages.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=3)
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 50, 200])
+        parser.add_argument('--duration', type=float, default=10, help='Seconds per concurrency level.')
+
+    def handle(self, *args, **options):
+        gunicorn = os.path.join(os.path.dirname(sys.executable), 'gunicorn')
+        if not os.path.exists(gunicorn):
+            raise CommandError('gunicorn is not installed in this environment.')
+        host = settings.ALLOWED_HOSTS[0]
+
+        self.stdout.write(f"{options['workers']} workers, {options['duration']:g}s per level, "
+                          f"cycling {', '.join(PATHS)}\n")
+        self.stdout.write(f"{'server':<10}{'clients':>8}{'req/s':>10}{'p50':>10}{'p99':>10}{'errors':>8}")
+        for name, target in SERVERS.items():
+            port = free_port()
+            server = subprocess.Popen(
+                [gunicorn, '--workers', str(options['workers']), '--bind', f'127.0.0.1:{port}', *target],
+                cwd=settings.BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                if not wait_for(port):
+                    raise CommandError(f'{name} server did not start (is uvicorn-worker installed?).')
+                asyncio.run(load(port, host, 5, 1))  # warm the workers and page cache
+                for concurrency in options['concurrency']:
+                    latencies, errors = asyncio.run(load(port, host, concurrency, options['duration']))
+                    latencies.sort()
+                    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+                    self.stdout.write(
+                        f'{name:<10}{concurrency:>8}{len(latencies) / options["duration"]:>10.0f}'
+                        f'{statistics.median(latencies or [0]) * 1000:>8.1f}ms{p99 * 1000:>8.1f}ms{errors:>8}'
+                    )
+            finally:
+                server.terminate()
+                server.wait()
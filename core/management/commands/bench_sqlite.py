@@ -0,0 +1,124 @@
+import multiprocessing
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from contextlib import closing
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connections, transaction
+from django.db.models import Count, F
+
+from core.models import BlogPost, ContactMessage, Service, Tag
+
+# The settings.DATABASES profile against a bare sqlite3 backend (rollback
+# journal, a new connection per request, default transactions).
+PROFILES = ('bare', 'tuned')
+# journal_mode is saved in the file (see migration core.0020), not set per connection.
+JOURNAL_MODES = {'bare': 'DELETE', 'tuned': 'WAL'}
+
+
+def _use_profile(profile, db_path):
+    db = connections['default']
+    db.close()
+    db.settings_dict['NAME'] = db_path
+    if profile == 'bare':
+        db.settings_dict.update(CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False, OPTIONS={})
+
+
+def read_page():
+    # Roughly what rendering the blog listing asks of the database.
+    list(BlogPost.objects.defer('content').order_by('-created_at', '-id')[:10])
+    list(Tag.objects.annotate(post_count=Count('posts')).filter(post_count__gt=0))
+    list(Service.objects.order_by('order'))
+
+
+def write_message():
+    ContactMessage.objects.create(name='Bench', email='bench@example.com', subject='Bench',
+                                  message='Benchmarking concurrent writes.')
+
+
+def admin_save():
+    # An admin edit: read the row, then write it back in one transaction.
+    with transaction.atomic():
+        service = Service.objects.order_by('?').first()
+        Service.objects.filter(pk=service.pk).update(order=F('order'))
+
+
+ROLES = {'reader': read_page, 'writer': write_message, 'admin': admin_save}
+
+
+def worker(profile, db_path, role, duration, results):
+    """Runs ``role`` as one request after another for ``duration`` seconds."""
+    _use_profile(profile, db_path)
+    operation = ROLES[role]
+    latencies, locked = [], 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        close_old_connections()  # request_started
+        try:
+            operation()
+        except OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            locked += 1
+        close_old_connections()  # request_finished
+        latencies.append(time.perf_counter() - started)
+    connections['default'].close()
+    results.put((role, latencies, locked))
+
+
+class Command(BaseCommand):
+    help = 'Compares the tuned SQLite connection profile with bare defaults under concurrent readers and writers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=6)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--admins', type=int, default=1)
+        parser.add_argument('--duration', type=float, default=10, help='Seconds per profile.')
+
+    def handle(self, *args, **options):
+        ctx = multiprocessing.get_context('fork')
+        source = connections['default'].settings_dict['NAME']
+        connections.close_all()
+        roles = ['reader'] * options['readers'] + ['writer'] * options['writers'] + ['admin'] * options['admins']
+
+        self.stdout.write(f"{options['readers']} readers, {options['writers']} writers, {options['admins']} admin, "
+                          f"{options['duration']:g}s per profile, each operation is one request\n")
+        self.stdout.write(f"{'profile':<8}{'role':<8}{'ops/s':>10}{'p50':>10}{'p99':>10}{'locked':>8}")
+        for profile in PROFILES:
+            with tempfile.TemporaryDirectory() as tmp:
+                db_path = str(Path(tmp) / 'db.sqlite3')
+                shutil.copyfile(source, db_path)
+                with closing(sqlite3.connect(db_path)) as db:
+                    db.execute(f'PRAGMA journal_mode={JOURNAL_MODES[profile]}')
+                results = ctx.Queue()
+                processes = [
+                    ctx.Process(target=worker, args=(profile, db_path, role, options['duration'], results))
+                    for role in roles
+                ]
+                for process in processes:
+                    process.start()
+                by_role = {}
+                for _ in processes:
+                    role, latencies, locked = results.get()
+                    stats = by_role.setdefault(role, [[], 0])
+                    stats[0] += latencies
+                    stats[1] += locked
+                for process in processes:
+                    process.join()
+
+            for role in ROLES:
+                if role not in by_role:
+                    continue
+                latencies, locked = by_role[role]
+                latencies.sort()
+                p99 = latencies[int(len(latencies) * 0.99) - 1]
+                self.stdout.write(
+                    f'{profile:<8}{role:<8}{len(latencies) / options["duration"]:>10.0f}'
+                    f'{statistics.median(latencies) * 1000:>8.2f}ms{p99 * 1000:>8.2f}ms{locked:>8}'
+                )
+        connections['default'].settings_dict['NAME'] = source
@@ -0,0 +1,66 @@
+import statistics
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.template.base import Template
+from django.test import Client, override_settings
+
+from core.deploy import warm_templates
+from core.models import BlogPost, Project
+
+NO_FRAGMENTS = {**settings.CACHES, 'fragments': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+class Command(BaseCommand):
+    help = 'Measures render time of each public page template with and without the cached base.html fragments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Renders per page and mode.')
+
+    def handle(self, *args, **options):
+        urls = ['/', '/about/', '/projects/', '/blog/', '/career/', '/contact/', '/search/?q=django']
+        post = BlogPost.objects.only('slug').first()
+        project = Project.objects.only('slug').first()
+        if post:
+            urls.append(f'/blog/{post.slug}/')
+        if project:
+            urls.append(f'/projects/{project.slug}/')
+
+        started = time.perf_counter()
+        loaded = warm_templates()
+        self.stdout.write(f'Warmed {loaded} templates in {(time.perf_counter() - started) * 1000:.0f}ms\n')
+
+        timings = {}
+        original_render = Template._render
+
+        def timed_render(template, context):
+            t = time.perf_counter()
+            try:
+                return original_render(template, context)
+            finally:
+                # Pages extend base.html, so the outermost template's time is the whole render.
+                if context.template is template:
+                    timings[mode][template.name].append(time.perf_counter() - t)
+
+        Template._render = timed_render
+        try:
+            with override_settings(PAGE_CACHE_ENABLED=False, ALLOWED_HOSTS=['*']):
+                for mode, caches_setting in (('full', NO_FRAGMENTS), ('fragments', settings.CACHES)):
+                    timings[mode] = defaultdict(list)
+                    with override_settings(CACHES=caches_setting):
+                        caches['fragments'].clear()
+                        client = Client()
+                        for url in urls:
+                            for _ in range(options['requests']):
+                                client.get(url)
+        finally:
+            Template._render = original_render
+
+        self.stdout.write(f"{'template':<30}{'full':>10}{'fragments':>12}{'saved':>10}")
+        for name in sorted(timings['full']):
+            full = statistics.median(timings['full'][name])
+            cached = statistics.median(timings['fragments'].get(name) or [full])
+            self.stdout.write(f'{name:<30}{full * 1e6:>8.0f}us{cached * 1e6:>10.0f}us{(full - cached) / full:>10.0%}')
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import sitemap_files
+from core.sitemaps import SITEMAPS
+
+
+class Command(BaseCommand):
+    help = 'Writes the sitemap index and section files to SITEMAP_ROOT.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('sections', nargs='*', help='Only rebuild these sections (default: all).')
+
+    def handle(self, *args, **options):
+        sections = options['sections']
+        unknown = set(sections) - set(SITEMAPS)
+        if unknown:
+            raise CommandError(f"Unknown sitemap section(s): {', '.join(sorted(unknown))}")
+        if sections:
+            for section in sections:
+                sitemap_files.write_section(section)
+        else:
+            sitemap_files.write_all()
+        self.stdout.write(self.style.SUCCESS(f'Sitemaps written to {settings.SITEMAP_ROOT}'))
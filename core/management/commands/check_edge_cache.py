@@ -0,0 +1,144 @@
+import pickle
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_started
+from django.db import connections
+from django.test import Client, override_settings
+
+from core import edge
+from core.models import BlogPost, Project, RelatedPost
+
+LOCMEM = {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+
+
+class StandInCache:
+    """
+    What ``location /`` in nginx_config does, in process: the same cache key
+    and X-Cache-Key header, responses stored only when Django sends
+    X-Accel-Expires (and no cookie), under the same file names, so
+    core.edge.purge() removes them exactly as it would nginx's.
+    """
+
+    def __init__(self, host):
+        self.host = host
+        self.client = Client()
+        self.calls = 0
+        request_started.connect(self._count)
+
+    def _count(self, **kwargs):
+        self.calls += 1
+
+    def close(self):
+        request_started.disconnect(self._count)
+
+    def get(self, path):
+        """Returns (HIT or MISS, number of requests Django handled, response tags)."""
+        key = f'http{self.host}{path}'
+        file = edge.cache_path(key)
+        if file.exists():
+            expires, tags = pickle.loads(file.read_bytes())[:2]
+            if expires > time.time():
+                return 'HIT', 0, tags
+        calls = self.calls
+        response = self.client.get(path, headers={'Host': self.host, 'X-Cache-Key': key})
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        tags = set(filter(None, response.get('Cache-Tag', '').split(',')))
+        if response.status_code == 200 and response.has_header('X-Accel-Expires') and not response.cookies:
+            file.parent.mkdir(parents=True, exist_ok=True)
+            expires = time.time() + int(response['X-Accel-Expires'])
+            file.write_bytes(pickle.dumps((expires, tags, body)))
+        return 'MISS', self.calls - calls, tags
+
+
+def _copy_database(target):
+    source = sqlite3.connect(str(settings.DATABASES['default']['NAME']))
+    copy = sqlite3.connect(target)
+    try:
+        source.backup(copy)
+    finally:
+        copy.close()
+        source.close()
+
+
+class Command(BaseCommand):
+    help = ('Checks the nginx micro-cache setup against a stand-in cache: repeat requests never reach Django, '
+            'and publishing a post purges only the pages that show it. Runs on a copy of the database.')
+
+    def handle(self, *args, **options):
+        # A post with related posts of its own: a new post must leave its page cached.
+        link = RelatedPost.objects.select_related('post').first()
+        post = link.post if link else BlogPost.objects.first()
+        project = Project.objects.only('slug').first()
+        if post is None or project is None:
+            raise CommandError('Needs at least one blog post and one project.')
+        host = settings.ALLOWED_HOSTS[0]
+        pages = ['/', '/about/', '/projects/', f'/projects/{project.slug}/', '/blog/', '/blog/feed/rss/',
+                 f'/blog/{post.slug}/', '/career/', '/contact/', '/search/?q=django']
+
+        db = connections['default']
+        replica = connections['replica']
+        original = db.settings_dict['NAME'], replica.settings_dict['NAME']
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            _copy_database(tmp / 'db.sqlite3')
+            connections.close_all()
+            db.settings_dict['NAME'] = str(tmp / 'db.sqlite3')
+            replica.settings_dict['NAME'] = f"file:{tmp / 'replica.sqlite3'}?mode=ro&immutable=1"
+            sandbox = override_settings(
+                CACHES={'default': LOCMEM, 'fragments': LOCMEM}, REPLICA_DB=tmp / 'replica.sqlite3',
+                SITEMAP_ROOT=tmp / 'sitemaps', FEED_ROOT=tmp / 'feeds',
+                EDGE_CACHE_DIR=tmp / 'edge', EDGE_CACHE_INDEX=tmp / 'edge.sqlite3', SITE_EXPORT_ROOT=tmp / 'site',
+            )
+            try:
+                with sandbox:
+                    failures = self.run_checks(StandInCache(host), pages, post, link)
+            finally:
+                connections.close_all()
+                db.settings_dict['NAME'], replica.settings_dict['NAME'] = original
+
+        if failures:
+            raise CommandError('\n'.join(failures))
+        self.stdout.write(self.style.SUCCESS('Cached pages bypass Django; publishing purged only the affected pages.'))
+
+    def run_checks(self, cache, pages, post, link):
+        failures = []
+        try:
+            first = {page: cache.get(page) for page in pages}
+            second = {page: cache.get(page) for page in pages}
+            new_post = BlogPost.objects.create(
+                title='Edge cache check', content='<p>Checking the edge cache.</p>',
+                image=post.image.name, image_variants=post.image_variants,
+            )
+            purged = edge.tags_for(new_post)
+            after = {page: cache.get(page) for page in pages}
+            new_post.delete()
+        finally:
+            cache.close()
+
+        self.stdout.write(f"{'page':<50}{'first':>8}{'repeat':>8}{'publish':>9}  tags")
+        for page in pages:
+            self.stdout.write(f'{page:<50}{first[page][0]:>8}{second[page][0]:>8}{after[page][0]:>9}  '
+                              f"{','.join(sorted(first[page][2])) or '-'}")
+            status, calls, tags = second[page]
+            if page in ('/contact/', '/search/?q=django'):
+                if status == 'HIT':
+                    failures.append(f'{page} must not be cached.')
+                continue
+            if status != 'HIT' or calls:
+                failures.append(f'{page} repeat request reached Django.')
+            expected = 'MISS' if tags & purged else 'HIT'
+            if after[page][0] != expected:
+                failures.append(f'{page} was {after[page][0]} after publishing, expected {expected}.')
+        for page in ('/', '/blog/', '/blog/feed/rss/'):
+            if after[page][0] != 'MISS':
+                failures.append(f'{page} still served the old copy after publishing.')
+        unrelated = ['/career/', '/about/'] + ([f'/blog/{post.slug}/'] if link else [])
+        for page in unrelated:
+            if after[page][0] != 'HIT':
+                failures.append(f'{page} was purged by an unrelated post.')
+        return failures
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import export
+
+
+class Command(BaseCommand):
+    help = 'Renders every public page in the sitemaps to SITE_EXPORT_ROOT for nginx to serve directly.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tags', nargs='+', help='Only re-render pages with these edge-cache tags (e.g. core.blogpost:12).')
+        parser.add_argument('--clear', action='store_true', help='Delete the export; nginx falls back to Django.')
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            export.clear()
+            self.stdout.write(self.style.SUCCESS('Export deleted.'))
+            return
+        started = time.perf_counter()
+        if options['tags']:
+            written, removed = export.export_changed(options['tags'])
+        else:
+            written, removed = export.export_all()
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {written} pages, removed {removed} in {(time.perf_counter() - started) * 1000:.0f}ms.'
+        ))
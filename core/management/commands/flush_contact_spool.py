@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import spool
+
+
+class Command(BaseCommand):
+    help = 'Writes spooled contact messages to the database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', type=float, metavar='SECONDS',
+                            help='Keep running, flushing every SECONDS.')
+
+    def handle(self, *args, **options):
+        while True:
+            written = spool.flush(block=True)
+            if written or not options['loop']:
+                self.stdout.write(f'Flushed {written} messages, {spool.pending()} pending.')
+            if not options['loop']:
+                return
+            time.sleep(options['loop'])
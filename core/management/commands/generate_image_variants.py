@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.images import build_variants
+from core.models import Project, BlogPost
+
+
+class Command(BaseCommand):
+    help = 'Generates responsive image derivatives for existing project and blog images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild manifests that already exist.')
+
+    def handle(self, *args, **options):
+        for model in (Project, BlogPost):
+            built = []
+            for obj in model.objects.exclude(image='').iterator():
+                if obj.image_variants and not options['force']:
+                    continue
+                try:
+                    obj.image_variants = build_variants(obj.image)
+                except (OSError, ValueError) as exc:
+                    self.stderr.write(f'{model.__name__} {obj.pk}: {exc}')
+                    continue
+                built.append(obj)
+            # Saved (not update()d) so updated_at moves on and the save
+            # signals refresh the page cache, validators, replica, nginx and
+            # the static export; one transaction, so each runs once.
+            with transaction.atomic():
+                for obj in built:
+                    obj.save(update_fields=['image_variants', 'updated_at'])
+            self.stdout.write(self.style.SUCCESS(f'{model.__name__}: {len(built)} images processed.'))
@@ -0,0 +1,114 @@
+import multiprocessing
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+
+from core import spool
+from core.models import ContactMessage
+
+
+def _use_copies(db_path, spool_path):
+    connections['default'].close()
+    connections['default'].settings_dict['NAME'] = db_path
+    settings.CONTACT_SPOOL_DB = spool_path
+
+
+def submitter(mode, db_path, spool_path, count, results):
+    """One gunicorn worker posting ``count`` contact messages."""
+    _use_copies(db_path, spool_path)
+    latencies, locked = [], 0
+    for i in range(count):
+        message = ContactMessage(name='Load Test', email='load@example.com', subject=f'Load test {i}',
+                                 message='Testing contact ingestion under concurrent writes.')
+        started = time.perf_counter()
+        try:
+            if mode == 'direct':
+                message.save()
+            else:
+                spool.append(message)
+        except OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            locked += 1
+        latencies.append(time.perf_counter() - started)
+        if mode == 'spool' and spool.take_appended() and spool.is_due():
+            spool.flush()  # what request_finished does once the response is sent
+    connections['default'].close()
+    results.put((latencies, locked))
+
+
+def admin_writer(db_path, hold, stop):
+    """Keeps taking the site database's write lock, like admin saves."""
+    db = sqlite3.connect(db_path, isolation_level=None)
+    while not stop.is_set():
+        db.execute('BEGIN IMMEDIATE')
+        db.execute('UPDATE core_service SET "order" = "order"')
+        time.sleep(hold)
+        db.execute('COMMIT')
+        time.sleep(hold / 2)
+    db.close()
+
+
+class Command(BaseCommand):
+    help = 'Compares direct ContactMessage inserts with the write-behind spool under concurrent writes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=3)
+        parser.add_argument('--requests', type=int, default=300, help='Submissions per worker.')
+        parser.add_argument('--hold', type=float, default=0.2, help='Seconds each admin write holds the lock.')
+
+    def handle(self, *args, **options):
+        ctx = multiprocessing.get_context('fork')
+        source = connections['default'].settings_dict['NAME']
+        connections.close_all()
+        total = options['workers'] * options['requests']
+
+        self.stdout.write(f"{options['workers']} workers x {options['requests']} submissions, "
+                          f"admin holding the write lock {options['hold']}s at a time\n")
+        self.stdout.write(f"{'mode':<8}{'p50':>10}{'p99':>10}{'max':>10}{'locked':>8}{'stored':>8}")
+        for mode in ('direct', 'spool'):
+            with tempfile.TemporaryDirectory() as tmp:
+                db_path = str(Path(tmp) / 'db.sqlite3')
+                spool_path = str(Path(tmp) / 'spool.sqlite3')
+                shutil.copyfile(source, db_path)
+
+                stop, results = ctx.Event(), ctx.Queue()
+                admin = ctx.Process(target=admin_writer, args=(db_path, options['hold'], stop))
+                admin.start()
+                workers = [
+                    ctx.Process(target=submitter, args=(mode, db_path, spool_path, options['requests'], results))
+                    for _ in range(options['workers'])
+                ]
+                for worker in workers:
+                    worker.start()
+                latencies, locked = [], 0
+                for _ in workers:
+                    worker_latencies, worker_locked = results.get()
+                    latencies += worker_latencies
+                    locked += worker_locked
+                for worker in workers:
+                    worker.join()
+                stop.set()
+                admin.join()
+
+                _use_copies(db_path, spool_path)
+                if mode == 'spool':
+                    spool.flush(block=True)
+                stored = ContactMessage.objects.filter(email='load@example.com').count()
+                connections['default'].close()
+
+            latencies.sort()
+            p99 = latencies[int(len(latencies) * 0.99) - 1]
+            self.stdout.write(
+                f'{mode:<8}{statistics.median(latencies) * 1000:>8.2f}ms{p99 * 1000:>8.2f}ms'
+                f'{latencies[-1] * 1000:>8.1f}ms{locked:>8}{stored:>8}'
+            )
+
+        self.stdout.write(f'\nlocked = "database is locked" errors; stored should equal {total} minus locked.')
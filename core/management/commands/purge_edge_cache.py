@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import edge
+
+
+class Command(BaseCommand):
+    help = 'Removes pages from the nginx micro-cache, by tag (e.g. core.blogpost:12) or all of them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tags', nargs='*')
+        parser.add_argument('--all', action='store_true', help='Empty the whole cache (after a deploy).')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            edge.purge_all()
+            self.stdout.write(self.style.SUCCESS('Edge cache emptied.'))
+        elif options['tags']:
+            keys = edge.purge(options['tags'])
+            for key in keys:
+                self.stdout.write(key)
+            self.stdout.write(self.style.SUCCESS(f'Purged {len(keys)} cached pages.'))
+        else:
+            raise CommandError('Give one or more tags, or --all.')
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.related import rebuild_related_posts
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the related posts table for every blog post.'
+
+    def handle(self, *args, **options):
+        count = rebuild_related_posts()
+        self.stdout.write(self.style.SUCCESS(f'Stored {count} related post links.'))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core import edge, export, replica
+from core.cache import bump_version
+from core.models import WORDS_PER_MINUTE, BlogPost, Project, summarize_html
+from core.richtext import render_html
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-renders the stored HTML, excerpt and word count of every blog post and project, '
+        'e.g. after changing core.richtext or core.models.summarize_html.'
+    )
+
+    def handle(self, *args, **options):
+        # updated_at moves on so the detail pages' ETag / Last-Modified change.
+        now = timezone.now()
+        posts = list(BlogPost.objects.only('id', 'content'))
+        for post in posts:
+            post.rendered_content, post.toc = render_html(post.content)
+            post.excerpt, post.word_count = summarize_html(post.content)
+            post.reading_time = max(1, round(post.word_count / WORDS_PER_MINUTE))
+            post.updated_at = now
+        BlogPost.objects.bulk_update(
+            posts, ['rendered_content', 'toc', 'excerpt', 'word_count', 'reading_time', 'updated_at'], batch_size=200,
+        )
+
+        projects = list(Project.objects.only('id', 'description'))
+        for project in projects:
+            project.rendered_content, _ = render_html(project.description)
+            project.excerpt, project.word_count = summarize_html(project.description)
+            project.updated_at = now
+        Project.objects.bulk_update(
+            projects, ['rendered_content', 'excerpt', 'word_count', 'updated_at'], batch_size=200,
+        )
+
+        # bulk_update sends no signals.
+        bump_version(BlogPost)
+        bump_version(Project)
+        replica.refresh()
+        tags = {edge.tag_for(obj) for obj in [*posts, *projects]} | {edge.tag_for(BlogPost), edge.tag_for(Project)}
+        edge.purge(tags)
+        export.export_changed(tags)
+        self.stdout.write(self.style.SUCCESS(f'Rendered {len(posts)} posts and {len(projects)} projects.'))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core import summary
+from core.models import DashboardSummary
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the admin dashboard summary from the tables and reports any drift.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            stored = DashboardSummary.objects.filter(pk=summary.SUMMARY_PK).values().first() or {}
+            values = summary.rebuild()
+        drift = 0
+        for field, value in values.items():
+            if field in stored and stored[field] != value:
+                drift += 1
+                self.stdout.write(f'{field:<16}{stored[field]:>14} -> {value}')
+        if not stored:
+            self.stdout.write(self.style.SUCCESS('Summary created.'))
+        elif drift:
+            self.stdout.write(self.style.WARNING(f'Corrected {drift} fields.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Summary was up to date.'))
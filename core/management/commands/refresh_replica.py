@@ -0,0 +1,28 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import replica
+
+
+class Command(BaseCommand):
+    help = 'Copies the site database into the read-only snapshot used for public pages.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', type=float, metavar='SECONDS',
+                            help='Keep running, refreshing a stale snapshot every SECONDS.')
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            if replica.refresh():
+                size = os.path.getsize(settings.REPLICA_DB)
+                self.stdout.write(f'Wrote {settings.REPLICA_DB} ({size / 1024:.0f} KiB) in '
+                                  f'{(time.perf_counter() - started) * 1000:.0f}ms.')
+            elif not options['loop']:
+                self.stdout.write(f'{settings.REPLICA_DB} is up to date.')
+            if not options['loop']:
+                return
+            time.sleep(options['loop'])
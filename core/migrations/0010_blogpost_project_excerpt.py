@@ -0,0 +1,64 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:17
+
+import html
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+
+def summarize(content):
+    words = html.unescape(strip_tags(content or '')).split()
+    return Truncator(' '.join(words)).words(40), len(words)
+
+
+def backfill_summaries(apps, schema_editor):
+    BlogPost = apps.get_model('core', 'BlogPost')
+    Project = apps.get_model('core', 'Project')
+
+    posts = list(BlogPost.objects.only('id', 'content'))
+    for post in posts:
+        post.excerpt, post.word_count = summarize(post.content)
+        post.reading_time = max(1, round(post.word_count / 200))
+    BlogPost.objects.bulk_update(posts, ['excerpt', 'word_count', 'reading_time'], batch_size=200)
+
+    projects = list(Project.objects.only('id', 'description'))
+    for project in projects:
+        project.excerpt, project.word_count = summarize(project.description)
+    Project.objects.bulk_update(projects, ['excerpt', 'word_count'], batch_size=200)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='reading_time',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Minutes'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def split_tags(apps, schema_editor):
+    BlogPost = apps.get_model('core', 'BlogPost')
+    Tag = apps.get_model('core', 'Tag')
+    BlogPostTag = apps.get_model('core', 'BlogPostTag')
+
+    tags = {}
+    links = []
+    for post_id, value in BlogPost.objects.values_list('id', 'tags'):
+        seen = set()
+        for name in (t.strip() for t in (value or '').split(',')):
+            slug = slugify(name)[:60]
+            if not slug or slug in seen:
+                continue
+            seen.add(slug)
+            if slug not in tags:
+                tags[slug], _ = Tag.objects.get_or_create(slug=slug, defaults={'name': name[:50]})
+            links.append(BlogPostTag(post_id=post_id, tag=tags[slug]))
+    BlogPostTag.objects.bulk_create(links, batch_size=500)
+
+
+def join_tags(apps, schema_editor):
+    BlogPost = apps.get_model('core', 'BlogPost')
+    BlogPostTag = apps.get_model('core', 'BlogPostTag')
+
+    names = {}
+    for post_id, name in BlogPostTag.objects.values_list('post_id', 'tag__name').order_by('id'):
+        names.setdefault(post_id, []).append(name)
+    for post_id, post_tags in names.items():
+        BlogPost.objects.filter(id=post_id).update(tags=', '.join(post_tags)[:200])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_blogpost_project_excerpt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('slug', models.SlugField(max_length=60, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BlogPostTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.blogpost')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.tag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tag', 'post'], name='core_blogposttag_tag_post_idx')],
+                'constraints': [models.UniqueConstraint(fields=('post', 'tag'), name='core_unique_post_tag')],
+            },
+        ),
+        migrations.RunPython(split_tags, join_tags),
+        migrations.RemoveField(
+            model_name='blogpost',
+            name='tags',
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='tags',
+            field=models.ManyToManyField(blank=True, related_name='posts', through='core.BlogPostTag', to='core.tag'),
+        ),
+    ]
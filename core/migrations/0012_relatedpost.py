@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_tag_blogposttag'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='core.blogpost')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.blogpost')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['post', '-score'], name='core_relatedpost_score_idx')],
+                'constraints': [models.UniqueConstraint(fields=('post', 'related'), name='core_unique_related_post')],
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:24
+
+import html
+
+from django.db import migrations
+from django.utils.html import strip_tags
+
+CREATE_SQL = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS core_search USING fts5(
+        kind UNINDEXED,
+        object_id UNINDEXED,
+        slug UNINDEXED,
+        title,
+        body,
+        tokenize = 'porter unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+"""
+
+
+def plain(text):
+    return html.unescape(strip_tags(text or ''))
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    BlogPost = apps.get_model('core', 'BlogPost')
+    Project = apps.get_model('core', 'Project')
+    JobOpening = apps.get_model('core', 'JobOpening')
+
+    rows = []
+    for post in BlogPost.objects.all():
+        rows.append(['blog', post.pk, post.slug or '', post.title, plain(post.content)])
+    for project in Project.objects.all():
+        rows.append(['project', project.pk, project.slug or '', project.title,
+                     plain(f"{project.description} {project.tech_stack}")])
+    for job in JobOpening.objects.all():
+        rows.append(['job', job.pk, '', job.title,
+                     plain(f"{job.description} {job.requirements} {job.location}")])
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(CREATE_SQL)
+        cursor.executemany(
+            'INSERT INTO core_search (kind, object_id, slug, title, body) VALUES (%s, %s, %s, %s, %s)',
+            rows,
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute('DROP TABLE IF EXISTS core_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_relatedpost'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
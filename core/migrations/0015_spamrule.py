@@ -0,0 +1,47 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:29
+
+from django.db import migrations, models
+
+# The rules that used to be hard-coded in core.views.is_spam.
+INITIAL_RULES = [
+    ('email', 'xrumer23Acatt@gmail.com', ''),
+    ('email', 'xrumer', 'Any email containing xrumer'),
+    ('script', '0400-04FF', 'Cyrillic'),
+    ('tld', 'ru', 'Russian links'),
+    ('pattern', 'order a bouquet', ''),
+    ('pattern', 'заказать букет', '"Order a bouquet" in Russian'),
+]
+
+
+def add_initial_rules(apps, schema_editor):
+    SpamRule = apps.get_model('core', 'SpamRule')
+    SpamRule.objects.bulk_create(
+        SpamRule(kind=kind, value=value, note=note) for kind, value, note in INITIAL_RULES
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpamRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('email', 'Blocked email text'), ('pattern', 'Regex in subject or message'), ('script', 'Unicode range in subject or message'), ('tld', 'Link to domain ending')], max_length=20)),
+                ('value', models.CharField(help_text="Email text, regex, hex range (e.g. '0400-04FF') or TLD (e.g. 'ru')", max_length=200)),
+                ('note', models.CharField(blank=True, max_length=200)),
+                ('is_active', models.BooleanField(default=True)),
+                ('hit_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('last_hit_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['kind', 'value'],
+            },
+        ),
+        migrations.RunPython(add_initial_rules, migrations.RunPython.noop),
+    ]
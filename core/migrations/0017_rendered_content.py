@@ -0,0 +1,46 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:51
+
+from django.db import migrations, models
+
+from core.richtext import render_html
+
+
+def backfill_rendered_content(apps, schema_editor):
+    BlogPost = apps.get_model('core', 'BlogPost')
+    Project = apps.get_model('core', 'Project')
+
+    posts = list(BlogPost.objects.only('id', 'content'))
+    for post in posts:
+        post.rendered_content, post.toc = render_html(post.content)
+    BlogPost.objects.bulk_update(posts, ['rendered_content', 'toc'], batch_size=200)
+
+    projects = list(Project.objects.only('id', 'description'))
+    for project in projects:
+        project.rendered_content, _ = render_html(project.description)
+    Project.objects.bulk_update(projects, ['rendered_content'], batch_size=200)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_contactmessage_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogpost',
+            name='rendered_content',
+            field=models.TextField(blank=True, editable=False, help_text='Sanitized content HTML'),
+        ),
+        migrations.AddField(
+            model_name='blogpost',
+            name='toc',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='rendered_content',
+            field=models.TextField(blank=True, editable=False, help_text='Sanitized description HTML'),
+        ),
+        migrations.RunPython(backfill_rendered_content, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:00
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+COUNTED = {
+    'Project': 'projects',
+    'BlogPost': 'blogs',
+    'Service': 'services',
+    'JobOpening': 'jobs',
+    'ContactMessage': 'messages',
+    'Client': 'clients',
+    'ClientProject': 'client_projects',
+}
+
+
+def build_summary(apps, schema_editor):
+    values = {field: apps.get_model('core', name).objects.count() for name, field in COUNTED.items()}
+    totals = apps.get_model('core', 'ClientProject').objects.aggregate(
+        total_revenue=Sum('total_bill'), total_paid=Sum('amount_paid'), total_expenses=Sum('expenses'),
+    )
+    values.update({total: value or 0 for total, value in totals.items()})
+    apps.get_model('core', 'DashboardSummary').objects.create(pk=1, **values)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_rendered_content'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('projects', models.PositiveIntegerField(default=0)),
+                ('blogs', models.PositiveIntegerField(default=0)),
+                ('services', models.PositiveIntegerField(default=0)),
+                ('jobs', models.PositiveIntegerField(default=0)),
+                ('messages', models.PositiveIntegerField(default=0)),
+                ('clients', models.PositiveIntegerField(default=0)),
+                ('client_projects', models.PositiveIntegerField(default=0)),
+                ('total_revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_paid', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_expenses', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'verbose_name_plural': 'dashboard summary',
+            },
+        ),
+        migrations.RunPython(build_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_dashboardsummary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clientproject',
+            index=models.Index(fields=['-created_at', '-id'], name='core_cproject_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientproject',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='core_cproject_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientproject',
+            index=models.Index(fields=['payment_method', '-created_at', '-id'], name='core_cproject_payment_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientproject',
+            index=models.Index(fields=['client', '-created_at', '-id'], name='core_cproject_client_idx'),
+        ),
+    ]
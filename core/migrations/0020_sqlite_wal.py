@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:05
+
+from django.db import migrations
+
+
+def enable_wal(apps, schema_editor):
+    # journal_mode=WAL is stored in the database file, so it is set once here
+    # rather than by every connection. It cannot change inside a transaction.
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite' and not connection.is_in_memory_db():
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode=WAL')
+
+
+def disable_wal(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite' and not connection.is_in_memory_db():
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode=DELETE')
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0019_clientproject_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(enable_wal, disable_wal, elidable=True),
+    ]
@@ -1,21 +1,73 @@
+import html
+import re
+
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.text import slugify, Truncator
+
+from .images import build_variants
+from .richtext import render_html
+
+EXCERPT_WORDS = 40
+WORDS_PER_MINUTE = 200
+# Where a tag ends a word: "<p>one</p><p>two</p>" is two words.
+BLOCK_BREAK_RE = re.compile(r'(</(?:p|div|li|h[1-6]|blockquote|pre|td|th|tr|figcaption)\s*>|<br\s*/?>)', re.I)
+
 
-from django.utils.text import slugify
+def summarize_html(content):
+    """
+    Returns (excerpt, word_count) for a chunk of CKEditor HTML so listing
+    pages never need to load or process the full body.
+    """
+    text = html.unescape(strip_tags(BLOCK_BREAK_RE.sub(r'\1 ', content or '')))
+    words = text.split()
+    return Truncator(' '.join(words)).words(EXCERPT_WORDS), len(words)
+
+
+def refresh_image_variants(image, variants):
+    """
+    Builds responsive derivatives for a newly uploaded image (or one that has
+    none yet) and returns the manifest to store on the model.
+    """
+    if not image:
+        return {}
+    if image._committed and variants:
+        return variants
+    try:
+        return build_variants(image)
+    except (OSError, ValueError):
+        # Missing or unreadable file: templates fall back to the original.
+        return {}
 
 class Project(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True, blank=True, max_length=200, null=True)
     description = models.TextField()
+    rendered_content = models.TextField(blank=True, editable=False, help_text="Sanitized description HTML")
+    excerpt = models.TextField(blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
     image = models.ImageField(upload_to='projects/')
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     tech_stack = models.CharField(max_length=200, help_text="Comma separated technologies")
     duration = models.CharField(max_length=100, blank=True, help_text="e.g. 3 Months")
     client_location = models.CharField(max_length=100, blank=True, help_text="e.g. USA, India")
     link = models.URLField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='core_project_created_id_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        self.rendered_content, _ = render_html(self.description)
+        self.excerpt, self.word_count = summarize_html(self.description)
+        self.image_variants = refresh_image_variants(self.image, self.image_variants)
         super().save(*args, **kwargs)
 
     @property
@@ -29,36 +81,98 @@ class Project(models.Model):
     def __str__(self):
         return self.title
 
+class Tag(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    slug = models.SlugField(max_length=60, unique=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = slugify(self.name)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.name
+
 class BlogPost(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True, blank=True, max_length=200, null=True)
     content = models.TextField()
+    rendered_content = models.TextField(blank=True, editable=False, help_text="Sanitized content HTML")
+    toc = models.JSONField(default=list, blank=True, editable=False)
+    excerpt = models.TextField(blank=True, editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveIntegerField(default=1, editable=False, help_text="Minutes")
     image = models.ImageField(upload_to='blog/')
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     author = models.CharField(max_length=100, default="Admin")
-    tags = models.CharField(max_length=200, blank=True, help_text="Comma separated tags")
+    tags = models.ManyToManyField(Tag, through='BlogPostTag', related_name='posts', blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
-    @property
-    def reading_time(self):
-        # Average reading speed: 200 words per minute
-        word_count = len(self.content.split())
-        minutes = word_count / 200
-        return max(1, round(minutes))
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='core_blogpost_created_id_idx'),
+        ]
 
     @property
-    def tag_list(self):
-        if not self.tags:
-            return []
-        return [t.strip() for t in self.tags.split(',')]
+    def tag_names(self):
+        return ', '.join(tag.name for tag in self.tags.all())
+
+    def set_tags(self, value):
+        """Replaces the post's tags from a comma separated string."""
+        tags = {}
+        for name in (t.strip() for t in (value or '').split(',')):
+            slug = slugify(name)
+            if slug and slug not in tags:
+                tags[slug], _ = Tag.objects.get_or_create(slug=slug, defaults={'name': name})
+        self.tags.set(tags.values())
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        self.rendered_content, self.toc = render_html(self.content)
+        self.excerpt, self.word_count = summarize_html(self.content)
+        self.reading_time = max(1, round(self.word_count / WORDS_PER_MINUTE))
+        self.image_variants = refresh_image_variants(self.image, self.image_variants)
         super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
 
+class BlogPostTag(models.Model):
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE)
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'tag'], name='core_unique_post_tag'),
+        ]
+        indexes = [
+            models.Index(fields=['tag', 'post'], name='core_blogposttag_tag_post_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.post} #{self.tag}"
+
+class RelatedPost(models.Model):
+    post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='related_links')
+    related = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['post', 'related'], name='core_unique_related_post'),
+        ]
+        indexes = [
+            models.Index(fields=['post', '-score'], name='core_relatedpost_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.post} -> {self.related}"
+
 class JobOpening(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
@@ -77,11 +191,85 @@ class ContactMessage(models.Model):
     subject = models.CharField(max_length=200)
     message = models.TextField()
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: spooled messages keep the time they were submitted.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
 
     def __str__(self):
         return f"{self.name} - {self.subject}"
 
+
+# Inline flags such as (?i) and numbered backreferences only make sense in a
+# standalone regex; core.spam joins the rules into one alternation.
+INLINE_FLAGS = re.compile(r'\(\?[aiLmsux]+\)')
+NUMBERED_BACKREF = re.compile(r'(?<!\\)(?:\\\\)*\\[1-9]')
+
+
+class SpamRule(models.Model):
+    EMAIL = 'email'
+    PATTERN = 'pattern'
+    SCRIPT = 'script'
+    TLD = 'tld'
+    KIND_CHOICES = [
+        (EMAIL, 'Blocked email text'),
+        (PATTERN, 'Regex in subject or message'),
+        (SCRIPT, 'Unicode range in subject or message'),
+        (TLD, 'Link to domain ending'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    value = models.CharField(max_length=200, help_text="Email text, regex, hex range (e.g. '0400-04FF') or TLD (e.g. 'ru')")
+    note = models.CharField(max_length=200, blank=True)
+    is_active = models.BooleanField(default=True)
+    hit_count = models.PositiveIntegerField(default=0, editable=False)
+    last_hit_at = models.DateTimeField(null=True, blank=True, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['kind', 'value']
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.value}"
+
+    def script_range(self):
+        start, _, end = self.value.strip().partition('-')
+        start, end = int(start, 16), int(end or start, 16)
+        if start > end or end > 0x10FFFF:
+            raise ValueError("invalid range")
+        return start, end
+
+    def tld(self):
+        return self.value.strip().lstrip('.').lower()
+
+    def pattern(self):
+        """Standalone regex equivalent of this rule, used for validation."""
+        if self.kind == self.EMAIL:
+            return re.escape(self.value.strip())
+        if self.kind == self.SCRIPT:
+            start, end = self.script_range()
+            return f'[{re.escape(chr(start))}-{re.escape(chr(end))}]'
+        if self.kind == self.TLD:
+            return rf'https?://\S+?\.{re.escape(self.tld())}(?![\w-])'
+        return self.value.strip()
+
+    def check_pattern(self):
+        """Raises re.error or ValueError unless the rule can join core.spam's combined regex."""
+        pattern = self.pattern()
+        if re.compile(pattern).groupindex:
+            raise ValueError("named groups are not supported")
+        if INLINE_FLAGS.search(pattern):
+            raise ValueError("inline flags such as (?i) are not supported; rules already ignore case")
+        if NUMBERED_BACKREF.search(pattern):
+            raise ValueError("numbered backreferences are not supported")
+        # The form core.spam compiles it in, next to another rule.
+        re.compile(f'(?P<r0>{pattern})|(?P<r1>x)', re.IGNORECASE)
+
+    def clean(self):
+        try:
+            self.check_pattern()
+        except (re.error, ValueError) as e:
+            raise ValidationError({'value': f"Invalid rule: {e}"})
+
+
 class Service(models.Model):
     title = models.CharField(max_length=100)
     description = models.TextField()
@@ -163,3 +351,37 @@ class ClientProject(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        # The admin table pages newest first, optionally filtered by one of these.
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='core_cproject_created_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='core_cproject_status_idx'),
+            models.Index(fields=['payment_method', '-created_at', '-id'], name='core_cproject_payment_idx'),
+            models.Index(fields=['client', '-created_at', '-id'], name='core_cproject_client_idx'),
+        ]
+
+
+class DashboardSummary(models.Model):
+    """
+    The admin dashboard's counts and ClientProject totals in a single row,
+    kept current by core.signals (see core.summary).
+    """
+    projects = models.PositiveIntegerField(default=0)
+    blogs = models.PositiveIntegerField(default=0)
+    services = models.PositiveIntegerField(default=0)
+    jobs = models.PositiveIntegerField(default=0)
+    messages = models.PositiveIntegerField(default=0)
+    clients = models.PositiveIntegerField(default=0)
+    client_projects = models.PositiveIntegerField(default=0)
+    total_revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_expenses = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        verbose_name_plural = "dashboard summary"
+
+    def __str__(self):
+        return "Dashboard summary"
+
+    @property
+    def total_profit(self):
+        return self.total_paid - self.total_expenses
@@ -0,0 +1,123 @@
+"""
+Keyset (cursor) pagination, by default over ``created_at, id``, newest first.
+
+Unlike OFFSET pagination every page is a single range scan on an index that
+ends in the sort column and ``id``, so later pages cost the same as the first
+one. Other orders are described by a SortKey over an integer column or
+annotation that is never NULL. Compare money as whole paise: SQLite
+evaluates decimal arithmetic in floating point, so a Decimal cursor may
+never match the value it was taken from.
+"""
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import Q
+from django.http import Http404
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def encode_cursor(obj):
+    micros = (obj.created_at - EPOCH) // timedelta(microseconds=1)
+    return f'{micros}-{obj.pk}'
+
+
+def decode_cursor(cursor):
+    try:
+        micros, pk = cursor.split('-')
+        return EPOCH + timedelta(microseconds=int(micros)), int(pk)
+    except (ValueError, OverflowError):
+        raise Http404("Invalid page cursor")
+
+
+def encode_int_cursor(field):
+    def encode(obj):
+        return f'{getattr(obj, field)}_{obj.pk}'
+    return encode
+
+
+def decode_int_cursor(cursor):
+    try:
+        value, pk = cursor.split('_')
+        return int(value), int(pk)
+    except ValueError:
+        raise Http404("Invalid page cursor")
+
+
+class SortKey:
+    """Orders pages by ``field`` (a column or annotation), then ``id``."""
+
+    def __init__(self, field, descending=True, encode=None, decode=None):
+        self.field = field
+        self.descending = descending
+        self.encode = encode or encode_int_cursor(field)
+        self.decode = decode or decode_int_cursor
+
+    def order_by(self, reverse=False):
+        sign = '-' if self.descending != reverse else ''
+        return f'{sign}{self.field}', f'{sign}id'
+
+    def beyond(self, cursor, reverse=False):
+        """Rows after ``cursor`` in this order (before it when ``reverse``)."""
+        value, pk = self.decode(cursor)
+        op = 'lt' if self.descending != reverse else 'gt'
+        return Q(**{f'{self.field}__{op}': value}) | Q(**{self.field: value, f'pk__{op}': pk})
+
+
+NEWEST_FIRST = SortKey('created_at', encode=encode_cursor, decode=decode_cursor)
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def next_query(self):
+        return f'?after={self.next_cursor}' if self.next_cursor else ''
+
+    @property
+    def prev_query(self):
+        return f'?before={self.prev_cursor}' if self.prev_cursor else ''
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+def _page_query(queryset, params, per_page, key):
+    """Returns the queryset for the requested page and the cursors it used."""
+    after = params.get('after')
+    before = params.get('before')
+    if before:
+        qs = queryset.filter(key.beyond(before, reverse=True)).order_by(*key.order_by(reverse=True))
+    else:
+        qs = queryset.order_by(*key.order_by())
+        if after:
+            qs = qs.filter(key.beyond(after))
+    return qs[:per_page + 1], after, before
+
+
+def _build_page(rows, after, before, per_page, key):
+    if before:
+        has_prev = len(rows) > per_page
+        items = rows[:per_page][::-1]
+        has_next = True
+    else:
+        has_next = len(rows) > per_page
+        items = rows[:per_page]
+        has_prev = bool(after)
+
+    return KeysetPage(
+        items,
+        next_cursor=key.encode(items[-1]) if items and has_next else None,
+        prev_cursor=key.encode(items[0]) if items and has_prev else None,
+    )
+
+
+def keyset_paginate(queryset, params, per_page, key=NEWEST_FIRST):
+    """
+    Returns the page of ``queryset`` selected by the ``after`` / ``before``
+    cursor in ``params`` (usually ``request.GET``).
+    """
+    qs, after, before = _page_query(queryset, params, per_page, key)
+    return _build_page(list(qs), after, before, per_page, key)
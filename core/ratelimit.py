@@ -0,0 +1,68 @@
+"""
+Token-bucket rate limiting shared by all gunicorn workers.
+
+Buckets live in a small SQLite database of their own (``RATE_LIMIT_DB``, WAL
+mode), separate from the site database so throttling never waits on its
+write lock. Each check is one short ``BEGIN IMMEDIATE`` transaction, which
+serializes concurrent workers on the same bucket.
+"""
+import itertools
+import logging
+import sqlite3
+import time
+
+from django.conf import settings
+
+from .localdb import connect
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = 'CREATE TABLE IF NOT EXISTS bucket (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL) WITHOUT ROWID'
+PRUNE_EVERY = 500
+
+_calls = itertools.count(1)
+
+
+def _prune(db, now):
+    # A bucket untouched for longer than the longest period is full again.
+    longest = max(limit['period'] for limit in settings.RATE_LIMITS.values())
+    db.execute('DELETE FROM bucket WHERE updated < ?', (now - longest,))
+
+
+def consume(key, burst, period):
+    """
+    Takes one token from ``key``'s bucket, which holds ``burst`` tokens and
+    refills completely over ``period`` seconds. Returns 0 when the request is
+    allowed, otherwise the seconds until a token is available.
+    """
+    now = time.time()
+    rate = burst / period
+    try:
+        db = connect(settings.RATE_LIMIT_DB, SCHEMA)
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            row = db.execute('SELECT tokens, updated FROM bucket WHERE key = ?', (key,)).fetchone()
+            tokens = burst if row is None else min(burst, row[0] + (now - row[1]) * rate)
+            if tokens < 1:
+                return (1 - tokens) / rate
+            db.execute(
+                'INSERT INTO bucket (key, tokens, updated) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                (key, tokens - 1, now),
+            )
+            if next(_calls) % PRUNE_EVERY == 0:
+                _prune(db, now)
+        finally:
+            db.execute('COMMIT')
+    except sqlite3.Error:
+        # Never turn a limiter problem into a failed submission.
+        logger.exception("Rate limit check failed for %s", key)
+    return 0
+
+
+def limit_for(path):
+    """Returns (scope, burst, period) of the limit covering ``path``, or None."""
+    for scope, limit in settings.RATE_LIMITS.items():
+        if path in limit['paths']:
+            return scope, limit['burst'], limit['period']
+    return None
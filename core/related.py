@@ -0,0 +1,217 @@
+"""
+Precomputed "related posts" for blog_detail.
+
+Similarity is TF-IDF cosine over title and body text plus a bonus for shared
+tags. The term counts of every post are kept in the shared cache with an
+inverted index (term -> posts), whose list lengths are the document
+frequencies. Saving a post re-tokenizes only that post, scores it against the
+posts sharing a term or tag with it, rewrites its own list and rewrites the
+lists of the other posts it enters or leaves. The detail page then only needs
+one indexed lookup.
+
+Vector norms of the other posts, and a list a post was removed from, are only
+brought up to date by their next save; ``manage.py rebuild_related_posts``
+recomputes everything from scratch.
+"""
+import html
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.html import strip_tags
+
+from .models import BlogPost, BlogPostTag, RelatedPost
+
+STORED_PER_POST = 6
+TITLE_WEIGHT = 3
+TAG_WEIGHT = 0.5
+CORPUS_KEY = 'related:corpus'
+
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#]+')
+STOPWORDS = frozenset("""
+    a about above after again all also am an and any are as at be because been before being
+    below between both but by can could did do does doing down during each few for from further
+    had has have having he her here hers him his how i if in into is it its itself just me more
+    most my no nor not now of off on once only or other our ours out over own same she should so
+    some such than that the their theirs them then there these they this those through to too
+    under until up very was we were what when where which while who whom why will with you your
+""".split())
+
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _term_counts(title, content):
+    terms = Counter(tokenize(html.unescape(strip_tags(content or ''))))
+    for term in tokenize(title):
+        terms[term] += TITLE_WEIGHT
+    return terms
+
+
+class Corpus:
+    """Term counts, vector norms and postings of every post."""
+
+    def __init__(self):
+        self.posts = {}  # post id -> (updated_at, term counts, norm)
+        self.postings = defaultdict(dict)  # term -> {post id: count}
+
+    def idf(self, term):
+        return math.log((1 + len(self.posts)) / (1 + len(self.postings.get(term, ()))))
+
+    def weight(self, term, count):
+        return (1 + math.log(count)) * self.idf(term)
+
+    def norm(self, terms):
+        return math.sqrt(sum(self.weight(t, c) ** 2 for t, c in terms.items())) or 1.0
+
+    def add(self, post_id, updated_at, title, content):
+        self.remove(post_id)
+        terms = _term_counts(title, content)
+        for term, count in terms.items():
+            self.postings[term][post_id] = count
+        self.posts[post_id] = (updated_at, terms, self.norm(terms))
+
+    def remove(self, post_id):
+        entry = self.posts.pop(post_id, None)
+        if entry is None:
+            return
+        for term in entry[1]:
+            self.postings[term].pop(post_id, None)
+            if not self.postings[term]:
+                del self.postings[term]
+
+    def renormalize(self):
+        for post_id, (updated_at, terms, _) in self.posts.items():
+            self.posts[post_id] = (updated_at, terms, self.norm(terms))
+
+    def sync(self, reindex=()):
+        """
+        Re-tokenizes the posts in ``reindex`` and any post saved since it was
+        indexed (e.g. by another worker), and drops deleted posts.
+        """
+        saved = dict(BlogPost.objects.values_list('id', 'updated_at'))
+        for post_id in set(self.posts) - set(saved):
+            self.remove(post_id)
+        stale = {pk for pk, updated_at in saved.items() if pk not in self.posts or self.posts[pk][0] != updated_at}
+        stale.update(pk for pk in reindex if pk in saved)
+        if stale:
+            for post_id, updated_at, title, content in BlogPost.objects.filter(id__in=stale).values_list(
+                'id', 'updated_at', 'title', 'content',
+            ):
+                self.add(post_id, updated_at, title, content)
+
+    def scores(self, post_id, tags):
+        """Similarity of ``post_id`` to every post sharing a term or a tag with it."""
+        terms, norm = self.posts[post_id][1], self.posts[post_id][2]
+        scores = defaultdict(float)
+        for term, count in terms.items():
+            idf = self.idf(term)
+            weight = (1 + math.log(count)) * idf * idf / norm
+            if not weight:
+                continue
+            for other_id, other_count in self.postings[term].items():
+                if other_id != post_id:
+                    scores[other_id] += weight * (1 + math.log(other_count)) / self.posts[other_id][2]
+        post_tags = tags.get(post_id)
+        if post_tags:
+            for other_id, other_tags in tags.items():
+                if other_id != post_id and post_tags & other_tags:
+                    scores[other_id] += TAG_WEIGHT * len(post_tags & other_tags) / len(post_tags | other_tags)
+        return scores
+
+
+def _load_tags():
+    tags = {}
+    for post_id, tag_id in BlogPostTag.objects.values_list('post_id', 'tag_id'):
+        tags.setdefault(post_id, set()).add(tag_id)
+    return tags
+
+
+def _top(scores):
+    ranked = sorted(((s, pk) for pk, s in scores.items() if s > 0), reverse=True)
+    return ranked[:STORED_PER_POST]
+
+
+def refresh_related_posts(*post_ids):
+    """
+    Recomputes the related lists of ``post_ids`` and updates the stored lists
+    of the other posts they enter, leave or move in.
+    """
+    corpus = cache.get(CORPUS_KEY)
+    if corpus is None:
+        rebuild_related_posts()
+        return
+    corpus.sync(reindex=post_ids)
+    cache.set(CORPUS_KEY, corpus, timeout=None)
+    tags = _load_tags()
+
+    lists = defaultdict(dict)
+    for owner_id, related_id, score in RelatedPost.objects.values_list('post_id', 'related_id', 'score'):
+        lists[owner_id][related_id] = score
+
+    changed = {}
+    for post_id in post_ids:
+        if post_id not in corpus.posts:
+            continue
+        scores = corpus.scores(post_id, tags)
+        changed[post_id] = lists[post_id] = {pk: s for s, pk in _top(scores)}
+        for other_id in corpus.posts:
+            current = lists[other_id]
+            if other_id == post_id or (post_id not in current and other_id not in scores):
+                continue
+            merged = {pk: s for pk, s in current.items() if pk != post_id}
+            if other_id in scores:
+                merged[post_id] = scores[other_id]
+            updated = {pk: s for s, pk in _top(merged)}
+            if updated != current:
+                changed[other_id] = lists[other_id] = updated
+
+    if not changed:
+        return
+    with transaction.atomic():
+        RelatedPost.objects.filter(post_id__in=changed).delete()
+        RelatedPost.objects.bulk_create([
+            RelatedPost(post_id=owner_id, related_id=pk, score=s)
+            for owner_id, related in changed.items() for pk, s in related.items()
+        ], batch_size=500)
+
+
+def _refresh_pending():
+    connection = transaction.get_connection()
+    post_ids = connection.__dict__.pop('related_posts_pending', set())
+    if post_ids:
+        refresh_related_posts(*sorted(post_ids))
+
+
+def schedule_refresh(post_id):
+    """
+    Refreshes ``post_id`` once the current transaction commits. Saving a
+    post and then its tags, as the admin does, refreshes it only once.
+    """
+    connection = transaction.get_connection()
+    connection.__dict__.setdefault('related_posts_pending', set()).add(post_id)
+    if not any(func == _refresh_pending for _, func, _ in connection.run_on_commit):
+        transaction.on_commit(_refresh_pending)
+
+
+def rebuild_related_posts():
+    """Recomputes every related list from scratch. Returns the row count."""
+    corpus = Corpus()
+    for post_id, updated_at, title, content in BlogPost.objects.values_list('id', 'updated_at', 'title', 'content'):
+        corpus.add(post_id, updated_at, title, content)
+    corpus.renormalize()
+    tags = _load_tags()
+    rows = []
+    for post_id in corpus.posts:
+        rows.extend(
+            RelatedPost(post_id=post_id, related_id=pk, score=s) for s, pk in _top(corpus.scores(post_id, tags))
+        )
+
+    with transaction.atomic():
+        RelatedPost.objects.all().delete()
+        RelatedPost.objects.bulk_create(rows, batch_size=500)
+    cache.set(CORPUS_KEY, corpus, timeout=None)
+    return len(rows)
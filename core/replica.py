@@ -0,0 +1,231 @@
+"""
+Read-only snapshot of the site database for public page reads.
+
+``REPLICA_DB`` is a copy of ``db.sqlite3`` taken with the SQLite online
+backup API and swapped in with a rename, so readers always see a complete
+snapshot. It is opened with ``mode=ro&immutable=1``: no locks, no WAL, and
+nothing an admin transaction on the primary can make it wait for.
+
+ReplicaRouter sends reads of ``core`` models to the snapshot only while a
+public request is being served (see SubdomainRoutingMiddleware) and only
+when the snapshot is fresh enough for that request. Everything else (writes,
+the admin host, POSTs, management commands) uses the primary.
+
+Freshness: a snapshot's mtime is the moment its copy started, and every
+commit to the primary moves the mtime of ``db.sqlite3`` or its ``-wal``
+file, however it was written (model saves, queryset updates, raw SQL, other
+processes). A request may read the snapshot if the primary has not been
+written since, or if the snapshot is no older than the request's allowed lag
+(``REPLICA_MAX_LAG`` seconds, or ``replica_max_lag()`` on the view). The
+default of 0 never serves stale data.
+
+Refreshing copies the whole database, so it is debounced: a request that
+wrote to a ``core`` model refreshes the snapshot once its response has been
+sent only if the last copy is at least ``REPLICA_REFRESH_INTERVAL`` seconds
+old (core.signals). ``manage.py refresh_replica --loop`` picks up the writes
+that skipped, and writes made outside requests.
+"""
+import fcntl
+import os
+import sqlite3
+import tempfile
+import time
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+ALIAS = 'replica'
+
+# Per-request routing state; None outside public requests.
+_request = ContextVar('replica_request', default=None)
+# Set once this request has written to the primary.
+_changed = ContextVar('replica_changed', default=False)
+
+
+class _Request:
+    def __init__(self):
+        self.max_lag = settings.REPLICA_MAX_LAG
+        self.alias = None
+        self.wrote = False
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except FileNotFoundError:
+        return None
+
+
+def primary_mtime():
+    """When the primary was last written to (WAL commits only touch -wal)."""
+    name = str(settings.DATABASES['default']['NAME'])
+    return max(_mtime(name) or 0, _mtime(f'{name}-wal') or 0)
+
+
+def snapshot_mtime():
+    return _mtime(settings.REPLICA_DB)
+
+
+def is_stale():
+    snapshot = snapshot_mtime()
+    return snapshot is None or primary_mtime() > snapshot
+
+
+def begin_request(public):
+    """Called for every request; only public ones may read the snapshot."""
+    _request.set(_Request() if public else None)
+
+
+def end_request():
+    _request.set(None)
+
+
+def set_max_lag(seconds):
+    state = _request.get()
+    if state is not None:
+        state.max_lag = seconds
+        state.alias = None
+
+
+def read_alias():
+    """The alias ``core`` reads should use in this context, or None."""
+    state = _request.get()
+    if state is None:
+        return None
+    if state.wrote:
+        # Read your own writes for the rest of the request.
+        return 'default'
+    if state.alias is None:
+        snapshot = snapshot_mtime()
+        usable = snapshot is not None and (
+            primary_mtime() <= snapshot or time.time() - snapshot <= state.max_lag
+        )
+        state.alias = ALIAS if usable else 'default'
+    return state.alias
+
+
+def note_write():
+    """Called by ReplicaRouter for every write to a ``core`` model."""
+    _changed.set(True)
+    state = _request.get()
+    if state is not None:
+        state.wrote = True
+
+
+def take_changed():
+    """True once after this request wrote to the primary."""
+    changed = _changed.get()
+    _changed.set(False)
+    return changed
+
+
+def close_if_replaced():
+    """
+    Closes this thread's snapshot connection if a newer snapshot has been
+    swapped in since it was opened, so the next read sees the new file.
+    """
+    connection = connections[ALIAS]
+    opened_on = getattr(connection, 'snapshot_inode', None)
+    if connection.connection is None or opened_on is None:
+        return
+    try:
+        current = os.stat(settings.REPLICA_DB).st_ino
+    except FileNotFoundError:
+        current = None
+    if current != opened_on:
+        connection.close()
+
+
+def refresh(block=True):
+    """
+    Copies the primary into a new snapshot and swaps it in, unless the
+    snapshot is already current. Returns whether a copy was made; without
+    ``block`` it returns False at once while another process is copying.
+    """
+    if connections['default'].is_in_memory_db():
+        # The test database; the replica alias mirrors it (TEST['MIRROR']).
+        return False
+    target = str(settings.REPLICA_DB)
+    with open(f'{target}.lock', 'a') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX if block else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        try:
+            if not is_stale():
+                return False
+            started = time.time()
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.sqlite3')
+            os.close(fd)
+            try:
+                source = sqlite3.connect(str(settings.DATABASES['default']['NAME']))
+                copy = sqlite3.connect(tmp)
+                try:
+                    source.backup(copy)
+                    # A standalone file: the snapshot is never opened in WAL mode.
+                    copy.execute('PRAGMA journal_mode=DELETE')
+                finally:
+                    copy.close()
+                    source.close()
+                os.chmod(tmp, 0o644)
+                os.utime(tmp, (started, started))
+                os.replace(tmp, target)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+            return True
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def refresh_if_due():
+    """refresh(), at most once per ``REPLICA_REFRESH_INTERVAL`` seconds."""
+    snapshot = snapshot_mtime()
+    if snapshot is not None and time.time() - snapshot < settings.REPLICA_REFRESH_INTERVAL:
+        return False
+    return refresh(block=False)
+
+
+def replica_max_lag(seconds):
+    """
+    Lets a view read a snapshot up to ``seconds`` old even when the primary
+    has changed since it was taken.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def _async_wrapped(request, *args, **kwargs):
+                set_max_lag(seconds)
+                return await view_func(request, *args, **kwargs)
+            return _async_wrapped
+
+        @wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            set_max_lag(seconds)
+            return view_func(request, *args, **kwargs)
+        return _wrapped
+    return decorator
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == 'core':
+            return read_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Every ORM write asks, including queryset update() and delete().
+        if model._meta.app_label == 'core':
+            note_write()
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == 'default'
@@ -0,0 +1,206 @@
+"""
+Save-time processing of CKEditor HTML (BlogPost.content, Project.description).
+
+``render_html`` runs once when a post or project is saved and its output is
+stored on the model, so detail pages print it as is:
+
+* tags and attributes outside an allowlist are removed (scripts, styles and
+  embeds together with their content, anything else is unwrapped), as are
+  comments, inline styles, classes and unsafe URLs;
+* whitespace is collapsed and empty paragraphs are dropped;
+* images uploaded to MEDIA_ROOT become lazy-loading responsive <picture>s
+  (see core.images), other images get ``loading="lazy"``;
+* h2/h3 headings get ids and are returned as a table of contents.
+"""
+import html
+import re
+from html.parser import HTMLParser
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils.text import slugify
+
+from .images import build_variants
+from .templatetags.responsive_images import render_picture
+
+ALLOWED_TAGS = {
+    'p', 'br', 'hr', 'h2', 'h3', 'h4', 'h5', 'h6', 'strong', 'b', 'em', 'i', 'u', 's', 'sub', 'sup',
+    'a', 'ul', 'ol', 'li', 'blockquote', 'pre', 'code', 'img', 'figure', 'figcaption',
+    'table', 'thead', 'tbody', 'tr', 'th', 'td',
+}
+ALLOWED_ATTRIBUTES = {
+    'a': {'href', 'title', 'target'},
+    'img': {'src', 'alt'},
+    'ol': {'start'},
+    'th': {'colspan', 'rowspan', 'scope'},
+    'td': {'colspan', 'rowspan'},
+    'code': {'class'},
+    'pre': {'class'},
+}
+# Dropped together with everything inside them.
+DROPPED_TAGS = {
+    'script', 'style', 'iframe', 'object', 'embed', 'noscript', 'template', 'form', 'input',
+    'button', 'select', 'textarea', 'svg', 'math', 'head', 'title', 'meta', 'link',
+}
+DROPPED_VOID_TAGS = {'input', 'meta', 'link'}
+RENAMED_TAGS = {'h1': 'h2', 'div': 'p'}  # the page title is the only h1
+VOID_TAGS = {'br', 'hr', 'img'}
+BLOCK_TAGS = (
+    'p', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'li', 'blockquote', 'figure', 'figcaption',
+    'table', 'thead', 'tbody', 'tr', 'th', 'td', 'br', 'hr', 'picture',
+)
+# Block tags that end an open paragraph, as in the HTML parsing rules.
+CLOSES_PARAGRAPH = {'p', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'blockquote', 'pre', 'figure', 'table', 'hr'}
+TOC_TAGS = ('h2', 'h3')
+URL_SCHEMES = ('', 'http', 'https', 'mailto', 'tel')
+CODE_CLASS_RE = re.compile(r'^language-[\w-]+$')
+WHITESPACE_RE = re.compile(r'[ \t\n\r\f]+')
+BLOCK_SPACE_RE = re.compile(r' ?(</?(?:{})\b[^>]*>) ?'.format('|'.join(BLOCK_TAGS)))
+PRE_RE = re.compile(r'(<pre\b.*?</pre>)', re.S)
+EMPTY_PARAGRAPH_RE = re.compile(r'<p>(?:\s|\xa0|<br>)*</p>')
+CONTENT_SIZES = '(max-width: 800px) 100vw, 800px'
+
+
+def _safe_url(url):
+    url = url.strip()
+    try:
+        scheme = urlsplit(url).scheme.lower()
+    except ValueError:
+        return None
+    return url if scheme in URL_SCHEMES else None
+
+
+def _media_name(src):
+    """The storage name of an image uploaded to MEDIA_ROOT, or None."""
+    path = urlsplit(src).path
+    if not path.startswith(settings.MEDIA_URL):
+        return None
+    name = unquote(path[len(settings.MEDIA_URL):])
+    return name if name and '..' not in name.split('/') else None
+
+
+def _image(attrs):
+    src = _safe_url(attrs.get('src', ''))
+    if not src:
+        return ''
+    alt = attrs.get('alt', '')
+    name = _media_name(src)
+    if name:
+        try:
+            with default_storage.open(name) as image_file:
+                variants = build_variants(image_file)
+        except (OSError, ValueError):
+            variants = None
+        if variants:
+            return render_picture(variants, alt=alt, sizes=CONTENT_SIZES)
+    return f'<img src="{html.escape(src)}" alt="{html.escape(alt)}" loading="lazy" decoding="async">'
+
+
+class _Renderer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.open_tags = []
+        self.dropped = 0
+        self.in_pre = 0
+        self.heading = None  # (tag, index in out, collected text)
+        self.toc = []
+        self.ids = set()
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROPPED_TAGS or self.dropped:
+            if tag in DROPPED_TAGS and tag not in DROPPED_VOID_TAGS:
+                self.dropped += 1
+            return
+        tag = RENAMED_TAGS.get(tag, tag)
+        if tag not in ALLOWED_TAGS:
+            return
+        if tag in CLOSES_PARAGRAPH and 'p' in self.open_tags:
+            self.handle_endtag('p')
+        attrs = {name: value or '' for name, value in attrs if name in ALLOWED_ATTRIBUTES.get(tag, ())}
+
+        if tag == 'img':
+            self.out.append(_image(attrs))
+            return
+        if tag == 'a':
+            href = _safe_url(attrs.pop('href', ''))
+            if href:
+                attrs['href'] = href
+            if attrs.get('target'):
+                attrs['target'] = '_blank'
+                attrs['rel'] = 'noopener noreferrer'
+        if 'class' in attrs and not CODE_CLASS_RE.match(attrs['class']):
+            del attrs['class']
+
+        rendered = ''.join(f' {name}="{html.escape(value)}"' for name, value in attrs.items())
+        if tag in TOC_TAGS and self.heading is None:
+            self.heading = (tag, len(self.out), [])
+        self.out.append(f'<{tag}{rendered}>')
+        if tag not in VOID_TAGS:
+            self.open_tags.append(tag)
+        if tag == 'pre':
+            self.in_pre += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if RENAMED_TAGS.get(tag, tag) not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROPPED_TAGS or self.dropped:
+            if tag in DROPPED_TAGS and tag not in DROPPED_VOID_TAGS and self.dropped:
+                self.dropped -= 1
+            return
+        tag = RENAMED_TAGS.get(tag, tag)
+        if tag not in self.open_tags:
+            return
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self._close(open_tag)
+            if open_tag == tag:
+                break
+
+    def _close(self, tag):
+        self.out.append(f'</{tag}>')
+        if tag == 'pre':
+            self.in_pre -= 1
+        if self.heading and self.heading[0] == tag:
+            _, index, text = self.heading
+            self.heading = None
+            title = WHITESPACE_RE.sub(' ', ''.join(text)).strip()
+            if title:
+                anchor = base = slugify(title) or 'section'
+                n = 1
+                while anchor in self.ids:
+                    n += 1
+                    anchor = f'{base}-{n}'
+                self.ids.add(anchor)
+                self.out[index] = f'<{tag} id="{anchor}">'
+                self.toc.append({'id': anchor, 'title': title, 'level': int(tag[1])})
+
+    def handle_data(self, data):
+        if self.dropped:
+            return
+        if self.heading:
+            self.heading[2].append(data)
+        if not self.in_pre:
+            data = WHITESPACE_RE.sub(' ', data)
+        self.out.append(html.escape(data, quote=False))
+
+    def close(self):
+        super().close()
+        while self.open_tags:
+            self._close(self.open_tags.pop())
+
+
+def render_html(content):
+    """Returns (sanitized and minified HTML, table of contents) for ``content``."""
+    renderer = _Renderer()
+    renderer.feed(content or '')
+    renderer.close()
+    # Spaces next to block tags never render; <pre> blocks are kept as is.
+    parts = PRE_RE.split(''.join(renderer.out))
+    rendered = ''.join(part if i % 2 else BLOCK_SPACE_RE.sub(r'\1', part) for i, part in enumerate(parts))
+    rendered = EMPTY_PARAGRAPH_RE.sub('', rendered)
+    return rendered.strip(), renderer.toc
@@ -0,0 +1,140 @@
+"""
+Full-text search over blog posts, projects and job openings using an SQLite
+FTS5 virtual table (``core_search``).
+
+Rows are kept in sync by the signals in core.signals and can be rebuilt with
+``manage.py rebuild_search_index``.
+"""
+import html
+import re
+
+from django.db import connection, transaction
+from django.urls import reverse
+from django.utils.html import strip_tags
+
+from .models import Project, BlogPost, JobOpening
+
+TABLE = 'core_search'
+
+CREATE_SQL = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5(
+        kind UNINDEXED,
+        object_id UNINDEXED,
+        slug UNINDEXED,
+        title,
+        body,
+        tokenize = 'porter unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+"""
+DROP_SQL = f'DROP TABLE IF EXISTS {TABLE}'
+
+# bm25() weights follow column order; the title counts ten times the body.
+SEARCH_SQL = f"""
+    SELECT kind, object_id, slug,
+           highlight({TABLE}, 3, char(2), char(3)),
+           snippet({TABLE}, 4, char(2), char(3), '…', 16),
+           bm25({TABLE}, 0, 0, 0, 10.0, 1.0) AS rank
+    FROM {TABLE}
+    WHERE {TABLE} MATCH %s
+    ORDER BY rank
+    LIMIT %s
+"""
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _document(obj):
+    if isinstance(obj, BlogPost):
+        return 'blog', obj.slug, obj.title, obj.content
+    if isinstance(obj, Project):
+        return 'project', obj.slug, obj.title, f"{obj.description} {obj.tech_stack}"
+    if isinstance(obj, JobOpening):
+        return 'job', '', obj.title, f"{obj.description} {obj.requirements} {obj.location}"
+    raise TypeError(f"{type(obj).__name__} is not searchable")
+
+
+def _plain(text):
+    return html.unescape(strip_tags(text or ''))
+
+
+def _marked(text):
+    # Matches are delimited with control characters by the query, so the
+    # text can be escaped before they are turned into <mark> tags.
+    return html.escape(text).replace('\x02', '<mark>').replace('\x03', '</mark>')
+
+
+def index_object(obj):
+    kind, slug, title, body = _document(obj)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE kind = %s AND object_id = %s', [kind, obj.pk])
+        cursor.execute(
+            f'INSERT INTO {TABLE} (kind, object_id, slug, title, body) VALUES (%s, %s, %s, %s, %s)',
+            [kind, obj.pk, slug or '', title, _plain(body)],
+        )
+
+
+def remove_object(obj):
+    kind = _document(obj)[0]
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE kind = %s AND object_id = %s', [kind, obj.pk])
+
+
+def rebuild_index():
+    """Re-indexes every searchable row. Returns the number of documents."""
+    count = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(CREATE_SQL)
+        cursor.execute(f'DELETE FROM {TABLE}')
+        for queryset in (BlogPost.objects.all(), Project.objects.all(), JobOpening.objects.all()):
+            rows = []
+            for obj in queryset.iterator():
+                kind, slug, title, body = _document(obj)
+                rows.append([kind, obj.pk, slug or '', title, _plain(body)])
+            cursor.executemany(
+                f'INSERT INTO {TABLE} (kind, object_id, slug, title, body) VALUES (%s, %s, %s, %s, %s)',
+                rows,
+            )
+            count += len(rows)
+        cursor.execute(f"INSERT INTO {TABLE}({TABLE}) VALUES ('optimize')")
+    return count
+
+
+def build_match_query(text):
+    """
+    Turns free text into an FTS5 query: every word must match, and the last
+    word also matches as a prefix so results appear while typing.
+    """
+    tokens = TOKEN_RE.findall(text.lower())[:10]
+    if not tokens:
+        return ''
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def _url(kind, object_id, slug):
+    if kind == 'blog':
+        return reverse('blog_detail', args=[slug])
+    if kind == 'project':
+        return reverse('project_detail', args=[slug])
+    return f"{reverse('career')}#job-{object_id}"
+
+
+def search(text, limit=20):
+    query = build_match_query(text)
+    if not query:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(SEARCH_SQL, [query, limit])
+        rows = cursor.fetchall()
+    return [
+        {
+            'kind': kind,
+            'title': _marked(title),
+            'snippet': _marked(snippet),
+            'url': _url(kind, object_id, slug),
+            'score': -rank,
+        }
+        for kind, object_id, slug, title, snippet, rank in rows
+    ]
@@ -0,0 +1,152 @@
+import os
+
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db.backends.signals import connection_created
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .cache import bump_version
+from .models import Project, BlogPost, Service, JobOpening, SpamRule, ClientProject
+from .related import schedule_refresh
+from . import edge, export, replica, search, sitemap_files, spool, summary
+
+PUBLIC_MODELS = (Project, BlogPost, Service, JobOpening)
+
+
+@receiver([post_save, post_delete])
+def invalidate_public_pages(sender, **kwargs):
+    if sender in PUBLIC_MODELS:
+        bump_version(sender)
+
+
+@receiver([post_save, post_delete], sender=SpamRule)
+def reload_spam_rules(sender, **kwargs):
+    # Bumping the version makes every worker recompile its matcher.
+    bump_version(SpamRule)
+
+
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def invalidate_tagged_pages(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_version(BlogPost)
+        if isinstance(instance, BlogPost):
+            tags = edge.tags_for(instance)
+            schedule_refresh(instance.pk)
+        else:
+            tags = {edge.tag_for(BlogPost)}
+        transaction.on_commit(lambda: edge.purge(tags))
+        export.pages_changed(tags)
+
+
+@receiver(post_save, sender=BlogPost)
+def update_related_posts(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_refresh(instance.pk)
+
+
+@receiver(post_save, sender=BlogPost)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=JobOpening)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index_object(instance)
+
+
+@receiver(post_delete, sender=BlogPost)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=JobOpening)
+def remove_from_search_index(sender, instance, **kwargs):
+    search.remove_object(instance)
+
+
+SITEMAP_SECTIONS = {Project: 'projects', BlogPost: 'blog'}
+
+
+@receiver([post_save, post_delete])
+def update_sitemap(sender, raw=False, **kwargs):
+    section = SITEMAP_SECTIONS.get(sender)
+    if section and not raw:
+        transaction.on_commit(lambda: sitemap_files.write_section(section))
+
+
+@receiver([post_save, post_delete])
+def update_cached_pages(sender, instance=None, raw=False, **kwargs):
+    # Connected after the related-posts and sitemap receivers, so their
+    # on_commit work is done before nginx fetches the pages again. Fixtures
+    # (raw saves) change pages too.
+    if sender in PUBLIC_MODELS:
+        tags = edge.tags_for(instance)
+        transaction.on_commit(lambda: edge.purge(tags))
+        export.pages_changed(tags)
+
+
+@receiver(pre_save, sender=ClientProject)
+def remember_project_totals(sender, instance, **kwargs):
+    # The dashboard summary is adjusted by the difference to the stored row.
+    stored = None
+    if instance.pk is not None:
+        stored = ClientProject.objects.filter(pk=instance.pk).values(*summary.TOTALS).first()
+    instance._stored_totals = {summary.TOTALS[field]: value for field, value in stored.items()} if stored else {}
+
+
+@receiver(post_save)
+def count_saved(sender, instance, created, **kwargs):
+    field = summary.COUNTED.get(sender)
+    if field is None:
+        return
+    deltas = {field: 1} if created else {}
+    if sender is ClientProject:
+        stored = getattr(instance, '_stored_totals', {})
+        for total, value in summary.totals_of(instance).items():
+            deltas[total] = value - stored.get(total, 0)
+    summary.adjust(**deltas)
+
+
+@receiver(post_delete)
+def count_deleted(sender, instance, **kwargs):
+    field = summary.COUNTED.get(sender)
+    if field is None:
+        return
+    deltas = {field: -1}
+    if sender is ClientProject:
+        deltas.update({total: -value for total, value in summary.totals_of(instance).items()})
+    summary.adjust(**deltas)
+
+
+@receiver(request_finished)
+def flush_contact_spool(sender, **kwargs):
+    # Runs after the response has been sent, so the submitter never waits.
+    if spool.take_appended() and spool.is_due():
+        spool.flush()
+
+
+@receiver(connection_created)
+def remember_snapshot(sender, connection, **kwargs):
+    if connection.alias == replica.ALIAS:
+        connection.snapshot_inode = os.stat(settings.REPLICA_DB).st_ino
+
+
+@receiver(request_started)
+def reopen_replaced_snapshot(sender, **kwargs):
+    replica.close_if_replaced()
+
+
+@receiver(request_finished)
+def refresh_replica(sender, **kwargs):
+    replica.end_request()
+    if replica.take_changed():
+        replica.refresh_if_due()
+
+
+@receiver(request_started)
+def begin_export_request(sender, **kwargs):
+    export.begin_request()
+
+
+@receiver(request_finished)
+def export_changed_pages(sender, **kwargs):
+    tags = export.take_pending()
+    if tags:
+        export.export_changed(tags)
@@ -0,0 +1,127 @@
+"""
+Pre-generated sitemap files.
+
+``sitemap.xml`` is a sitemap index pointing at one file per section (and per
+page of a section once it outgrows ``Sitemap.limit``). The files live in
+``SITEMAP_ROOT`` and are rewritten only for the section whose model changed
+(see core.signals); ``manage.py build_sitemaps`` rebuilds all of them.
+"""
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.sitemaps.views import SitemapIndexItem
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from .sitemaps import SITEMAPS, public_urlconf
+
+INDEX_NAME = 'index'
+CACHE_KEY = 'sitemap:{}'
+
+
+class SitemapSite:
+    def __init__(self, domain):
+        self.domain = self.name = domain
+
+
+def _root():
+    return Path(settings.SITEMAP_ROOT)
+
+
+def file_name(section, page=1):
+    return f'{section}.xml' if page == 1 else f'{section}-p{page}.xml'
+
+
+def cache_key(section, page=1):
+    return CACHE_KEY.format(file_name(section, page))
+
+
+def file_path(section, page=1):
+    return _root() / file_name(section, page)
+
+
+def _write(path, content):
+    # Write to a temp file and rename so readers never see a partial file.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+def _section_url(section, page=1):
+    url = reverse('sitemap_section', args=[section])
+    if page > 1:
+        url += f'?p={page}'
+    return f'{settings.SITEMAP_PROTOCOL}://{settings.SITEMAP_DOMAIN}{url}'
+
+
+def render_section(section, page=1):
+    sitemap = SITEMAPS[section]()
+    with public_urlconf():
+        urls = sitemap.get_urls(page=page, site=SitemapSite(settings.SITEMAP_DOMAIN), protocol=settings.SITEMAP_PROTOCOL)
+    return render_to_string('sitemap.xml', {'urlset': urls})
+
+
+def render_index():
+    items = []
+    with public_urlconf():
+        for section, sitemap_class in SITEMAPS.items():
+            sitemap = sitemap_class()
+            lastmod = sitemap.get_latest_lastmod()
+            for page in range(1, sitemap.paginator.num_pages + 1):
+                items.append(SitemapIndexItem(_section_url(section, page), lastmod))
+    return render_to_string('sitemap_index.xml', {'sitemaps': items})
+
+
+def write_section(section, update_index=True):
+    """Rewrites every page of one section, then the index."""
+    sitemap = SITEMAPS[section]()
+    num_pages = sitemap.paginator.num_pages
+    for page in range(1, num_pages + 1):
+        _write(file_path(section, page), render_section(section, page))
+    cache.delete_many([cache_key(section, page) for page in range(1, num_pages + 1)])
+    # Drop pages left over from when the section was larger.
+    for stale in _root().glob(f'{section}-p*.xml'):
+        if int(stale.stem.rsplit('-p', 1)[1]) > num_pages:
+            stale.unlink(missing_ok=True)
+    if update_index:
+        write_index()
+
+
+def write_index():
+    _write(file_path(INDEX_NAME), render_index())
+    cache.delete(cache_key(INDEX_NAME))
+
+
+def write_all():
+    for section in SITEMAPS:
+        write_section(section, update_index=False)
+    write_index()
+
+
+def read(section, page=1):
+    """
+    Returns (content, path) for a sitemap file. When the file is missing it
+    is generated on demand, written back to disk and cached.
+    """
+    path = file_path(section, page)
+    try:
+        return path.read_text(encoding='utf-8'), path
+    except FileNotFoundError:
+        pass
+
+    key = cache_key(section, page)
+    content = cache.get(key)
+    if content is None:
+        content = render_index() if section == INDEX_NAME else render_section(section, page)
+        cache.set(key, content, settings.PAGE_CACHE_TIMEOUT)
+    try:
+        _write(path, content)
+    except OSError:
+        return content, None
+    return content, path
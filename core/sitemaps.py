@@ -1,7 +1,25 @@
+from contextlib import contextmanager
+
 from django.contrib.sitemaps import Sitemap
-from django.urls import reverse
+from django.urls import get_urlconf, reverse, set_urlconf
 from .models import Project, BlogPost, JobOpening
 
+
+@contextmanager
+def public_urlconf():
+    """
+    Reverses and resolves against ROOT_URLCONF. Sitemap files and exported
+    pages are also rebuilt while an admin-host request, which has
+    SubdomainRoutingMiddleware's admin urlconf set, is being handled.
+    """
+    urlconf = get_urlconf()
+    set_urlconf(None)
+    try:
+        yield
+    finally:
+        set_urlconf(urlconf)
+
+
 class StaticViewSitemap(Sitemap):
     priority = 0.8
     changefreq = 'weekly'
@@ -17,10 +35,10 @@ class ProjectSitemap(Sitemap):
     priority = 0.9
 
     def items(self):
-        return Project.objects.all()
+        return Project.objects.only('slug', 'updated_at').order_by('pk')
         
     def lastmod(self, obj):
-        return obj.created_at
+        return obj.updated_at
 
     def location(self, obj):
         return reverse('project_detail', args=[obj.slug])
@@ -30,10 +48,17 @@ class BlogSitemap(Sitemap):
     priority = 0.9
 
     def items(self):
-        return BlogPost.objects.all()
+        return BlogPost.objects.only('slug', 'updated_at').order_by('pk')
 
     def lastmod(self, obj):
-        return obj.created_at
+        return obj.updated_at
     
     def location(self, obj):
         return reverse('blog_detail', args=[obj.slug])
+
+
+SITEMAPS = {
+    'static': StaticViewSitemap,
+    'projects': ProjectSitemap,
+    'blog': BlogSitemap,
+}
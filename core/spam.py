@@ -0,0 +1,144 @@
+"""
+Spam filtering for contact submissions.
+
+The active SpamRule rows are compiled once into a SpamMatcher: plain-text
+rules become substring checks on the lowercased text, Unicode ranges one
+character class, link TLDs one regex and the remaining regex rules a single
+alternation with a named group per rule, so each part is one scan that also
+tells which rule fired. The matcher is cached per process and rebuilt when
+the rules' cache version changes (see core.signals), so edits in the admin
+apply to every worker without a restart.
+"""
+import logging
+import re
+
+from django.db.models import F
+from django.utils import timezone
+
+from .cache import get_versions
+from .models import SpamRule
+
+logger = logging.getLogger(__name__)
+
+HONEYPOT_FIELD = 'website'
+REGEX_CHARS = set('.^$*+?{}[]\\|()')
+
+_matcher = None
+_matcher_version = None
+
+
+class SpamMatcher:
+    def __init__(self, rules):
+        self.email_literals = []
+        self.text_literals = []
+        self.ranges = []
+        tlds, patterns = [], []
+        self.group_rules = {}
+
+        for rule in rules:
+            try:
+                rule.check_pattern()
+            except (re.error, ValueError):
+                logger.warning("Skipping invalid spam rule %s: %r", rule.pk, rule.value)
+                continue
+            value = rule.value.strip()
+            if rule.kind == SpamRule.EMAIL:
+                self.email_literals.append((value.lower(), rule.pk))
+            elif rule.kind == SpamRule.SCRIPT:
+                self.ranges.append((*rule.script_range(), rule.pk))
+            elif rule.kind == SpamRule.TLD:
+                tlds.append((re.escape(rule.tld()), rule.pk))
+            elif REGEX_CHARS.isdisjoint(value):
+                self.text_literals.append((value.lower(), rule.pk))
+            else:
+                patterns.append((value, rule.pk))
+
+        self.rule_count = sum(map(len, (self.email_literals, self.text_literals, self.ranges, tlds, patterns)))
+        self.script_re = None
+        if self.ranges:
+            self.script_re = re.compile('[' + ''.join(
+                f'{re.escape(chr(start))}-{re.escape(chr(end))}' for start, end, _ in self.ranges
+            ) + ']')
+        self.tld_re = self._alternation(
+            tlds, lambda groups: re.compile(rf'https?://\S+?\.(?:{groups})(?![\w-])', re.IGNORECASE),
+        )
+        self.pattern_re = self._alternation(patterns, lambda groups: re.compile(groups, re.IGNORECASE))
+
+    def _group(self, pattern, rule_id):
+        name = f'r{len(self.group_rules)}'
+        self.group_rules[name] = rule_id
+        return f'(?P<{name}>{pattern})'
+
+    def _alternation(self, rules, build):
+        """
+        ``build('|'.join(groups))`` over the (pattern, rule id) pairs. A rule
+        that still breaks the combined regex is dropped instead of failing
+        every rule with it.
+        """
+        if not rules:
+            return None
+        groups = [(self._group(pattern, rule_id), rule_id) for pattern, rule_id in rules]
+        try:
+            return build('|'.join(group for group, _ in groups))
+        except re.error:
+            pass
+        kept = []
+        for group, rule_id in groups:
+            try:
+                build('|'.join(kept + [group]))
+            except re.error:
+                logger.warning("Skipping spam rule %s: it breaks the combined pattern", rule_id)
+                self.rule_count -= 1
+                continue
+            kept.append(group)
+        return build('|'.join(kept)) if kept else None
+
+    def match(self, email, subject, message):
+        """Returns the id of the first rule that matches, or None."""
+        email = email.lower()
+        for value, rule_id in self.email_literals:
+            if value in email:
+                return rule_id
+
+        text = f'{subject}\n{message}'
+        lowered = text.lower()
+        for value, rule_id in self.text_literals:
+            if value in lowered:
+                return rule_id
+
+        if self.script_re and (found := self.script_re.search(text)):
+            char = ord(found.group())
+            return next(rule_id for start, end, rule_id in self.ranges if start <= char <= end)
+
+        for regex in (self.tld_re, self.pattern_re):
+            if regex and (found := regex.search(text)):
+                return self.group_rules[found.lastgroup]
+        return None
+
+
+def get_matcher():
+    global _matcher, _matcher_version
+    version = get_versions([SpamRule])[0]
+    if _matcher is None or version != _matcher_version:
+        _matcher = SpamMatcher(SpamRule.objects.filter(is_active=True))
+        _matcher_version = version
+    return _matcher
+
+
+def record_hit(rule_id):
+    SpamRule.objects.filter(pk=rule_id).update(hit_count=F('hit_count') + 1, last_hit_at=timezone.now())
+
+
+def is_spam(data):
+    """
+    Service to check if a contact message is likely spam.
+    """
+    if data.get(HONEYPOT_FIELD, ''):
+        return True
+
+    email, subject, message = (str(data.get(field) or '') for field in ('email', 'subject', 'message'))
+    rule_id = get_matcher().match(email, subject, message)
+    if rule_id is None:
+        return False
+    record_hit(rule_id)
+    return True
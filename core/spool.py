@@ -0,0 +1,129 @@
+"""
+Write-behind ingestion for contact messages.
+
+The contact views append each validated submission to a local SQLite spool
+(``CONTACT_SPOOL_DB``) instead of inserting into the site database, so the
+request only pays for a small append that never waits on admin writes. The
+spool is moved into ContactMessage in batches with bulk_create:
+
+* after a request that appended to it has been sent, once a full batch
+  (``CONTACT_SPOOL_BATCH``) is waiting or the oldest message is
+  ``CONTACT_SPOOL_MAX_AGE`` seconds old (core.signals);
+* before the admin lists messages;
+* by ``manage.py flush_contact_spool``, which can also run continuously and
+  writes the messages no later submission makes due.
+
+Only one process flushes at a time. Delivery is at-least-once: a crash
+between bulk_create and removing the batch from the spool can duplicate
+that batch.
+"""
+import fcntl
+import json
+import logging
+from datetime import timedelta
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import OperationalError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import summary
+from .localdb import connect
+from .models import ContactMessage
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = 'CREATE TABLE IF NOT EXISTS spool (id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT NOT NULL)'
+
+# A context variable rather than a thread-local: under ASGI the append and
+# request_finished can run in different threads of the same request.
+_appended = ContextVar('contact_spool_appended', default=False)
+
+
+def _spool():
+    return connect(settings.CONTACT_SPOOL_DB, SCHEMA)
+
+
+def append(message):
+    """Spools an unsaved, validated ContactMessage."""
+    fields = {f.attname: f.value_from_object(message) for f in message._meta.concrete_fields if not f.primary_key}
+    _spool().execute('INSERT INTO spool (payload) VALUES (?)', (json.dumps(fields, cls=DjangoJSONEncoder),))
+    _appended.set(True)
+
+
+def take_appended():
+    """True once after this request appended to the spool."""
+    appended = _appended.get()
+    _appended.set(False)
+    return appended
+
+
+def pending():
+    return _spool().execute('SELECT COUNT(*) FROM spool').fetchone()[0]
+
+
+def is_due():
+    """True when a full batch is spooled or the oldest message is old enough to write."""
+    db = _spool()
+    oldest = db.execute('SELECT payload FROM spool ORDER BY id LIMIT 1').fetchone()
+    if oldest is None:
+        return False
+    if pending() >= settings.CONTACT_SPOOL_BATCH:
+        return True
+    spooled_at = parse_datetime(json.loads(oldest[0])['created_at'])
+    return timezone.now() - spooled_at >= timedelta(seconds=settings.CONTACT_SPOOL_MAX_AGE)
+
+
+def _load(payload):
+    fields = json.loads(payload)
+    fields['created_at'] = parse_datetime(fields['created_at'])
+    return ContactMessage(**fields)
+
+
+@contextmanager
+def _flush_lock(block):
+    with open(f'{settings.CONTACT_SPOOL_DB}.lock', 'a') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX if block else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def flush(block=False):
+    """
+    Moves spooled messages into the database and returns how many were
+    written. Returns 0 without waiting when another process is flushing,
+    unless ``block`` is set.
+    """
+    batch_size = settings.CONTACT_SPOOL_BATCH
+    written = 0
+    with _flush_lock(block) as locked:
+        if not locked:
+            return 0
+        db = _spool()
+        while True:
+            rows = db.execute('SELECT id, payload FROM spool ORDER BY id LIMIT ?', (batch_size,)).fetchall()
+            if not rows:
+                break
+            try:
+                with transaction.atomic():
+                    ContactMessage.objects.bulk_create([_load(payload) for _, payload in rows])
+                    # bulk_create sends no post_save.
+                    summary.adjust(messages=len(rows))
+            except OperationalError:
+                # Most likely "database is locked"; the rows stay spooled.
+                logger.warning("Could not flush %d spooled contact messages", len(rows), exc_info=True)
+                break
+            db.execute('DELETE FROM spool WHERE id <= ?', (rows[-1][0],))
+            written += len(rows)
+            if len(rows) < batch_size:
+                break
+    return written
@@ -0,0 +1,73 @@
+"""
+The admin dashboard's numbers, materialized in one DashboardSummary row.
+
+core.signals adjusts the row in the same transaction as every save or
+delete of a counted model: +1/-1 on the count, and for ClientProject the
+difference between its old and new bill, payment and expenses. Updates use
+F() expressions, so concurrent saves never lose an increment. Writes that
+send no signals (bulk_create, queryset.update()) must call ``adjust``
+themselves; ``manage.py reconcile_dashboard_summary`` rebuilds the row from
+the tables and reports any drift.
+"""
+from django.db.models import F, Sum
+
+from .models import (
+    BlogPost, Client, ClientProject, ContactMessage, DashboardSummary, JobOpening, Project, Service,
+)
+
+SUMMARY_PK = 1
+COUNTED = {
+    Project: 'projects',
+    BlogPost: 'blogs',
+    Service: 'services',
+    JobOpening: 'jobs',
+    ContactMessage: 'messages',
+    Client: 'clients',
+    ClientProject: 'client_projects',
+}
+# ClientProject field -> summary total.
+TOTALS = {
+    'total_bill': 'total_revenue',
+    'amount_paid': 'total_paid',
+    'expenses': 'total_expenses',
+}
+
+
+def compute():
+    """The summary values counted from the tables."""
+    values = {field: model.objects.count() for model, field in COUNTED.items()}
+    totals = ClientProject.objects.aggregate(**{total: Sum(field) for field, total in TOTALS.items()})
+    values.update({total: value or 0 for total, value in totals.items()})
+    return values
+
+
+def rebuild():
+    values = compute()
+    DashboardSummary.objects.update_or_create(pk=SUMMARY_PK, defaults=values)
+    return values
+
+
+def get():
+    """The summary row: one query, unless it has to be built first."""
+    summary = DashboardSummary.objects.filter(pk=SUMMARY_PK).first()
+    if summary is None:
+        rebuild()
+        summary = DashboardSummary.objects.get(pk=SUMMARY_PK)
+    return summary
+
+
+def adjust(**deltas):
+    """Adds ``deltas`` to the summary columns."""
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    updated = DashboardSummary.objects.filter(pk=SUMMARY_PK).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+    if not updated:
+        # No row yet (or it was deleted): counting from scratch includes this change.
+        rebuild()
+
+
+def totals_of(project):
+    return {total: getattr(project, field) or 0 for field, total in TOTALS.items()}
@@ -0,0 +1,50 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+
+from core.images import derivative_name
+
+register = template.Library()
+
+CARD_SIZES = '(max-width: 768px) 100vw, 400px'
+
+
+def _srcset(variants, fmt):
+    return ', '.join(
+        f"{default_storage.url(derivative_name(variants['hash'], width, fmt))} {width}w"
+        for width in variants['widths']
+    )
+
+
+@register.simple_tag
+def responsive_image(image, variants, alt='', css_class='', sizes=CARD_SIZES, loading='lazy'):
+    """
+    Renders a <picture> with AVIF/WebP sources, a JPEG fallback and a blurred
+    placeholder from the manifest built by core.images. Falls back to the
+    original upload when no derivatives exist yet.
+    """
+    if not image:
+        return ''
+    if not variants:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}" decoding="async">',
+            image.url, alt, css_class, loading,
+        )
+    return render_picture(variants, alt, css_class, sizes, loading)
+
+
+def render_picture(variants, alt='', css_class='', sizes=CARD_SIZES, loading='lazy'):
+    """The <picture> for a manifest from core.images.build_variants()."""
+    sources = format_html_join(
+        '', '<source type="image/{}" srcset="{}" sizes="{}">',
+        ((fmt, _srcset(variants, fmt), sizes) for fmt in variants['formats'] if fmt != 'jpeg'),
+    )
+    fallback = default_storage.url(derivative_name(variants['hash'], variants['widths'][-1], 'jpeg'))
+    return format_html(
+        '<picture style="display: contents;">{}'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" width="{}" height="{}" loading="{}" decoding="async" '
+        'style="background: url(\'{}\') center / cover no-repeat;" onload="this.style.background=\'none\'">'
+        '</picture>',
+        sources, fallback, _srcset(variants, 'jpeg'), sizes, alt, css_class,
+        variants['width'], variants['height'], loading, variants['lqip'],
+    )
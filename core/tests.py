@@ -1,3 +1,869 @@
-from django.test import TestCase
+import sqlite3
+import tempfile
+from importlib import import_module
+from io import BytesIO, StringIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import OperationalError, connections, transaction
+from django.template import engines
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import get_urlconf, set_urlconf
+from django.utils import timezone
+from PIL import Image
+
+from NanoStack_Technologies import storage
+from NanoStack_Technologies.middleware import ADMIN_URLCONF
+
+from core import (
+    async_views, cache, deploy, edge, export, pagination, ratelimit, related, replica, sitemap_files, spool, views,
+)
+from core import search as search_index
+from core.models import EXCERPT_WORDS, BlogPost, ContactMessage, JobOpening, Project, SpamRule, Tag, summarize_html
+from core.spam import is_spam
+
+ADMIN_HOST = 'nanoadmin.nanostacktechnologies.com'
+
+
+def image_file(name='cover.png'):
+    buffer = BytesIO()
+    Image.new('RGB', (48, 32), 'teal').save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class SiteFilesMixin:
+    """Points every file and cache the site writes at a temporary directory."""
+
+    def setUp(self):
+        tmp = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.tmp = tmp
+        self.enterContext(override_settings(
+            MEDIA_ROOT=tmp / 'media',
+            SITEMAP_ROOT=tmp / 'sitemaps',
+            FEED_ROOT=tmp / 'feeds',
+            SITE_EXPORT_ROOT=tmp / 'site',
+            EDGE_CACHE_DIR=tmp / 'edge',
+            EDGE_CACHE_INDEX=tmp / 'edge_cache.sqlite3',
+            RATE_LIMIT_DB=tmp / 'ratelimit.sqlite3',
+            CONTACT_SPOOL_DB=tmp / 'contact_spool.sqlite3',
+            REPLICA_DB=tmp / 'replica.sqlite3',
+            DEPLOY_VERSION='test',
+            CACHES={
+                'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'test'},
+                'fragments': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'fragments'},
+            },
+        ))
+        for alias in ('default', 'fragments'):
+            caches[alias].clear()  # locmem caches outlive the override
+        deploy.version.cache_clear()
+        self.addCleanup(deploy.version.cache_clear)
+
+    def create_post(self, title='First post', content='<p>Django and SQLite.</p>', tags=''):
+        post = BlogPost.objects.create(title=title, content=content, image=image_file())
+        if tags:
+            post.set_tags(tags)
+        return post
+
+    def create_project(self, title='Portal'):
+        return Project.objects.create(
+            title=title, description='<p>Built with Django.</p>', image=image_file(), tech_stack='Django',
+        )
+
+
+class SiteTestCase(SiteFilesMixin, TestCase):
+    pass
+
+
+class AdminHostSaveTests(SiteFilesMixin, TransactionTestCase):
+    # Autocommit, as in production: on_commit work runs inside the admin
+    # request, while its urlconf is still set.
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(self.user)
+
+    def post(self, path, data):
+        return self.client.post(path, data, headers={'host': ADMIN_HOST}, secure=True)
+
+    def test_saving_a_post_rewrites_the_public_sitemap(self):
+        post = self.create_post()
+        response = self.post(f'/blogs/{post.pk}/edit/', {
+            'title': 'Renamed', 'slug': post.slug, 'content': '<p>New body</p>', 'author': 'Admin',
+            'tags': 'django', 'image': image_file(),
+        })
+        self.assertEqual(response.status_code, 302)
+        sitemap = sitemap_files.file_path('blog').read_text()
+        self.assertIn(f'https://nanostacktechnologies.com/blog/{post.slug}/', sitemap)
+        index = sitemap_files.file_path(sitemap_files.INDEX_NAME).read_text()
+        self.assertIn('https://nanostacktechnologies.com/sitemap-blog.xml', index)
+
+    def test_saving_a_project(self):
+        project = self.create_project()
+        response = self.post(f'/projects/{project.pk}/edit/', {
+            'title': 'Portal v2', 'slug': project.slug, 'description': '<p>Rebuilt</p>',
+            'tech_stack': 'Django', 'image': image_file(),
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(f'/projects/{project.slug}/', sitemap_files.file_path('projects').read_text())
+
+    def test_saving_a_post_updates_the_static_export(self):
+        post = self.create_post()
+        export.export_all()
+        response = self.post(f'/blogs/{post.pk}/edit/', {
+            'title': 'Renamed', 'slug': post.slug, 'content': '<p>New body</p>', 'author': 'Admin',
+            'image': image_file(),
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(b'New body', export.file_path(f'/blog/{post.slug}/').read_bytes())
+
+    def test_export_runs_with_the_admin_urlconf_set(self):
+        # As in request_finished after an admin-host request.
+        post = self.create_post()
+        export.export_all()
+        BlogPost.objects.filter(pk=post.pk).update(title='Renamed')
+        urlconf = get_urlconf()
+        set_urlconf(ADMIN_URLCONF)
+        try:
+            written, _ = export.export_changed({f'core.blogpost:{post.pk}'})
+            self.assertEqual(get_urlconf(), ADMIN_URLCONF)
+        finally:
+            set_urlconf(urlconf)
+        self.assertGreater(written, 0)
+        self.assertIn(b'Renamed', export.file_path(f'/blog/{post.slug}/').read_bytes())
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class AsyncViewTests(SiteTestCase):
+    def test_async_views_render_the_sync_pages(self):
+        post = self.create_post(tags='django')
+        self.create_post(title='Second post', tags='django')
+        project = self.create_project()
+        pages = [
+            ('home', '/', {}), ('blog', '/blog/', {}), ('blog_tag', '/blog/tag/django/', {'slug': 'django'}),
+            ('blog_detail', f'/blog/{post.slug}/', {'slug': post.slug}),
+            ('project_detail', f'/projects/{project.slug}/', {'slug': project.slug}),
+            ('search', '/search/?q=django', {}),
+        ]
+        for name, path, kwargs in pages:
+            with self.subTest(name):
+                sync_response = getattr(views, name)(RequestFactory().get(path), **kwargs)
+                async_response = async_to_sync(getattr(async_views, name))(RequestFactory().get(path), **kwargs)
+                self.assertEqual(async_response.status_code, 200)
+                self.assertEqual(async_response.content, sync_response.content)
+                self.assertEqual(async_response.get('ETag'), sync_response.get('ETag'))
+
+
+class ConditionalGetTests(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = self.create_post('Django caching', '<p>Caching Django pages with ETags.</p>', tags='django')
+        self.related = self.create_post('Django signals', '<p>Caching with Django signals.</p>', tags='django')
+        self.other = self.create_post('Gardening', '<p>Tomatoes and basil.</p>')
+        related.rebuild_related_posts()
+        self.url = f'/blog/{self.post.slug}/'
+
+    def test_unchanged_page_is_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Django signals')
+        self.assertEqual(self.client.get(self.url, headers={'if-none-match': response['ETag']}).status_code, 304)
+        since = response['Last-Modified']
+        self.assertEqual(self.client.get(self.url, headers={'if-modified-since': since}).status_code, 304)
+
+    def test_only_the_rows_shown_change_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.other.save()
+        self.assertEqual(self.client.get(self.url, headers={'if-none-match': etag}).status_code, 304)
+        self.related.title = 'Django signals, revisited'
+        self.related.save()
+        response = self.client.get(self.url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Django signals, revisited')
+
+    def test_new_deploy_changes_the_etag_only(self):
+        response = self.client.get(self.url)
+        deploy.version.cache_clear()
+        with override_settings(DEPLOY_VERSION='next'):
+            again = self.client.get(self.url)
+        self.assertNotEqual(again['ETag'], response['ETag'])
+        self.assertEqual(again['Last-Modified'], response['Last-Modified'])
+
+    def test_listing_etag(self):
+        etag = self.client.get('/blog/')['ETag']
+        self.assertEqual(self.client.get('/blog/', headers={'if-none-match': etag}).status_code, 304)
+        self.create_post('Another post')
+        self.assertEqual(self.client.get('/blog/', headers={'if-none-match': etag}).status_code, 200)
+
+    def test_missing_post(self):
+        self.assertEqual(self.client.get('/blog/no-such-post/').status_code, 404)
+
+
+class ImageVariantTests(SiteTestCase):
+    def test_upload_builds_variants(self):
+        post = self.create_post()
+        self.assertEqual(post.image_variants['width'], 48)
+        self.assertTrue(post.image_variants['lqip'].startswith('data:image/jpeg;base64,'))
+        self.assertContains(self.client.get(f'/blog/{post.slug}/'), '<picture')
+
+    def test_command_refreshes_the_detail_page(self):
+        post = self.create_post()
+        BlogPost.objects.filter(pk=post.pk).update(image_variants={})
+        response = self.client.get(f'/blog/{post.slug}/')
+        self.assertNotContains(response, '<picture')
+        call_command('generate_image_variants', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertTrue(post.image_variants)
+        response = self.client.get(f'/blog/{post.slug}/', headers={'if-none-match': response['ETag']})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<picture')
+
+
+class RenderedContentTests(SiteTestCase):
+    def test_content_is_sanitized_on_save(self):
+        post = self.create_post(content='<h2>Setup</h2><p onclick="x()">Hi<script>alert(1)</script></p>')
+        self.assertNotIn('script', post.rendered_content)
+        self.assertNotIn('onclick', post.rendered_content)
+        self.assertEqual(post.toc[0]['title'], 'Setup')
+        self.assertContains(self.client.get(f'/blog/{post.slug}/'), 'Setup')
+
+    def test_rebuild_changes_the_validators(self):
+        post = self.create_post()
+        etag = self.client.get(f'/blog/{post.slug}/')['ETag']
+        BlogPost.objects.filter(pk=post.pk).update(rendered_content='<p>stale</p>')
+        call_command('rebuild_rendered_content', stdout=StringIO())
+        response = self.client.get(f'/blog/{post.slug}/', headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'stale')
+
+
+class ReplicaTests(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(replica.end_request)
+        self.addCleanup(replica.take_changed)
+
+    def use_file_primary(self):
+        # refresh() skips the in-memory test database; copy a file instead.
+        primary = self.tmp / 'primary.sqlite3'
+        with sqlite3.connect(primary) as db:
+            db.execute('CREATE TABLE t (x)')
+        self.enterContext(mock.patch.dict(settings.DATABASES['default'], NAME=str(primary)))
+        return primary
+
+    def test_queryset_writes_are_seen(self):
+        post = self.create_post()
+        replica.take_changed()
+        replica.begin_request(public=True)
+        BlogPost.objects.filter(pk=post.pk).update(title='Renamed')
+        # Read your own writes, and refresh once the response is sent.
+        self.assertEqual(replica.read_alias(), 'default')
+        self.assertTrue(replica.take_changed())
+        self.assertFalse(replica.take_changed())
+
+    def test_any_write_to_the_primary_makes_the_snapshot_stale(self):
+        primary = self.use_file_primary()
+        self.assertTrue(replica.refresh())
+        self.assertFalse(replica.refresh())
+        replica.begin_request(public=True)
+        self.assertEqual(replica.read_alias(), replica.ALIAS)
+        with sqlite3.connect(primary) as db:
+            db.execute('INSERT INTO t VALUES (1)')
+        self.assertTrue(replica.is_stale())
+        replica.begin_request(public=True)
+        self.assertEqual(replica.read_alias(), 'default')
+        with override_settings(REPLICA_MAX_LAG=60):
+            replica.begin_request(public=True)
+            self.assertEqual(replica.read_alias(), replica.ALIAS)
+        replica.begin_request(public=False)
+        self.assertIsNone(replica.read_alias())
+
+    def test_refresh_is_debounced(self):
+        primary = self.use_file_primary()
+        replica.refresh()
+        with sqlite3.connect(primary) as db:
+            db.execute('INSERT INTO t VALUES (1)')
+        self.assertFalse(replica.refresh_if_due())
+        with override_settings(REPLICA_REFRESH_INTERVAL=0):
+            self.assertTrue(replica.refresh_if_due())
+        self.assertFalse(replica.is_stale())
+        with sqlite3.connect(settings.REPLICA_DB) as snapshot:
+            self.assertEqual(snapshot.execute('SELECT x FROM t').fetchall(), [(1,)])
+
+
+class ContactSpoolTests(SiteTestCase):
+    def submit(self, n=0):
+        return self.client.post('/api/contact/', {
+            'name': 'Asha', 'email': 'asha@example.com', 'subject': f'Quote {n}', 'message': 'We need a portal.',
+        })
+
+    def test_messages_wait_for_a_full_batch(self):
+        with override_settings(CONTACT_SPOOL_BATCH=3):
+            for n in range(2):
+                self.assertEqual(self.submit(n).status_code, 201)
+            self.assertEqual(ContactMessage.objects.count(), 0)
+            self.assertEqual(spool.pending(), 2)
+            self.submit(2)
+        self.assertEqual(spool.pending(), 0)
+        self.assertEqual(
+            sorted(ContactMessage.objects.values_list('subject', flat=True)), ['Quote 0', 'Quote 1', 'Quote 2'],
+        )
+
+    def test_old_messages_are_due(self):
+        self.submit()
+        self.assertFalse(spool.is_due())
+        with override_settings(CONTACT_SPOOL_MAX_AGE=0):
+            self.assertTrue(spool.is_due())
+            self.submit(1)
+        self.assertEqual(ContactMessage.objects.count(), 2)
+
+    def test_flush_keeps_the_submission_time(self):
+        self.submit()
+        payload = spool._spool().execute('SELECT payload FROM spool').fetchone()[0]
+        self.assertEqual(spool.flush(), 1)
+        message = ContactMessage.objects.get()
+        self.assertIn(message.created_at.isoformat()[:19], payload)
+        self.assertEqual(message.ip_address, '127.0.0.1')
+        self.assertEqual(spool.flush(), 0)
+
+
+class StaticStorageTests(SimpleTestCase):
+    def test_js_is_minified_line_by_line(self):
+        js = "// Counter\nconst a = 1\n\n    if (a) {\n        go('//x')\n    }\n"
+        self.assertEqual(storage.minify_js(js), "const a = 1\nif (a) {\ngo('//x')\n}\n")
+
+    def test_template_literals_are_left_alone(self):
+        js = "const html = `\n    <p>${name}</p>\n`;\n"
+        self.assertEqual(storage.minify_js(js), js)
+
+    def test_collectstatic_writes_minified_and_compressed_files(self):
+        root = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        with override_settings(STATIC_ROOT=root):
+            call_command('collectstatic', interactive=False, verbosity=0)
+        site_js = next(path for path in (root / 'js').glob('site.*.js') if path.name != 'site.js')
+        js = site_js.read_text()
+        self.assertNotIn('\n ', js)
+        self.assertLess(len(js), len((root / 'js' / 'site.js').read_text()))
+        self.assertTrue(Path(f'{site_js}.gz').exists())
+        self.assertEqual(Path(f'{site_js}.br').exists(), storage.brotli is not None)
+        self.assertNotIn('/*', next((root / 'css').glob('style.*[0-9a-f].css')).read_text())
+
+
+class PageCacheTests(SiteTestCase):
+    def test_pages_are_served_from_the_cache_until_their_models_change(self):
+        project = self.create_project()
+        self.assertEqual(self.client.get('/projects/')['X-Page-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/projects/')['X-Page-Cache'], 'HIT')
+
+        self.create_post()
+        self.assertEqual(self.client.get('/projects/')['X-Page-Cache'], 'HIT')
+
+        project.title = 'Client portal'
+        project.save()
+        response = self.client.get('/projects/')
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, 'Client portal')
+
+    def test_deleting_a_post_invalidates_the_listing(self):
+        self.create_post(title='Kept')
+        self.create_post(title='Withdrawn').delete()
+        self.assertContains(self.client.get('/blog/'), 'Kept')
+        BlogPost.objects.get(title='Kept').delete()
+        response = self.client.get('/blog/')
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertNotContains(response, 'Kept')
+
+    def test_hits_and_misses_are_counted(self):
+        self.client.get('/about/')
+        self.client.get('/about/')
+        self.client.get('/about/')
+        out = StringIO()
+        call_command('page_cache_stats', '--reset', stdout=out)
+        self.assertIn('Hit ratio: 66.7%', out.getvalue())
+        self.assertEqual(cache.get_stats()['misses'], 0)
+
+
+class KeysetPaginationTests(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        for n in range(5):
+            self.create_post(title=f'Post {n}')
+        # Ties on created_at are broken by id.
+        BlogPost.objects.filter(title__in=['Post 1', 'Post 2']).update(created_at=timezone.now())
+        self.newest_first = list(BlogPost.objects.order_by('-created_at', '-id').values_list('title', flat=True))
+
+    def paginate(self, **params):
+        return pagination.keyset_paginate(BlogPost.objects.all(), params, per_page=2)
+
+    def test_cursors_walk_every_row_once_in_both_directions(self):
+        page, seen = self.paginate(), []
+        while True:
+            seen += [post.title for post in page]
+            if not page.next_cursor:
+                break
+            page = self.paginate(after=page.next_cursor)
+        self.assertEqual(seen, self.newest_first)
+
+        seen = [post.title for post in page]
+        while page.prev_cursor:
+            page = self.paginate(before=page.prev_cursor)
+            seen = [post.title for post in page] + seen
+        self.assertEqual(seen, self.newest_first)
+
+    def test_listing_links_to_the_next_page(self):
+        with override_settings(PAGE_CACHE_ENABLED=False), mock.patch.object(views, 'POSTS_PER_PAGE', 2):
+            response = self.client.get('/blog/')
+            self.assertEqual([post.title for post in response.context['posts']], self.newest_first[:2])
+            next_page = self.client.get(f"/blog/fragment/{response.context['page'].next_query}")
+        self.assertEqual([post.title for post in next_page.context['posts']], self.newest_first[2:4])
+
+    def test_malformed_cursors_are_not_found(self):
+        self.assertEqual(self.client.get('/blog/?after=yesterday').status_code, 404)
+
+
+class SummaryFieldTests(SiteTestCase):
+    def test_excerpt_is_plain_text(self):
+        excerpt, words = summarize_html('<p>Fish &amp; <b>chips</b></p><p>for two</p>')
+        self.assertEqual((excerpt, words), ('Fish & chips for two', 5))
+        self.assertEqual(summarize_html('one<br>two<BR />three')[1], 3)
+
+    def test_rebuild_recomputes_stored_summaries(self):
+        post = self.create_post(content='<p>Three short words</p>')
+        BlogPost.objects.filter(pk=post.pk).update(excerpt='stale', word_count=0)
+        call_command('rebuild_rendered_content', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual((post.excerpt, post.word_count), ('Three short words', 3))
+
+    def test_saving_a_post_stores_its_summary(self):
+        post = self.create_post(content='<p>%s</p>' % ('word ' * 450))
+        self.assertEqual(post.word_count, 450)
+        self.assertEqual(post.reading_time, 2)
+        self.assertTrue(post.excerpt.endswith('…'))
+        self.assertEqual(len(post.excerpt.split()), EXCERPT_WORDS)
+
+        post.content = '<p>Short now.</p>'
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual((post.excerpt, post.word_count, post.reading_time), ('Short now.', 2, 1))
+
+    def test_listings_do_not_load_the_body(self):
+        self.create_post(content='<p>The listing shows this.</p>')
+        self.create_project()
+        with override_settings(PAGE_CACHE_ENABLED=False):
+            blog = self.client.get('/blog/')
+            projects = self.client.get('/projects/')
+        self.assertContains(blog, 'The listing shows this.')
+        self.assertContains(projects, 'Built with Django.')
+        for obj in [*blog.context['posts'], *projects.context['projects']]:
+            self.assertIn('rendered_content', obj.get_deferred_fields())
+
+
+class TagTests(SiteTestCase):
+    def test_set_tags_normalizes_and_replaces(self):
+        post = self.create_post(tags='Django, python , django,,')
+        self.assertEqual(post.tag_names, 'Django, python')
+        other = self.create_post(title='Second', tags='Python')
+        self.assertEqual(other.tags.get().name, 'python')
+        post.set_tags('SQLite')
+        self.assertEqual(post.tag_names, 'SQLite')
+        self.assertEqual(Tag.objects.count(), 3)
+
+    def test_tag_page_lists_only_its_posts(self):
+        self.create_post(title='About Django', tags='Django, Python')
+        self.create_post(title='About SQLite', tags='SQLite')
+        response = self.client.get('/blog/tag/django/')
+        self.assertEqual([post.title for post in response.context['posts']], ['About Django'])
+        self.assertEqual(
+            [(tag.name, tag.post_count) for tag in response.context['tags']], [('Django', 1), ('Python', 1), ('SQLite', 1)],
+        )
+        self.assertEqual(self.client.get('/blog/tag/rust/').status_code, 404)
+
+    def test_retagging_refreshes_the_tag_page(self):
+        post = self.create_post(title='About Django', tags='Django')
+        self.create_post(title='Flask notes', tags='Flask')
+        self.assertContains(self.client.get('/blog/tag/django/'), 'About Django')
+        post.set_tags('Flask')
+        response = self.client.get('/blog/tag/django/')
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertEqual(list(response.context['posts']), [])
+
+
+class RelatedPostTests(SiteTestCase):
+    def related_titles(self, post):
+        return list(post.related_links.order_by('-score').values_list('related__title', flat=True))
+
+    def test_similar_posts_rank_first(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            orm = self.create_post('Django ORM tuning', '<p>Indexes make Django ORM queries fast.</p>', tags='django')
+            self.create_post('Django ORM queries', '<p>Reading Django ORM query plans.</p>', tags='django')
+            self.create_post('Django templates', '<p>Template inheritance.</p>', tags='django')
+            self.create_post('Sourdough', '<p>Bread needs a starter.</p>')
+        self.assertEqual(self.related_titles(orm), ['Django ORM queries', 'Django templates'])
+
+        response = self.client.get(f'/blog/{orm.slug}/')
+        self.assertEqual([post.title for post in response.context['related_posts']], self.related_titles(orm))
+
+    def test_saving_a_post_updates_the_lists_it_enters(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            bread = self.create_post('Sourdough', '<p>Bread needs a starter.</p>')
+            cake = self.create_post('Sponge cake', '<p>Whisk the eggs.</p>')
+            # Terms every post shares carry no weight.
+            self.create_post('Django ORM', '<p>Query plans.</p>')
+        self.assertEqual(self.related_titles(bread), [])
+        cake.content = '<p>Whisk the eggs. Unlike bread, cake needs no starter.</p>'
+        cake.save()
+        related.refresh_related_posts(cake.pk)
+        self.assertEqual(self.related_titles(bread), ['Sponge cake'])
+        self.assertEqual(self.related_titles(cake), ['Sourdough'])
+
+    def test_rebuild_matches_the_incremental_lists(self):
+        posts = []
+        for n, topic in enumerate(['caching', 'caching', 'signals', 'admin', 'caching signals']):
+            posts.append(self.create_post(f'Django post {n}', f'<p>Django {topic}.</p>', tags='django'))
+            related.refresh_related_posts(posts[-1].pk)  # the first call builds the corpus
+        incremental = {post.pk: set(self.related_titles(post)) for post in posts}
+        related.rebuild_related_posts()
+        self.assertEqual({post.pk: set(self.related_titles(post)) for post in posts}, incremental)
+
+
+class SearchTests(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = self.create_post('Caching Django pages', '<p>Signals keep the <b>cache</b> fresh.</p>')
+        self.project = self.create_project('Django portal')
+        JobOpening.objects.create(
+            title='Backend developer', description='Python & Django', requirements='SQLite', location='Pune',
+            type='Full Time',
+        )
+
+    def kinds(self, text):
+        return [result['kind'] for result in search_index.search(text)]
+
+    def test_match_query_quotes_every_word(self):
+        self.assertEqual(search_index.build_match_query('Django ORM!'), '"django" "orm"*')
+        self.assertEqual(search_index.build_match_query('"OR" NEAR('), '"or" "near"*')
+        self.assertEqual(search_index.build_match_query('  !? '), '')
+
+    def test_searches_every_kind_with_stems_and_prefixes(self):
+        self.assertEqual(sorted(self.kinds('django')), ['blog', 'job', 'project'])
+        self.assertEqual(self.kinds('cached'), ['blog'])
+        self.assertEqual(self.kinds('backe'), ['job'])
+        self.assertEqual(self.kinds('django pune'), ['job'])
+
+    def test_titles_outrank_bodies(self):
+        self.create_post('Signals in depth', '<p>Nothing about the other word.</p>')
+        results = search_index.search('signals')
+        self.assertEqual([result['title'] for result in results], ['<mark>Signals</mark> in depth', 'Caching Django pages'])
+        self.assertIn('<mark>Signals</mark> keep the cache fresh.', results[1]['snippet'])
+        self.assertEqual(results[1]['url'], f'/blog/{self.post.slug}/')
+
+    def test_index_follows_saves_and_deletes(self):
+        self.post.title = 'Invalidating pages'
+        self.post.save()
+        self.assertEqual(self.kinds('invalidating'), ['blog'])
+        self.project.delete()
+        self.assertEqual(self.kinds('django'), ['job'])
+
+    def test_search_api(self):
+        data = self.client.get('/api/search/', {'q': 'portal', 'limit': 5}).json()
+        self.assertEqual([result['url'] for result in data['results']], [f'/projects/{self.project.slug}/'])
+        self.assertEqual(self.client.get('/api/search/', {'q': 'x', 'limit': 'all'}).status_code, 400)
+        self.assertEqual(self.client.get('/search/', {'q': '<script>'}).status_code, 200)
+
+
+class FeedTests(SiteTestCase):
+    def get(self, path, **headers):
+        response = self.client.get(path, headers=headers)
+        self.addCleanup(response.close)
+        return response
+
+    def test_feed_is_written_once_and_answers_conditional_gets(self):
+        self.create_post('Older')
+        self.create_post('Newer')
+        response = self.get('/blog/feed/rss/')
+        self.assertEqual(response['Content-Type'], 'application/rss+xml; charset=utf-8')
+        xml = response.getvalue()
+        self.assertLess(xml.index(b'<title>Newer</title>'), xml.index(b'<title>Older</title>'))
+        self.assertEqual(len(list((self.tmp / 'feeds').glob('rss-all-*.xml'))), 1)
+
+        self.assertEqual(self.get('/blog/feed/rss/', if_none_match=response['ETag']).status_code, 304)
+        self.assertEqual(self.get('/blog/feed/rss/', if_modified_since=response['Last-Modified']).status_code, 304)
+
+    def test_saving_a_post_regenerates_the_feed(self):
+        post = self.create_post('Before')
+        etag = self.get('/blog/feed/atom/')['ETag']
+        post.title = 'After'
+        post.save()
+        response = self.get('/blog/feed/atom/', if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn(b'After', response.getvalue())
+        self.assertEqual(len(list((self.tmp / 'feeds').glob('atom-all-*.xml'))), 1)
+
+    def test_tag_feeds(self):
+        self.create_post('Tagged', tags='Django')
+        self.create_post('Untagged')
+        xml = self.get('/blog/tag/django/feed/rss/').getvalue()
+        self.assertIn(b'<title>Tagged</title>', xml)
+        self.assertNotIn(b'Untagged', xml)
+        self.assertIn(b'<category>Django</category>', xml)
+        self.assertEqual(self.get('/blog/tag/rust/feed/rss/').status_code, 404)
+
+
+class MiddlewareChainTests(SiteTestCase):
+    def test_public_pages_skip_sessions_csrf_and_auth(self):
+        response = self.client.get('/about/')
+        request = response.wsgi_request
+        self.assertFalse(request.full_middleware)
+        self.assertFalse(hasattr(request, 'session') or hasattr(request, 'user'))
+        self.assertEqual(response.cookies, {})
+        self.assertEqual(response['X-Frame-Options'], 'DENY')
+
+    def test_forms_and_unsafe_methods_use_the_full_chain(self):
+        response = self.client.get('/contact/')
+        self.assertTrue(response.wsgi_request.full_middleware)
+        self.assertIn(settings.CSRF_COOKIE_NAME, response.cookies)
+
+        csrf_client = self.client_class(enforce_csrf_checks=True)
+        self.assertEqual(csrf_client.post('/contact/', {'name': 'Asha'}).status_code, 403)
+        self.assertTrue(self.client.post('/api/contact/', {}).wsgi_request.full_middleware)
+
+    def test_admin_host_gets_its_urlconf_and_the_full_chain(self):
+        response = self.client.get('/', headers={'host': ADMIN_HOST}, secure=True)
+        self.assertTrue(response.wsgi_request.full_middleware)
+        self.assertEqual(response.wsgi_request.urlconf, ADMIN_URLCONF)
+        self.assertTrue(hasattr(response.wsgi_request, 'user'))
+
+
+class SpamRuleTests(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        SpamRule.objects.all().delete()
+        self.rules = {
+            kind: SpamRule.objects.create(kind=kind, value=value) for kind, value in [
+                (SpamRule.EMAIL, '@spam.example'),
+                (SpamRule.PATTERN, 'crypto'),
+                (SpamRule.SCRIPT, '0400-04FF'),
+                (SpamRule.TLD, '.ru'),
+            ]
+        }
+        self.regex = SpamRule.objects.create(kind=SpamRule.PATTERN, value=r'b[i1]tc[o0]in')
+
+    def fired(self, email='asha@example.com', subject='Quote', message='We need a portal.'):
+        before = dict(SpamRule.objects.values_list('pk', 'hit_count'))
+        spam = is_spam({'email': email, 'subject': subject, 'message': message})
+        hits = [pk for pk, count in SpamRule.objects.values_list('pk', 'hit_count') if count != before[pk]]
+        self.assertEqual(spam, bool(hits))
+        return hits
+
+    def test_each_kind_of_rule(self):
+        self.assertEqual(self.fired(), [])
+        self.assertEqual(self.fired(email='Bot@SPAM.example'), [self.rules['email'].pk])
+        self.assertEqual(self.fired(subject='CRYPTO offer'), [self.rules['pattern'].pk])
+        self.assertEqual(self.fired(message='Привет'), [self.rules['script'].pk])
+        self.assertEqual(self.fired(message='See http://shop.ru/now'), [self.rules['tld'].pk])
+        self.assertEqual(self.fired(message='See http://shop.rugby.com/'), [])
+        self.assertEqual(self.fired(message='Buy B1TC0IN'), [self.regex.pk])
+        self.assertIsNotNone(SpamRule.objects.get(pk=self.regex.pk).last_hit_at)
+
+    def test_rule_edits_apply_without_a_restart(self):
+        self.assertEqual(self.fired(subject='SEO services'), [])
+        seo = SpamRule.objects.create(kind=SpamRule.PATTERN, value='seo services')
+        self.assertEqual(self.fired(subject='SEO services'), [seo.pk])
+        seo.is_active = False
+        seo.save()
+        self.assertEqual(self.fired(subject='SEO services'), [])
+
+    def test_invalid_rules_are_rejected_or_skipped(self):
+        rule = SpamRule(kind=SpamRule.PATTERN, value='(?i)casino')
+        with self.assertRaises(ValidationError):
+            rule.full_clean()
+        # Saved around the admin's validation, a broken rule only disables itself.
+        SpamRule.objects.bulk_create([SpamRule(kind=SpamRule.PATTERN, value='(unclosed')])
+        SpamRule.objects.create(kind=SpamRule.PATTERN, value='casino')
+        with self.assertLogs('core.spam', 'WARNING'):
+            self.assertEqual(len(self.fired(message='Casino bonus')), 1)
+        self.assertEqual(self.fired(message='Buy bitcoin'), [self.regex.pk])
+
+    def test_spam_is_accepted_but_not_stored(self):
+        response = self.client.post('/api/contact/', {
+            'name': 'Bot', 'email': 'bot@example.com', 'subject': 'Hi', 'message': 'Cheap crypto', 'website': '',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.client.post('/api/contact/', {
+            'name': 'Bot', 'email': 'bot@example.com', 'subject': 'Hi', 'message': 'Hello', 'website': 'http://x',
+        })
+        self.assertEqual(spool.pending() + ContactMessage.objects.count(), 0)
+
+
+class RateLimitTests(SiteTestCase):
+    def post(self, path='/api/contact/', ip='203.0.113.5', **headers):
+        return self.client.post(path, {'name': 'Asha'}, headers={'x-real-ip': ip, **headers})
+
+    def test_bucket_refills_over_the_period(self):
+        with mock.patch('core.ratelimit.time.time', return_value=1000.0) as now:
+            self.assertEqual([ratelimit.consume('k', 2, 60) for _ in range(2)], [0, 0])
+            self.assertAlmostEqual(ratelimit.consume('k', 2, 60), 30)
+            now.return_value = 1015.0
+            self.assertAlmostEqual(ratelimit.consume('k', 2, 60), 15)
+            now.return_value = 1030.0
+            self.assertEqual(ratelimit.consume('k', 2, 60), 0)
+            self.assertEqual(ratelimit.consume('other', 2, 60), 0)
+
+    def test_contact_posts_are_limited_per_client(self):
+        limits = {'contact': {'paths': ['/contact/', '/api/contact/'], 'burst': 2, 'period': 60}}
+        with override_settings(RATE_LIMITS=limits):
+            self.assertEqual([self.post().status_code for _ in range(2)], [400, 400])
+            response = self.post()
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response.json(), {'error': 'Too many requests'})
+            self.assertGreater(int(response['Retry-After']), 29)
+            # Both paths share the bucket, and forged X-Forwarded-For entries are ignored.
+            self.assertEqual(self.post('/contact/', x_forwarded_for='198.51.100.1').status_code, 429)
+            self.assertEqual(self.post(ip='203.0.113.6').status_code, 400)
+            self.assertEqual(self.client.get('/contact/', headers={'x-real-ip': '203.0.113.5'}).status_code, 200)
+
+    def test_limiter_errors_let_requests_through(self):
+        with override_settings(RATE_LIMIT_DB=self.tmp / 'missing' / 'ratelimit.sqlite3'), \
+                self.assertLogs('core.ratelimit', 'ERROR'):
+            self.assertEqual(ratelimit.consume('k', 1, 60), 0)
+
+
+class SQLiteProfileTests(SimpleTestCase):
+    """The settings.DATABASES profile, on connections to temporary files."""
+
+    def open(self, path, **options):
+        default = connections['default']
+        settings_dict = {**default.settings_dict, 'NAME': str(path)}
+        settings_dict['OPTIONS'] = {**settings_dict['OPTIONS'], **options}
+        alias = f'profile{id(settings_dict)}'
+        connections[alias] = wrapper = type(default)(settings_dict, alias=alias)
+        self.addCleanup(connections.__delitem__, alias)
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_connections_apply_the_pragmas(self):
+        wrapper = self.open(Path(self.enterContext(tempfile.TemporaryDirectory())) / 'db.sqlite3')
+        self.assertEqual(self.pragma(wrapper, 'busy_timeout'), settings.SQLITE_PRAGMAS['busy_timeout'])
+        self.assertEqual(self.pragma(wrapper, 'cache_size'), settings.SQLITE_PRAGMAS['cache_size'])
+        self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma(wrapper, 'temp_store'), 2)  # MEMORY
+
+    def test_migration_switches_the_file_to_wal(self):
+        wal = import_module('core.migrations.0020_sqlite_wal')
+        wrapper = self.open(Path(self.enterContext(tempfile.TemporaryDirectory())) / 'db.sqlite3')
+        editor = SimpleNamespace(connection=wrapper)
+        wal.enable_wal(None, editor)
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+        wal.disable_wal(None, editor)
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'delete')
+
+    def test_transactions_take_the_write_lock_up_front(self):
+        path = Path(self.enterContext(tempfile.TemporaryDirectory())) / 'db.sqlite3'
+        first = self.open(path)
+        second = self.open(path, init_command='PRAGMA busy_timeout=0')
+        with first.cursor() as cursor:
+            cursor.execute('CREATE TABLE t (x)')
+        with transaction.atomic(using=first.alias), first.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM t')  # a read only
+            with self.assertRaisesMessage(OperationalError, 'database is locked'):
+                second.cursor().execute('BEGIN IMMEDIATE')
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class TemplateFragmentTests(SiteTestCase):
+    def fragment(self, name, *vary_on):
+        return caches['fragments'].get(make_template_fragment_key(name, vary_on))
+
+    def test_nav_fragment_marks_the_current_page(self):
+        about = self.client.get('/about/').content.decode()
+        projects = self.client.get('/projects/').content.decode()
+        self.assertIn('href="/about/" class="active"', about)
+        self.assertNotIn('href="/projects/" class="active"', about)
+        self.assertIn('href="/projects/" class="active"', projects)
+
+    def test_fragments_are_kept_until_the_next_deploy(self):
+        self.client.get('/about/')
+        head = self.fragment('base_head', 'test')
+        self.assertIn('<link', head)
+        self.assertIsNotNone(self.fragment('base_footer', 'test', str(timezone.localdate().year)))
+        self.client.get('/career/')
+        self.assertEqual(self.fragment('base_head', 'test'), head)
+
+        deploy.version.cache_clear()
+        with override_settings(DEPLOY_VERSION='next'):
+            self.assertIsNone(self.fragment('base_head', 'next'))
+            self.client.get('/about/')
+            self.assertIsNotNone(self.fragment('base_head', 'next'))
+            self.assertIsNotNone(self.fragment('base_nav', 'next', 'about'))
+
+    def test_warm_templates_fills_the_cached_loader(self):
+        loader = engines['django'].engine.template_loaders[0]
+        loader.reset()
+        self.assertEqual(deploy.warm_templates(), len(deploy.template_names()))
+        self.assertIn('base.html', deploy.template_names())
+        self.assertIn('core/blog_detail.html', loader.get_template_cache)
+
+
+class EdgeCacheTests(SiteTestCase):
+    def fetch(self, path):
+        """Requests ``path`` the way nginx does and stores what nginx would."""
+        key = f'httpstestserver{path}'
+        response = self.client.get(path, headers={'x-cache-key': key})
+        if 'X-Accel-Expires' in response:
+            edge.cache_path(key).parent.mkdir(parents=True, exist_ok=True)
+            edge.cache_path(key).write_bytes(response.content)
+        return response, edge.cache_path(key)
+
+    def test_cache_path_follows_the_nginx_levels(self):
+        # md5('httpsexample.com/') == 'a55cf7e43778aa2a772798b74c09dc0e'
+        with override_settings(EDGE_CACHE_DIR='/var/cache/nginx', EDGE_CACHE_LEVELS='1:2'):
+            self.assertEqual(
+                edge.cache_path('httpsexample.com/'), Path('/var/cache/nginx/e/c0/a55cf7e43778aa2a772798b74c09dc0e'),
+            )
+
+    def test_public_pages_are_shared_and_tagged(self):
+        post = self.create_post()
+        response, _ = self.fetch(f'/blog/{post.slug}/')
+        self.assertEqual(
+            response['Cache-Control'], f'public, max-age=0, must-revalidate, s-maxage={settings.EDGE_CACHE_TTL}',
+        )
+        self.assertEqual(response['X-Accel-Expires'], str(settings.EDGE_CACHE_TTL))
+        self.assertIn(f'core.blogpost:{post.pk}', response['Cache-Tag'].split(','))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        for path in ('/contact/', '/search/?q=django'):
+            self.assertNotIn('X-Accel-Expires', self.fetch(path)[0])
+
+    def test_publishing_purges_only_the_pages_that_show_the_row(self):
+        post = self.create_post('Kept')
+        project = self.create_project()
+        cached = {path: self.fetch(path)[1] for path in (
+            '/blog/', f'/blog/{post.slug}/', f'/projects/{project.slug}/', '/about/',
+        )}
+        self.assertTrue(all(path.exists() for path in cached.values()))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            post.title = 'Edited'
+            post.save()
+        self.assertEqual(
+            {path for path, file in cached.items() if not file.exists()}, {'/blog/', f'/blog/{post.slug}/'},
+        )
+
+        self.assertEqual(len(edge.purge([edge.tag_for(project)])), 1)
+        self.assertFalse(cached[f'/projects/{project.slug}/'].exists())
+        edge.purge_all()
+        self.assertFalse(cached['/about/'].exists())
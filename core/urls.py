@@ -1,14 +1,29 @@
+from django.conf import settings
 from django.urls import path
 from . import views
+from .feeds import AtomPostsFeed, LatestPostsFeed
+
+if settings.ASYNC_VIEWS:
+    from . import async_views as views
 
 urlpatterns = [
     path('', views.home, name='home'),
     path('about/', views.about, name='about'),
     path('projects/', views.projects, name='projects'),
+    path('projects/fragment/', views.projects_fragment, name='projects_fragment'),
     path('projects/<slug:slug>/', views.project_detail, name='project_detail'),
     path('blog/', views.blog, name='blog'),
+    path('blog/fragment/', views.blog_fragment, name='blog_fragment'),
+    path('blog/feed/rss/', LatestPostsFeed(), name='blog_feed_rss'),
+    path('blog/feed/atom/', AtomPostsFeed(), name='blog_feed_atom'),
+    path('blog/tag/<slug:slug>/', views.blog_tag, name='blog_tag'),
+    path('blog/tag/<slug:slug>/fragment/', views.blog_tag_fragment, name='blog_tag_fragment'),
+    path('blog/tag/<slug:slug>/feed/rss/', LatestPostsFeed(), name='blog_tag_feed_rss'),
+    path('blog/tag/<slug:slug>/feed/atom/', AtomPostsFeed(), name='blog_tag_feed_atom'),
     path('blog/<slug:slug>/', views.blog_detail, name='blog_detail'),
     path('career/', views.career, name='career'),
+    path('search/', views.search, name='search'),
+    path('api/search/', views.search_api, name='search_api'),
     path('contact/', views.contact, name='contact'),
     path('api/contact/', views.contact_api, name='contact_api'),
 ]
\ No newline at end of file
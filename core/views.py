@@ -1,10 +1,47 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import Project, BlogPost, JobOpening, ContactMessage, Service
+from django.urls import reverse
+from .models import Project, Tag, BlogPost, BlogPostTag, RelatedPost, JobOpening, ContactMessage, Service
+from django.db.models import Count
+from django.http import JsonResponse, HttpResponse, Http404
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage, PageNotAnInteger
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django.contrib import messages
+from .cache import cache_public_page
+from .conditional import condition, detail_etag, detail_last_modified, listing_etag
+from .pagination import keyset_paginate
+from . import edge
+from . import search as search_index
+from . import sitemap_files, spool
+from .sitemaps import SITEMAPS
+from .spam import is_spam
 
+PROJECTS_PER_PAGE = 9
+POSTS_PER_PAGE = 9
+# Large HTML columns that only the detail pages read.
+PROJECT_BODY = ('description', 'rendered_content')
+POST_BODY = ('content', 'rendered_content', 'toc')
+RELATED_SHOWN = 3
+
+def public_view(*decorators):
+    """
+    Applies ``decorators`` to a public view and keeps the undecorated body
+    and the decorators on it, so core.async_views can wrap the same body.
+    """
+    def register(body):
+        view = body
+        for decorator in reversed(decorators):
+            view = decorator(view)
+        view.body = body
+        view.decorators = decorators
+        return view
+    return register
+
+@public_view(cache_public_page(Project, BlogPost, Service))
 def home(request):
-    recent_projects = Project.objects.all().order_by('-created_at')[:3]
-    recent_blogs = BlogPost.objects.all().order_by('-created_at')[:3]
+    recent_projects = Project.objects.defer(*PROJECT_BODY).order_by('-created_at')[:3]
+    recent_blogs = BlogPost.objects.defer(*POST_BODY).order_by('-created_at')[:3]
     services = Service.objects.all().order_by('order')
     return render(request, 'core/home.html', {
         'recent_projects': recent_projects,
@@ -13,6 +50,7 @@ def home(request):
         'seo_title': 'NanoStack Technologies | Transforming Visions into Digital Reality',
     })
 
+@public_view(cache_public_page())
 def about(request):
     return render(request, 'core/about.html', {
         'seo_title': 'About NanoStack | Top Web Development Agency in India',
@@ -20,44 +58,156 @@ def about(request):
         'seo_keywords': 'About NanoStack, Best Web Agency, Software Company Founders, Pavan Mehta, Nakul Talsaniya'
     })
 
+@public_view(
+    condition(etag_func=listing_etag(Project)),
+    cache_public_page(Project),
+)
 def projects(request):
-    projects = Project.objects.all().order_by('-created_at')
+    page = keyset_paginate(Project.objects.defer(*PROJECT_BODY), request.GET, PROJECTS_PER_PAGE)
     return render(request, 'core/projects.html', {
-        'projects': projects,
+        'projects': page.items,
+        'page': page,
         'seo_title': 'Our Portfolio | Custom Software & Web Projects',
         'seo_description': 'Explore our portfolio of successful projects including EcoTrack, FinSight, and MediConnect. See how we deliver excellence in code.',
         'seo_keywords': 'NanoStack Portfolio, Case Studies, Web Projects, App Development Examples'
     })
 
+@public_view(
+    condition(etag_func=listing_etag(Project)),
+    cache_public_page(Project),
+)
+def projects_fragment(request):
+    page = keyset_paginate(Project.objects.defer(*PROJECT_BODY), request.GET, PROJECTS_PER_PAGE)
+    return render(request, 'core/partials/project_cards.html', {
+        'projects': page.items,
+        'page': page,
+    })
+
+@public_view(condition(etag_func=detail_etag(Project), last_modified_func=detail_last_modified(Project)))
 def project_detail(request, slug):
-    project = get_object_or_404(Project, slug=slug)
-    return render(request, 'core/project_detail.html', {
+    project = get_object_or_404(Project.objects.defer('description'), slug=slug)
+    response = render(request, 'core/project_detail.html', {
         'project': project,
         'seo_title': f"{project.title} | Case Study by NanoStack",
-        'seo_description': project.description[:160],
+        'seo_description': project.excerpt[:160],
         'seo_keywords': f"{project.title}, {project.tech_stack}, Software Case Study"
     })
+    return edge.tag(response, project)
+
+def tag_counts():
+    """All tags in use with their post counts, from one grouped query."""
+    return (
+        Tag.objects.annotate(post_count=Count('posts'))
+        .filter(post_count__gt=0)
+        .order_by('-post_count', 'name')
+    )
 
+@public_view(
+    condition(etag_func=listing_etag(BlogPost)),
+    cache_public_page(BlogPost),
+)
 def blog(request):
-    posts = BlogPost.objects.all().order_by('-created_at')
+    page = keyset_paginate(BlogPost.objects.defer(*POST_BODY), request.GET, POSTS_PER_PAGE)
     return render(request, 'core/blog.html', {
-        'posts': posts,
+        'posts': page.items,
+        'page': page,
+        'tags': tag_counts(),
+        'fragment_url': reverse('blog_fragment'),
         'seo_title': 'Tech Insights & Blog | NanoStack Technologies',
         'seo_description': 'Read the latest trends in Web Development, Python, Django, and Automation. Expert insights from our tech leads.',
         'seo_keywords': 'Tech Blog, Web Dev Blog, Python Tutorials, Business Automation Tips'
     })
 
+@public_view(
+    condition(etag_func=listing_etag(BlogPost)),
+    cache_public_page(BlogPost),
+)
+def blog_fragment(request):
+    page = keyset_paginate(BlogPost.objects.defer(*POST_BODY), request.GET, POSTS_PER_PAGE)
+    return render(request, 'core/partials/blog_cards.html', {
+        'posts': page.items,
+        'page': page,
+        'fragment_url': reverse('blog_fragment'),
+    })
+
+@public_view(
+    condition(etag_func=listing_etag(BlogPost)),
+    cache_public_page(BlogPost),
+)
+def blog_tag(request, slug):
+    tag = get_object_or_404(Tag, slug=slug)
+    page = keyset_paginate(tag.posts.defer(*POST_BODY), request.GET, POSTS_PER_PAGE)
+    return render(request, 'core/blog.html', {
+        'posts': page.items,
+        'page': page,
+        'tag': tag,
+        'tags': tag_counts(),
+        'fragment_url': reverse('blog_tag_fragment', args=[tag.slug]),
+        'seo_title': f"#{tag.name} Articles | NanoStack Blog",
+        'seo_description': f"Articles tagged {tag.name} from the NanoStack Technologies blog.",
+        'seo_keywords': f"{tag.name}, Tech Blog, NanoStack"
+    })
+
+@public_view(
+    condition(etag_func=listing_etag(BlogPost)),
+    cache_public_page(BlogPost),
+)
+def blog_tag_fragment(request, slug):
+    tag = get_object_or_404(Tag, slug=slug)
+    page = keyset_paginate(tag.posts.defer(*POST_BODY), request.GET, POSTS_PER_PAGE)
+    return render(request, 'core/partials/blog_cards.html', {
+        'posts': page.items,
+        'page': page,
+        'fragment_url': reverse('blog_tag_fragment', args=[tag.slug]),
+    })
+
+def blog_detail_dependencies(slug):
+    """
+    The rows blog_detail shows besides the post, as (key, updated_at): the
+    related (or, without any, the latest) posts and the post's tags.
+    """
+    posts = list(
+        RelatedPost.objects.filter(post__slug=slug).order_by('-score')
+        .values_list('related_id', 'related__updated_at')[:RELATED_SHOWN]
+    ) or list(
+        BlogPost.objects.exclude(slug=slug).order_by('-created_at').values_list('id', 'updated_at')[:RELATED_SHOWN]
+    )
+    tags = BlogPostTag.objects.filter(post__slug=slug).order_by('tag_id').values_list('tag_id', 'tag__name')
+    return [(f'post{pk}', updated_at) for pk, updated_at in posts] + [(f'tag{pk}-{name}', None) for pk, name in tags]
+
+@public_view(
+    condition(
+        etag_func=detail_etag(BlogPost, depends_on=blog_detail_dependencies),
+        last_modified_func=detail_last_modified(BlogPost, depends_on=blog_detail_dependencies),
+    ),
+)
 def blog_detail(request, slug):
-    post = get_object_or_404(BlogPost, slug=slug)
-    related_posts = BlogPost.objects.exclude(id=post.id).order_by('-created_at')[:3]
-    return render(request, 'core/blog_detail.html', {
+    post = get_object_or_404(BlogPost.objects.defer('content'), slug=slug)
+    tags = list(post.tags.all())
+    related_posts = [
+        link.related for link in
+        RelatedPost.objects.filter(post=post).select_related('related')
+        .defer(*(f'related__{field}' for field in POST_BODY)).order_by('-score')[:RELATED_SHOWN]
+    ]
+    # The related cards show other posts' titles and images; the fallback
+    # shows the latest posts, so it changes with every new one.
+    depends_on = related_posts
+    if not related_posts:
+        related_posts = list(
+            BlogPost.objects.defer(*POST_BODY).exclude(id=post.id).order_by('-created_at')[:RELATED_SHOWN]
+        )
+        depends_on = [BlogPost]
+    response = render(request, 'core/blog_detail.html', {
         'post': post,
+        'tags': tags,
         'related_posts': related_posts,
         'seo_title': f"{post.title} | NanoStack Blog",
-        'seo_description': post.content[:160],
-        'seo_keywords': f"{post.title}, Tech Article, {post.author}, {post.tags}"
+        'seo_description': post.excerpt[:160],
+        'seo_keywords': f"{post.title}, Tech Article, {post.author}, {', '.join(tag.name for tag in tags)}"
     })
+    return edge.tag(response, post, *depends_on)
 
+@public_view(cache_public_page(JobOpening))
 def career(request):
     jobs = JobOpening.objects.all().order_by('-posted_at')
     return render(request, 'core/career.html', {
@@ -67,57 +217,75 @@ def career(request):
         'seo_keywords': 'Tech Jobs, Python Developers Hiring, Remote Jobs, Software Engineer Careers'
     })
 
-import re
+@public_view()
+def search(request):
+    query = request.GET.get('q', '').strip()
+    results = search_index.search(query) if query else []
+    return render(request, 'core/search.html', {
+        'query': query,
+        'results': results,
+        'seo_title': f"Search: {query} | NanoStack Technologies" if query else 'Search | NanoStack Technologies',
+        'seo_description': 'Search NanoStack blog posts, case studies and job openings.',
+        'seo_keywords': 'NanoStack Search, Blog Search, Case Studies, Jobs'
+    })
 
-def is_spam(data):
-    """
-    Service to check if a contact message is likely spam.
-    """
-    email = data.get('email', '').lower()
-    name = data.get('name', '').lower()
-    subject = data.get('subject', '').lower()
-    message = data.get('message', '').lower()
-    honeypot = data.get('website', '') # Honeypot field name
-
-    # 1. Honeypot check: If the hidden 'website' field is filled, it's a bot.
-    if honeypot:
-        return True
-
-    # 2. Blocklist check
-    blocked_emails = [
-        'xrumer23Acatt@gmail.com',
-        'xrumer', # Any email containing xrumer
-    ]
-    for blocked in blocked_emails:
-        if blocked.lower() in email:
-            return True
-
-    # 3. Language check: Block Cyrillic (Russian/Bulgarian etc.) characters
-    # Since NanoStack is an Indian tech agency, Russian messages are almost certainly spam.
-    if re.search('[\u0400-\u04FF]', message) or re.search('[\u0400-\u04FF]', subject):
-        return True
-
-    # 4. Common spam patterns
-    spam_patterns = [
-        r'http://\S+\.ru', # Russian links
-        r'https://\S+\.ru',
-        r'order a bouquet', # From user's screenshot
-        r'заказать букет', # "Order a bouquet" in Russian
-    ]
-    for pattern in spam_patterns:
-        if re.search(pattern, message, re.IGNORECASE) or re.search(pattern, subject, re.IGNORECASE):
-            return True
+@public_view()
+def search_api(request):
+    query = request.GET.get('q', '').strip()
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 50)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+    return JsonResponse({
+        'query': query,
+        'results': search_index.search(query, limit) if query else [],
+    })
+
+def _serve_sitemap(request, section, page=1):
+    path = sitemap_files.file_path(section, page)
+    try:
+        mtime = int(path.stat().st_mtime)
+    except FileNotFoundError:
+        mtime = None
+    else:
+        not_modified = get_conditional_response(request, last_modified=mtime)
+        if not_modified is not None:
+            return not_modified
 
-    return False
+    try:
+        content, path = sitemap_files.read(section, page)
+    except (EmptyPage, PageNotAnInteger):
+        raise Http404("No such sitemap page")
+    response = HttpResponse(content, content_type='application/xml')
+    if path is not None:
+        response['Last-Modified'] = http_date(mtime or path.stat().st_mtime)
+    return response
+
+def sitemap_index(request):
+    return _serve_sitemap(request, sitemap_files.INDEX_NAME)
+
+def sitemap_section(request, section):
+    if section not in SITEMAPS:
+        raise Http404("No such sitemap")
+    try:
+        page = int(request.GET.get('p', 1))
+    except ValueError:
+        raise Http404("No such sitemap page")
+    return _serve_sitemap(request, section, page)
 
 def get_client_ip(request):
+    # nginx's proxy_params sets X-Real-IP and appends the same address to
+    # X-Forwarded-For; earlier X-Forwarded-For entries come from the client.
+    # REMOTE_ADDR is empty over the unix socket, so it only serves runserver.
+    real_ip = request.META.get('HTTP_X_REAL_IP')
+    if real_ip:
+        return real_ip.strip()
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
     if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
-    else:
-        ip = request.META.get('REMOTE_ADDR')
-    return ip
+        return x_forwarded_for.split(',')[-1].strip()
+    return request.META.get('REMOTE_ADDR')
 
+@public_view()
 def contact(request):
     if request.method == 'POST':
         if is_spam(request.POST):
@@ -125,16 +293,21 @@ def contact(request):
             messages.success(request, "Your message has been sent successfully!")
             return redirect('contact')
 
-        name = request.POST.get('name')
-        email = request.POST.get('email')
-        phone = request.POST.get('phone')
-        subject = request.POST.get('subject')
-        message = request.POST.get('message')
-        ip = get_client_ip(request)
-        
-        ContactMessage.objects.create(
-            name=name, email=email, phone=phone, subject=subject, message=message, ip_address=ip
+        message = ContactMessage(
+            name=request.POST.get('name'),
+            email=request.POST.get('email'),
+            phone=request.POST.get('phone', ''),
+            subject=request.POST.get('subject'),
+            message=request.POST.get('message'),
+            ip_address=get_client_ip(request),
         )
+        try:
+            message.full_clean(exclude=['ip_address'])
+        except ValidationError:
+            messages.error(request, "Please fill in all required fields with a valid email address.")
+            return redirect('contact')
+
+        spool.append(message)
         messages.success(request, "Your message has been sent successfully!")
         return redirect('contact')
         
@@ -151,7 +324,7 @@ import json
 def custom_404(request, exception):
     return render(request, '404.html', status=404)
 
-@csrf_exempt
+@public_view(csrf_exempt)
 def contact_api(request):
     if request.method == 'POST':
         # Handle both JSON and Form Data
@@ -177,9 +350,14 @@ def contact_api(request):
         if not all([name, email, subject, message]):
             return JsonResponse({'error': 'Missing required fields'}, status=400)
 
-        ContactMessage.objects.create(
+        contact_message = ContactMessage(
             name=name, email=email, phone=phone, subject=subject, message=message, ip_address=ip
         )
+        try:
+            contact_message.full_clean(exclude=['ip_address'])
+        except ValidationError as e:
+            return JsonResponse({'error': 'Invalid fields', 'fields': e.message_dict}, status=400)
+        spool.append(contact_message)
 
         
         # If standard form submit, verify if they want redirect or JSON
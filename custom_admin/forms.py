@@ -1,6 +1,6 @@
 from django import forms
 from ckeditor.widgets import CKEditorWidget
-from core.models import Project, BlogPost, JobOpening, Service, Client, ClientProject
+from core.models import Project, BlogPost, JobOpening, Service, Client, ClientProject, SpamRule
 
 class BootstrapFormMixin:
     def __init__(self, *args, **kwargs):
@@ -16,9 +16,19 @@ class ProjectForm(BootstrapFormMixin, forms.ModelForm):
 
 class BlogPostForm(BootstrapFormMixin, forms.ModelForm):
     content = forms.CharField(widget=CKEditorWidget())
+    tags = forms.CharField(required=False, max_length=200, help_text="Comma separated tags")
     class Meta:
         model = BlogPost
-        fields = '__all__'
+        exclude = ['tags']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial['tags'] = self.instance.tag_names
+
+    def _save_m2m(self):
+        super()._save_m2m()
+        self.instance.set_tags(self.cleaned_data['tags'])
 
 class JobOpeningForm(BootstrapFormMixin, forms.ModelForm):
     class Meta:
@@ -30,6 +40,11 @@ class ServiceForm(BootstrapFormMixin, forms.ModelForm):
         model = Service
         fields = '__all__'
 
+class SpamRuleForm(BootstrapFormMixin, forms.ModelForm):
+    class Meta:
+        model = SpamRule
+        fields = ['kind', 'value', 'note', 'is_active']
+
 class ClientForm(BootstrapFormMixin, forms.ModelForm):
     class Meta:
         model = Client
@@ -45,3 +60,21 @@ class ClientProjectForm(BootstrapFormMixin, forms.ModelForm):
         fields = ['client', 'project_name', 'status', 'tech_stack', 'description',
                   'total_bill', 'amount_paid', 'payment_method', 'expenses',
                   'start_date', 'end_date', 'delivered_date', 'notes']
+
+class ClientProjectFilterForm(BootstrapFormMixin, forms.Form):
+    SORT_CHOICES = [
+        ('-created', 'Newest first'),
+        ('created', 'Oldest first'),
+        ('-bill', 'Highest bill'),
+        ('-paid', 'Most paid'),
+        ('-profit', 'Most profit'),
+        ('profit', 'Least profit'),
+        ('-balance', 'Largest balance due'),
+    ]
+
+    status = forms.ChoiceField(choices=[('', 'Any status')] + ClientProject.STATUS_CHOICES, required=False)
+    payment_method = forms.ChoiceField(choices=[('', 'Any payment method')] + ClientProject.PAYMENT_METHOD_CHOICES, required=False)
+    client = forms.ModelChoiceField(queryset=Client.objects.order_by('name'), required=False, empty_label='Any client')
+    date_from = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}), required=False)
+    date_to = forms.DateField(widget=forms.DateInput(attrs={'type': 'date'}), required=False)
+    sort = forms.ChoiceField(choices=SORT_CHOICES, required=False)
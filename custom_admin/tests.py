@@ -1,3 +1,194 @@
-from django.test import TestCase
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core import summary
+from core.models import Client, ClientProject, DashboardSummary
+
+ADMIN_HOST = 'nanoadmin.nanostacktechnologies.com'
+
+
+class ClientsListTests(TestCase):
+    # Session, user, paginator count and the annotated page.
+    QUERIES = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def add_clients(self, count, bill='100.00', paid='40.00', expenses='10.00'):
+        for i in range(count):
+            client = Client.objects.create(name=f'Client {Client.objects.count()}')
+            for n in range(2):
+                ClientProject.objects.create(
+                    client=client, project_name=f'Project {n}', total_bill=Decimal(bill),
+                    amount_paid=Decimal(paid), expenses=Decimal(expenses),
+                )
+
+    def get(self, **params):
+        return self.client.get('/clients/', params, headers={'host': ADMIN_HOST}, secure=True)
+
+    def test_query_count_does_not_grow_with_clients(self):
+        self.add_clients(3)
+        with self.assertNumQueries(self.QUERIES):
+            self.get()
+        self.add_clients(40)
+        with self.assertNumQueries(self.QUERIES):
+            response = self.get()
+        self.assertEqual(len(response.context['clients']), 25)
+        with self.assertNumQueries(self.QUERIES):
+            response = self.get(page=2, sort='balance')
+        self.assertEqual(len(response.context['clients']), 18)
+
+    def test_rollups(self):
+        self.add_clients(1)
+        Client.objects.create(name='No projects')
+        rows = {client.name: client for client in self.get(sort='name').context['clients']}
+        client = rows['Client 0']
+        self.assertEqual(client.project_count, 2)
+        self.assertEqual(client.billed, Decimal('200.00'))
+        self.assertEqual(client.paid, Decimal('80.00'))
+        self.assertEqual(client.expenses, Decimal('20.00'))
+        self.assertEqual(client.balance, Decimal('120.00'))
+        self.assertEqual(rows['No projects'].project_count, 0)
+        self.assertEqual(rows['No projects'].balance, 0)
+
+    def test_sorting(self):
+        self.add_clients(1, bill='500.00')
+        self.add_clients(1, bill='50.00')
+        names = [c.name for c in self.get(sort='-billed').context['clients']]
+        self.assertEqual(names, ['Client 0', 'Client 1'])
+        names = [c.name for c in self.get(sort='billed').context['clients']]
+        self.assertEqual(names, ['Client 1', 'Client 0'])
+        # Unknown columns fall back to the default order.
+        self.assertEqual(self.get(sort='password').context['sort'], '-created')
+
+
+class ClientProjectsTableTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.acme = Client.objects.create(name='Acme')
+        cls.globex = Client.objects.create(name='Globex')
+        for i in range(60):
+            ClientProject.objects.create(
+                client=cls.acme if i % 2 else cls.globex, project_name=f'Project {i}',
+                status='Completed' if i % 3 == 0 else 'In Progress',
+                total_bill=Decimal(100 + i), amount_paid=Decimal(50), expenses=Decimal(i),
+            )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get(self, path='/client-projects/', **params):
+        return self.client.get(path, params, headers={'host': ADMIN_HOST}, secure=True)
+
+    def data(self, url):
+        return self.client.get(url, headers={'host': ADMIN_HOST}, secure=True).json()
+
+    def test_filtered_totals(self):
+        response = self.get(client=self.acme.pk)
+        self.assertEqual(response.context['project_count'], 30)
+        self.assertEqual(response.context['total_profit'], Decimal(30 * 50 - sum(range(1, 60, 2))))
+        self.assertIsNone(response.context['next_query'])
+        self.assertEqual(self.get(status='Completed', client=self.acme.pk).context['project_count'], 10)
+        # An unknown status is ignored rather than matching nothing.
+        self.assertEqual(self.get(status='Cancelled?').context['project_count'], 60)
+
+    def test_pages_cover_the_set_once(self):
+        first = self.get()
+        seen = [p.pk for p in first.context['projects']]
+        self.assertEqual(len(seen), 50)
+        data = self.data('/client-projects/data/')
+        self.assertEqual(data['totals']['project_count'], 60)
+        self.assertEqual([row['id'] for row in data['results']], seen)
+        data = self.data(data['next'])
+        self.assertNotIn('totals', data)
+        self.assertIsNone(data['next'])
+        seen += [row['id'] for row in data['results']]
+        self.assertEqual(sorted(seen), sorted(ClientProject.objects.values_list('pk', flat=True)))
+
+    def test_sorting_by_computed_columns(self):
+        data = self.data('/client-projects/data/?sort=-profit&status=Completed')
+        profits = [Decimal(row['profit']) for row in data['results']]
+        self.assertEqual(profits, sorted(profits, reverse=True))
+        self.assertEqual(len(profits), 20)
+        response = self.get('/client-projects/rows/', sort='-balance')
+        balances = [p.balance for p in response.context['projects']]
+        self.assertEqual(balances, sorted(balances, reverse=True))
+        self.assertContains(response, 'data-next=')
+        rows = self.client.get(response.context['next_rows'], headers={'host': ADMIN_HOST}, secure=True)
+        rest = [p.balance for p in rows.context['projects']]
+        self.assertEqual(len(rest), 10)
+        self.assertLessEqual(max(rest), balances[-1])
+
+    @mock.patch('custom_admin.views.CLIENT_PROJECTS_PER_PAGE', 3)
+    def test_fractional_ties_across_pages(self):
+        # SQLite computes 0.30 - 0.10 as 0.19999...; the cursor must still move on.
+        initech = Client.objects.create(name='Initech')
+        for i in range(7):
+            ClientProject.objects.create(
+                client=initech, project_name=f'Tied {i}', total_bill=Decimal('0.50'),
+                amount_paid=Decimal('0.30'), expenses=Decimal('0.10'),
+            )
+        for sort in ('-profit', 'profit', '-balance', '-paid'):
+            url, seen = f'/client-projects/data/?client={initech.pk}&sort={sort}', []
+            while url and len(seen) < 10:
+                data = self.data(url)
+                seen += [row['id'] for row in data['results']]
+                url = data['next']
+            self.assertEqual(sorted(seen), sorted(initech.client_projects.values_list('pk', flat=True)), sort)
+
+
+class DashboardSummaryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        # The dashboard flushes the contact spool first.
+        tmp = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(CONTACT_SPOOL_DB=f'{tmp}/contact_spool.sqlite3'))
+
+    def test_saves_and_deletes_keep_the_summary_exact(self):
+        acme = Client.objects.create(name='Acme')
+        project = ClientProject.objects.create(
+            client=acme, project_name='Portal', total_bill=Decimal('100.00'),
+            amount_paid=Decimal('40.00'), expenses=Decimal('10.00'),
+        )
+        project.total_bill = Decimal('150.50')
+        project.save()
+        ClientProject.objects.create(client=acme, project_name='App', total_bill=Decimal('20.00'))
+        self.assertEqual(summary.get().total_revenue, Decimal('170.50'))
+        acme.delete()
+        stored = DashboardSummary.objects.filter(pk=summary.SUMMARY_PK).values(*summary.compute()).get()
+        self.assertEqual(stored, summary.compute())
+
+    def test_dashboard_reads_one_row(self):
+        Client.objects.create(name='Acme')
+        self.client.get('/', headers={'host': ADMIN_HOST}, secure=True)
+        # Session, user, the summary row and the recent messages.
+        with self.assertNumQueries(4):
+            response = self.client.get('/', headers={'host': ADMIN_HOST}, secure=True)
+        self.assertEqual(response.context['counts']['clients'], 1)
+
+    def test_reconcile_corrects_drift(self):
+        Client.objects.create(name='Acme')
+        DashboardSummary.objects.filter(pk=summary.SUMMARY_PK).update(clients=5)
+        out = StringIO()
+        call_command('reconcile_dashboard_summary', stdout=out)
+        self.assertIn('Corrected 1 fields.', out.getvalue())
+        self.assertEqual(summary.get().clients, 1)
+
+        DashboardSummary.objects.all().delete()
+        Client.objects.create(name='Initech')
+        self.assertEqual(summary.get().clients, 2)
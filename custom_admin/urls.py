@@ -35,6 +35,12 @@ urlpatterns = [
     path('messages/<int:pk>/', views.message_detail, name='admin_message_detail'),
     path('messages/<int:pk>/delete/', views.message_delete, name='admin_message_delete'),
 
+    # Spam Rules
+    path('spam-rules/', views.spam_rules_list, name='admin_spam_rules_list'),
+    path('spam-rules/add/', views.SpamRuleCreateView.as_view(), name='admin_spam_rule_add'),
+    path('spam-rules/<int:pk>/edit/', views.SpamRuleUpdateView.as_view(), name='admin_spam_rule_edit'),
+    path('spam-rules/<int:pk>/delete/', views.SpamRuleDeleteView.as_view(), name='admin_spam_rule_delete'),
+
     # Clients
     path('clients/', views.clients_list, name='admin_clients_list'),
     path('clients/add/', views.ClientCreateView.as_view(), name='admin_client_add'),
@@ -44,6 +50,8 @@ urlpatterns = [
 
     # Client Projects
     path('client-projects/', views.client_projects_list, name='admin_client_projects_list'),
+    path('client-projects/rows/', views.client_projects_rows, name='admin_client_projects_rows'),
+    path('client-projects/data/', views.client_projects_data, name='admin_client_projects_data'),
     path('client-projects/add/', views.ClientProjectCreateView.as_view(), name='admin_client_project_add'),
     path('client-projects/<int:pk>/', views.client_project_detail, name='admin_client_project_detail'),
     path('client-projects/<int:pk>/edit/', views.ClientProjectUpdateView.as_view(), name='admin_client_project_edit'),
@@ -2,18 +2,27 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth.forms import AuthenticationForm
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
 from django.views.generic import CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib import messages
 from django.http import JsonResponse
-from django.db.models import Sum, Count
+from django.core.paginator import Paginator
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, IntegerField, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Round
 from django.db.models.functions import TruncMonth
 import json
+from datetime import datetime, time, timedelta
 from decimal import Decimal
 
-from core.models import Project, BlogPost, JobOpening, Service, ContactMessage, Client, ClientProject
-from .forms import ProjectForm, BlogPostForm, JobOpeningForm, ServiceForm, ClientForm, ClientProjectForm
+from core import spool, summary
+from core.pagination import SortKey, decode_cursor, encode_cursor, keyset_paginate
+from core.models import Project, BlogPost, JobOpening, Service, ContactMessage, SpamRule, Client, ClientProject
+from .forms import (
+    ProjectForm, BlogPostForm, JobOpeningForm, ServiceForm, SpamRuleForm, ClientForm, ClientProjectForm,
+    ClientProjectFilterForm,
+)
 
 # --- Authentication ---
 
@@ -49,30 +58,18 @@ class SuperUserRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):
 @login_required
 @user_passes_test(lambda u: u.is_superuser)
 def dashboard(request):
-    counts = {
-        'projects': Project.objects.count(),
-        'blogs': BlogPost.objects.count(),
-        'services': Service.objects.count(),
-        'jobs': JobOpening.objects.count(),
-        'messages': ContactMessage.objects.count(),
-        'clients': Client.objects.count(),
-        'client_projects': ClientProject.objects.count(),
-    }
+    spool.flush()
+    totals = summary.get()
+    counts = {field: getattr(totals, field) for field in summary.COUNTED.values()}
     recent_messages = ContactMessage.objects.order_by('-created_at')[:5]
 
-    # Financial summary
-    total_revenue = ClientProject.objects.aggregate(total=Sum('total_bill'))['total'] or 0
-    total_paid = ClientProject.objects.aggregate(total=Sum('amount_paid'))['total'] or 0
-    total_expenses = ClientProject.objects.aggregate(total=Sum('expenses'))['total'] or 0
-    total_profit = total_paid - total_expenses
-
     return render(request, 'custom_admin/dashboard.html', {
         'counts': counts,
         'recent_messages': recent_messages,
-        'total_revenue': total_revenue,
-        'total_paid': total_paid,
-        'total_expenses': total_expenses,
-        'total_profit': total_profit,
+        'total_revenue': totals.total_revenue,
+        'total_paid': totals.total_paid,
+        'total_expenses': totals.total_expenses,
+        'total_profit': totals.total_profit,
     })
 
 # --- Projects ---
@@ -180,6 +177,7 @@ class JobDeleteView(SuperUserRequiredMixin, DeleteView):
 @login_required
 @user_passes_test(lambda u: u.is_superuser)
 def messages_list(request):
+    spool.flush()
     messages_list = ContactMessage.objects.all().order_by('-created_at')
     return render(request, 'custom_admin/messages/list.html', {'messages_list': messages_list})
 
@@ -199,33 +197,111 @@ def message_delete(request, pk):
         return redirect('admin_messages_list')
     return render(request, 'custom_admin/messages/confirm_delete.html', {'object': msg})
 
+# --- Spam Rules ---
+
+@login_required
+@user_passes_test(lambda u: u.is_superuser)
+def spam_rules_list(request):
+    rules = SpamRule.objects.all()
+    return render(request, 'custom_admin/spam_rules/list.html', {'rules': rules})
+
+class SpamRuleCreateView(SuperUserRequiredMixin, CreateView):
+    model = SpamRule
+    form_class = SpamRuleForm
+    template_name = 'custom_admin/spam_rules/form.html'
+    success_url = reverse_lazy('admin_spam_rules_list')
+
+class SpamRuleUpdateView(SuperUserRequiredMixin, UpdateView):
+    model = SpamRule
+    form_class = SpamRuleForm
+    template_name = 'custom_admin/spam_rules/form.html'
+    success_url = reverse_lazy('admin_spam_rules_list')
+
+class SpamRuleDeleteView(SuperUserRequiredMixin, DeleteView):
+    model = SpamRule
+    template_name = 'custom_admin/spam_rules/confirm_delete.html'
+    success_url = reverse_lazy('admin_spam_rules_list')
+
 
 # ========================================
 # --- Clients ---
 # ========================================
 
+CLIENTS_PER_PAGE = 25
+# ?sort= value -> column; a leading '-' sorts descending.
+CLIENT_SORTS = {
+    'name': 'name',
+    'projects': 'project_count',
+    'billed': 'billed',
+    'paid': 'paid',
+    'expenses': 'expenses',
+    'balance': 'balance',
+    'created': 'created_at',
+}
+CLIENT_COLUMNS = [
+    ('name', 'Name'), ('projects', 'Projects'), ('billed', 'Billed'), ('paid', 'Paid'),
+    ('expenses', 'Expenses'), ('balance', 'Balance'),
+]
+
+
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+
+def _money_sum(field):
+    return Coalesce(Sum(field), Value(0), output_field=MONEY)
+
+
+def project_totals(projects):
+    """Count, bill, paid, expenses, profit and balance of ``projects`` from one aggregate query."""
+    # The column sums come last: their names would shadow total_bill in F().
+    return projects.aggregate(
+        project_count=Count('pk'),
+        total_profit=_money_sum(F('amount_paid') - F('expenses')),
+        total_balance=_money_sum(F('total_bill') - F('amount_paid')),
+        total_bill=_money_sum('total_bill'),
+        total_paid=_money_sum('amount_paid'),
+        total_expenses=_money_sum('expenses'),
+    )
+
+
+def clients_with_totals():
+    """Clients annotated with their project count and money totals, in one grouped query."""
+    return Client.objects.annotate(
+        project_count=Count('client_projects'),
+        billed=_money_sum('client_projects__total_bill'),
+        paid=_money_sum('client_projects__amount_paid'),
+        expenses=_money_sum('client_projects__expenses'),
+    ).annotate(balance=F('billed') - F('paid'))
+
+
 @login_required
 @user_passes_test(lambda u: u.is_superuser)
 def clients_list(request):
-    clients = Client.objects.all().order_by('-created_at')
-    return render(request, 'custom_admin/clients/list.html', {'clients': clients})
+    sort = request.GET.get('sort', '-created')
+    if sort.lstrip('-') not in CLIENT_SORTS:
+        sort = '-created'
+    descending = sort.startswith('-')
+    column = CLIENT_SORTS[sort.lstrip('-')]
+    # pk keeps the order stable between pages when values tie.
+    ordering = [f'-{column}', '-pk'] if descending else [column, 'pk']
+    page = Paginator(clients_with_totals().order_by(*ordering), CLIENTS_PER_PAGE).get_page(request.GET.get('page'))
+    return render(request, 'custom_admin/clients/list.html', {
+        'clients': page.object_list,
+        'page': page,
+        'sort': sort,
+        'columns': CLIENT_COLUMNS,
+    })
 
 @login_required
 @user_passes_test(lambda u: u.is_superuser)
 def client_detail(request, pk):
     client = get_object_or_404(Client, pk=pk)
     projects = client.client_projects.all()
-    total_bill = projects.aggregate(total=Sum('total_bill'))['total'] or 0
-    total_paid = projects.aggregate(total=Sum('amount_paid'))['total'] or 0
-    total_expenses = projects.aggregate(total=Sum('expenses'))['total'] or 0
-    total_profit = total_paid - total_expenses
+    totals = project_totals(projects)
     return render(request, 'custom_admin/clients/detail.html', {
         'client': client,
         'projects': projects,
-        'total_bill': total_bill,
-        'total_paid': total_paid,
-        'total_expenses': total_expenses,
-        'total_profit': total_profit,
+        **totals,
     })
 
 class ClientCreateView(SuperUserRequiredMixin, CreateView):
@@ -250,22 +326,119 @@ class ClientDeleteView(SuperUserRequiredMixin, DeleteView):
 # --- Client Projects ---
 # ========================================
 
+CLIENT_PROJECTS_PER_PAGE = 50
+# ?sort= value -> column or annotation; a leading '-' sorts descending.
+CLIENT_PROJECT_SORTS = {
+    'created': 'created_at',
+    'bill': 'total_bill',
+    'paid': 'amount_paid',
+    'profit': 'profit',
+    'balance': 'balance',
+}
+
+
+def _start_of(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def filtered_client_projects(filters):
+    """
+    ClientProjects matching the cleaned ``filters``, with profit and balance
+    computed in SQL. Newest-first pages under any one filter are range scans
+    on the ClientProject indexes.
+    """
+    projects = ClientProject.objects.select_related('client').annotate(
+        profit=ExpressionWrapper(F('amount_paid') - F('expenses'), output_field=MONEY),
+        balance=ExpressionWrapper(F('total_bill') - F('amount_paid'), output_field=MONEY),
+    )
+    for field in ('status', 'payment_method', 'client'):
+        if filters.get(field):
+            projects = projects.filter(**{field: filters[field]})
+    if filters.get('date_from'):
+        projects = projects.filter(created_at__gte=_start_of(filters['date_from']))
+    if filters.get('date_to'):
+        projects = projects.filter(created_at__lt=_start_of(filters['date_to'] + timedelta(days=1)))
+    return projects
+
+
+def sorted_client_projects(projects, sort):
+    """Returns ``projects`` ready to be paged in ``sort`` order, and the SortKey to page them by."""
+    sort = sort or '-created'
+    field = CLIENT_PROJECT_SORTS[sort.lstrip('-')]
+    descending = sort.startswith('-')
+    if field == 'created_at':
+        return projects, SortKey(field, descending, encode=encode_cursor, decode=decode_cursor)
+    # Money columns are paged in whole paise (see core.pagination).
+    projects = projects.annotate(sort_paise=Cast(Round(F(field) * 100), IntegerField()))
+    return projects, SortKey('sort_paise', descending)
+
+
+def client_projects_page(request):
+    """Returns the filter form, the filtered projects, the requested page and the query of the next one."""
+    form = ClientProjectFilterForm(request.GET)
+    form.is_valid()  # invalid filters are left out of cleaned_data and ignored
+    projects = filtered_client_projects(form.cleaned_data)
+    ordered, key = sorted_client_projects(projects, form.cleaned_data.get('sort'))
+    page = keyset_paginate(ordered, request.GET, CLIENT_PROJECTS_PER_PAGE, key)
+    next_query = None
+    if page.next_cursor:
+        params = request.GET.copy()
+        params.pop('before', None)
+        params['after'] = page.next_cursor
+        next_query = params.urlencode()
+    return form, projects, page, next_query
+
+
 @login_required
 @user_passes_test(lambda u: u.is_superuser)
 def client_projects_list(request):
-    projects = ClientProject.objects.select_related('client').all()
-    total_bill = projects.aggregate(total=Sum('total_bill'))['total'] or 0
-    total_paid = projects.aggregate(total=Sum('amount_paid'))['total'] or 0
-    total_expenses = projects.aggregate(total=Sum('expenses'))['total'] or 0
-    total_profit = total_paid - total_expenses
+    form, projects, page, next_query = client_projects_page(request)
     return render(request, 'custom_admin/client_projects/list.html', {
-        'projects': projects,
-        'total_bill': total_bill,
-        'total_paid': total_paid,
-        'total_expenses': total_expenses,
-        'total_profit': total_profit,
+        'form': form,
+        'projects': page.items,
+        'next_query': next_query,
+        'next_rows': f"{reverse('admin_client_projects_rows')}?{next_query}" if next_query else None,
+        **project_totals(projects),
     })
 
+@login_required
+@user_passes_test(lambda u: u.is_superuser)
+def client_projects_rows(request):
+    """The next page of table rows, appended by the list page as it scrolls."""
+    form, projects, page, next_query = client_projects_page(request)
+    return render(request, 'custom_admin/client_projects/rows.html', {
+        'projects': page.items,
+        'next_rows': f"{reverse('admin_client_projects_rows')}?{next_query}" if next_query else None,
+    })
+
+@login_required
+@user_passes_test(lambda u: u.is_superuser)
+def client_projects_data(request):
+    """The same table as JSON. The first page also carries the totals of the filtered set."""
+    form, projects, page, next_query = client_projects_page(request)
+    data = {
+        'results': [
+            {
+                'id': project.pk,
+                'project_name': project.project_name,
+                'client': {'id': project.client_id, 'name': project.client.name},
+                'status': project.status,
+                'payment_method': project.payment_method,
+                'total_bill': project.total_bill,
+                'amount_paid': project.amount_paid,
+                'expenses': project.expenses,
+                'profit': project.profit,
+                'balance': project.balance,
+                'created_at': project.created_at,
+            }
+            for project in page.items
+        ],
+        'next': f"{reverse('admin_client_projects_data')}?{next_query}" if next_query else None,
+    }
+    if not (request.GET.get('after') or request.GET.get('before')):
+        data['totals'] = project_totals(projects)
+    return JsonResponse(data)
+
 @login_required
 @user_passes_test(lambda u: u.is_superuser)
 def client_project_detail(request, pk):
@@ -0,0 +1,188 @@
+// Navbar Toggle
+const navToggle = document.getElementById('navToggle');
+const navLinks = document.getElementById('navLinks');
+
+navToggle.addEventListener('click', () => {
+    navLinks.classList.toggle('active');
+});
+
+// Sticky Navbar
+window.addEventListener('scroll', () => {
+    const navbar = document.querySelector('.navbar');
+    navbar.classList.toggle('sticky', window.scrollY > 0);
+});
+
+// Smooth Scroll is default in CSS html { scroll-behavior: smooth; }
+
+// Counter Animation
+const counters = document.querySelectorAll('.counter');
+const speed = 200;
+
+const startCounter = (counter) => {
+    const target = +counter.getAttribute('data-target');
+    const suffix = counter.getAttribute('data-suffix') || '';
+    const count = +counter.innerText.replace(suffix, '');
+    const inc = target / speed;
+
+    if (count < target) {
+        counter.innerText = Math.ceil(count + inc) + suffix;
+        setTimeout(() => startCounter(counter), 1);
+    } else {
+        counter.innerText = target + suffix;
+    }
+};
+
+const observerOptions = {
+    threshold: 0.5
+};
+
+const observer = new IntersectionObserver((entries) => {
+    entries.forEach(entry => {
+        if (entry.isIntersecting) {
+            startCounter(entry.target);
+            observer.unobserve(entry.target);
+        }
+    });
+}, observerOptions);
+
+// Actually observe the counters
+counters.forEach(counter => observer.observe(counter));
+
+// Reveal Animations
+const revealItems = document.querySelectorAll('[data-reveal]');
+const revealObserver = new IntersectionObserver((entries) => {
+    entries.forEach(entry => {
+        if (entry.isIntersecting) {
+            entry.target.classList.add('visible');
+        }
+    });
+}, { threshold: 0.1 });
+
+revealItems.forEach(item => revealObserver.observe(item));
+
+// Infinite Scroll (keyset paginated listings)
+document.querySelectorAll('[data-infinite-scroll]').forEach(grid => {
+    const nextLink = grid.parentNode.querySelector('.pagination-links [rel="next"]');
+    if (nextLink) nextLink.remove();
+
+    const scrollObserver = new IntersectionObserver((entries) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                scrollObserver.unobserve(entry.target);
+                loadNextPage(entry.target);
+            }
+        });
+    }, { rootMargin: '400px' });
+
+    const observeSentinel = () => {
+        const sentinel = grid.querySelector('.pagination-next');
+        if (sentinel) scrollObserver.observe(sentinel);
+    };
+
+    const loadNextPage = (sentinel) => {
+        fetch(sentinel.dataset.next)
+            .then(response => response.text())
+            .then(html => {
+                sentinel.remove();
+                grid.insertAdjacentHTML('beforeend', html);
+                grid.querySelectorAll('[data-reveal]:not(.visible)').forEach(item => item.classList.add('visible'));
+                observeSentinel();
+            });
+    };
+
+    observeSentinel();
+});
+
+// FAQ Accordion
+document.querySelectorAll('.faq-question').forEach(question => {
+    question.addEventListener('click', () => {
+        const item = question.parentNode;
+        const isActive = item.classList.contains('active');
+
+        // Close all other items
+        document.querySelectorAll('.faq-item').forEach(otherItem => {
+            otherItem.classList.remove('active');
+        });
+
+        if (!isActive) {
+            item.classList.add('active');
+        }
+    });
+});
+
+// Testimonial Carousel One-by-One Logic
+const carousel = document.getElementById('carouselWrapper');
+if (carousel) {
+    const grid = carousel.querySelector('.testimonials-grid');
+    const cards = grid.querySelectorAll('.testimonial-card');
+    const prevBtn = document.getElementById('prevBtn');
+    const nextBtn = document.getElementById('nextBtn');
+    const dotsContainer = document.getElementById('carouselDots');
+
+    let currentIndex = 0;
+
+    // Create dots
+    cards.forEach((_, i) => {
+        const dot = document.createElement('div');
+        dot.classList.add('dot');
+        if (i === 0) dot.classList.add('active');
+        dot.addEventListener('click', () => scrollToCard(i));
+        dotsContainer.appendChild(dot);
+    });
+
+    const dots = dotsContainer.querySelectorAll('.dot');
+
+    function updateActiveCard() {
+        cards.forEach((card, i) => {
+            card.classList.toggle('active', i === currentIndex);
+            dots[i].classList.toggle('active', i === currentIndex);
+        });
+    }
+
+    function scrollToCard(index) {
+        currentIndex = index;
+        const card = cards[index];
+        const cardLeft = card.offsetLeft;
+        const containerPadding = 50; // Match CSS padding
+
+        // For a more robust calculation, we use the card's position relative to the grid
+        carousel.scrollTo({
+            left: cardLeft - (carousel.offsetWidth - card.offsetWidth) / 2,
+            behavior: 'smooth'
+        });
+        updateActiveCard();
+    }
+
+    nextBtn.addEventListener('click', () => {
+        if (currentIndex < cards.length - 1) {
+            scrollToCard(currentIndex + 1);
+        } else {
+            scrollToCard(0); // Loop back
+        }
+    });
+
+    prevBtn.addEventListener('click', () => {
+        if (currentIndex > 0) {
+            scrollToCard(currentIndex - 1);
+        } else {
+            scrollToCard(cards.length - 1); // Loop to end
+        }
+    });
+
+    // Update on scroll (native swiping)
+    let isScrolling;
+    carousel.addEventListener('scroll', () => {
+        window.clearTimeout(isScrolling);
+        isScrolling = setTimeout(() => {
+            const cardWidth = cards[0].offsetWidth + 30;
+            const newIndex = Math.round(carousel.scrollLeft / cardWidth);
+            if (newIndex !== currentIndex) {
+                currentIndex = newIndex;
+                updateActiveCard();
+            }
+        }, 100);
+    });
+
+    // Initial state
+    updateActiveCard();
+}